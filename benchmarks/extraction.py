@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from load_documents import DEFAULT_PARSER, HAS_LXML, PARSERS, extract_document
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TICK = 0.005  # Период проверки отзывчивости цикла событий, с
+
+
+def read_pages(directory: str, limit: int) -> list[tuple[str, str]]:
+    """Сохранённые HTML-файлы каталога: (имя файла, содержимое)"""
+    paths = sorted(Path(directory).rglob("*.htm*"))[:limit]
+    return [(path.name, path.read_text(encoding="utf-8", errors="ignore")) for path in paths]
+
+
+async def extract_all(pages: list[tuple[str, str]], parser: str, workers: int) -> tuple[float, float]:
+    """
+    Разбор страниц так же, как при загрузке: все страницы в работе одновременно.
+    Возвращает время и наибольшую задержку цикла событий (насколько разбор мешает сети).
+    """
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+    if executor is not None:
+        # Процессы запускаются заранее, чтобы не учитывать их старт
+        list(executor.map(abs, range(workers)))
+
+    async def extract(doc_id: int, name: str, html: str):
+        await asyncio.sleep(0)  # Разбор начинается после «получения» страницы, как в fetch_and_process
+        if executor is None:
+            return extract_document(html, name, doc_id, parser)
+        return await loop.run_in_executor(executor, extract_document, html, name, doc_id, parser)
+
+    lag = 0.0
+    done = False
+
+    async def monitor():
+        nonlocal lag
+        while not done:
+            start = loop.time()
+            await asyncio.sleep(TICK)
+            lag = max(lag, loop.time() - start - TICK)
+
+    watcher = asyncio.create_task(monitor())
+    start_time = time.perf_counter()
+    await asyncio.gather(*(extract(doc_id, name, html) for doc_id, (name, html) in enumerate(pages, 1)))
+    elapsed = time.perf_counter() - start_time
+    done = True
+    await watcher
+    if executor is not None:
+        executor.shutdown()
+    return elapsed, lag
+
+
+def main():
+    """Сравнение разбора HTML в цикле событий и в пуле процессов на сохранённых страницах"""
+    parser = argparse.ArgumentParser(description='Бенчмарк извлечения текста из HTML')
+    parser.add_argument('--dir', required=True, help='Каталог с сохранёнными HTML-файлами')
+    parser.add_argument('--limit', type=int, default=1000, help='Максимальное количество страниц')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Количество процессов')
+    args = parser.parse_args()
+
+    pages = read_pages(args.dir, args.limit)
+    if not pages:
+        logger.error(f"В каталоге {args.dir} нет HTML-файлов")
+        return
+    size = sum(len(html) for _, html in pages) / 1024 / 1024
+    logger.info(f"{len(pages)} страниц, {size:.1f} МБ; lxml {'доступен' if HAS_LXML else 'не установлен'}")
+
+    parsers = PARSERS if HAS_LXML else (DEFAULT_PARSER,)
+    for html_parser in parsers:
+        for workers in (0, args.workers):
+            elapsed, lag = asyncio.run(extract_all(pages, html_parser, workers))
+            where = f"{workers} процессов" if workers else "цикл событий"
+            logger.info(f"{html_parser:<12} {where:<15}: {elapsed:.2f} с, {len(pages) / elapsed:.0f} стр/с, "
+                        f"задержка цикла событий до {lag * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
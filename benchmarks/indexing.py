@@ -0,0 +1,55 @@
+import argparse
+import os
+import random
+import time
+
+from src.core.document import Document
+from src.core.index import InvertedIndex
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+VOCABULARY = [
+    "ректор", "университета", "приёмная", "комиссия", "расписание", "занятий", "стипендии",
+    "общежития", "факультет", "кафедры", "студенты", "преподаватели", "экзамены", "конференция",
+    "исследования", "лаборатории", "библиотека", "магистратура", "аспирантура", "олимпиада",
+]
+
+
+def synthetic_documents(num_docs: int, words_per_doc: int, seed: int = 42) -> list[Document]:
+    """Синтетический корпус из русских слов: нагрузка на токенизатор и стеммер"""
+    rng = random.Random(seed)
+    return [
+        Document(doc_id, " ".join(rng.choice(VOCABULARY) + rng.choice(["", "ами", "ов", "ой"])
+                                  for _ in range(words_per_doc)))
+        for doc_id in range(1, num_docs + 1)
+    ]
+
+
+def build(documents: list[Document], method: str, workers: int) -> tuple[InvertedIndex, float]:
+    index = InvertedIndex(compression_method=method)
+    start_time = time.perf_counter()
+    index.add_documents(documents, workers=workers)
+    return index, time.perf_counter() - start_time
+
+
+def main():
+    """Сравнение последовательной и многопроцессной индексации"""
+    parser = argparse.ArgumentParser(description='Бенчмарк параллельной индексации')
+    parser.add_argument('--docs', type=int, default=5000, help='Количество документов')
+    parser.add_argument('--words', type=int, default=300, help='Слов в документе')
+    parser.add_argument('--compression', default='gamma', help='Метод сжатия')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Количество процессов')
+    args = parser.parse_args()
+
+    documents = synthetic_documents(args.docs, args.words)
+    serial, serial_time = build(documents, args.compression, 1)
+    parallel, parallel_time = build(documents, args.compression, args.workers)
+
+    assert serial.index == parallel.index, "Параллельное построение должно совпадать с последовательным"
+    logger.info(f"Последовательно: {serial_time:.2f} с, {args.workers} процессов: {parallel_time:.2f} с, "
+                f"ускорение {serial_time / parallel_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
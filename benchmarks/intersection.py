@@ -0,0 +1,73 @@
+import argparse
+import random
+import time
+
+from src.core.document import Document
+from src.core.index import InvertedIndex
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SplitAnalyzer:
+    """Анализатор без NLTK: термины заданы готовыми словами"""
+
+    def analyze(self, text: str) -> list[str]:
+        return text.split()
+
+
+def build_synthetic_index(num_docs: int, method: str, seed: int = 42) -> InvertedIndex:
+    """Синтетический корпус: частые, средние и редкие термины"""
+    rng = random.Random(seed)
+    frequencies = {"common": 0.9, "frequent": 0.3, "medium": 0.05, "rare": 0.001}
+    index = InvertedIndex(compression_method=method, analyzer=SplitAnalyzer())
+    index.add_documents(
+        Document(doc_id, " ".join(term for term, p in frequencies.items() if rng.random() < p))
+        for doc_id in range(1, num_docs + 1)
+    )
+    return index
+
+
+def set_intersection(index: InvertedIndex, terms: list[str]) -> list[int]:
+    """Прежний подход: множество на каждый термин запроса, пересечение в порядке запроса"""
+    postings_sets = [set(index._decode_postings(index.index[term])) for term in terms]
+    result_ids = set(postings_sets[0])
+    for s in postings_sets[1:]:
+        result_ids.intersection_update(s)
+    return sorted(result_ids)
+
+
+def measure(func, repeats: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start_time) / repeats
+
+
+def main():
+    """Микробенчмарк пересечения списков: множества против адаптивного исполнителя"""
+    parser = argparse.ArgumentParser(description='Бенчмарк пересечения списков документов')
+    parser.add_argument('--docs', type=int, default=40000, help='Количество документов')
+    parser.add_argument('--compression', default='gamma', help='Метод сжатия')
+    parser.add_argument('--repeats', type=int, default=20, help='Повторов на запрос')
+    args = parser.parse_args()
+
+    index = build_synthetic_index(args.docs, args.compression)
+    queries = [
+        ["rare", "common"],
+        ["medium", "frequent"],
+        ["frequent", "common"],
+        ["common", "frequent", "medium", "rare"],
+        ["common", "common", "rare"],
+    ]
+
+    for terms in queries:
+        assert set_intersection(index, terms) == index.executor.conjunctive(terms)
+        baseline = measure(lambda: set_intersection(index, terms), args.repeats)
+        adaptive = measure(lambda: index.executor.conjunctive(terms), args.repeats)
+        logger.info(f"{' '.join(terms)}: множества {baseline * 1000:.2f} мс, "
+                    f"исполнитель {adaptive * 1000:.2f} мс, ускорение {baseline / adaptive:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
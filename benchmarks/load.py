@@ -0,0 +1,91 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_QUERIES = ["ректор", "приём", "расписание", "ректор университета", "стипендия", "общежитие"]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class LoadGenerator:
+    """Генератор нагрузки: несколько потоков с постоянными HTTP-соединениями"""
+
+    def __init__(self, url: str, queries: list[str], top: int = 10, mode: str = 'and', batch: int = 1):
+        address = urlparse(url)
+        self.host = address.hostname
+        self.port = address.port or 80
+        self.queries = queries
+        self.top = top
+        self.mode = mode
+        self.batch = batch
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if not hasattr(self._local, "connection"):
+            self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return self._local.connection
+
+    def request(self, i: int) -> float:
+        """Один HTTP-запрос (пакет из batch поисковых запросов); возвращает задержку"""
+        queries = [self.queries[(i * self.batch + j) % len(self.queries)] for j in range(self.batch)]
+        body = json.dumps({"queries": queries, "top": self.top, "mode": self.mode}).encode("utf-8")
+
+        start_time = time.perf_counter()
+        connection = self._connection()
+        connection.request("POST", "/search", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"Сервер ответил {response.status}")
+        return time.perf_counter() - start_time
+
+    def run(self, requests: int, concurrency: int) -> dict:
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(self.request, range(requests)))
+        elapsed = time.perf_counter() - start_time
+        return {
+            "requests": requests,
+            "queries_per_second": requests * self.batch / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+
+
+def main():
+    """Нагрузочный тест сервера поиска (searcher.py --serve)"""
+    parser = argparse.ArgumentParser(description='Генератор нагрузки для сервера поиска')
+    parser.add_argument('--url', default='http://127.0.0.1:8080', help='Адрес сервера')
+    parser.add_argument('--queries', help='Файл с запросами, по одному в строке')
+    parser.add_argument('--requests', type=int, default=2000, help='Количество HTTP-запросов')
+    parser.add_argument('--concurrency', type=int, default=8, help='Количество параллельных клиентов')
+    parser.add_argument('--batch', type=int, default=1, help='Поисковых запросов в одном HTTP-запросе')
+    parser.add_argument('--top', type=int, default=10, help='Количество результатов')
+    parser.add_argument('--mode', choices=['and', 'or'], default='and', help='Режим поиска')
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    generator = LoadGenerator(args.url, queries, args.top, args.mode, args.batch)
+    stats = generator.run(args.requests, args.concurrency)
+    logger.info(f"{stats['requests']} запросов: {stats['queries_per_second']:.0f} запросов/с, "
+                f"p50 {stats['p50_ms']:.2f} мс, p95 {stats['p95_ms']:.2f} мс, p99 {stats['p99_ms']:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
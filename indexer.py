@@ -1,31 +1,122 @@
 import argparse
+import asyncio
 import base64
 import json
-
-from load_documents import load_documents_from_urls
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from load_documents import (add_crawl_arguments, cache_from_args, load_documents_from_urls,
+                            scheduler_from_args, stream_documents_from_urls)
+from searcher import load_index
+from src.compression.codecs import available_methods
+from src.core.builder import IndexBuilder
 from src.core.document import Document
 from src.core.index import InvertedIndex
+from src.core.parallel import ParallelIndexBuilder
+from src.crawl.cache import CrawlCache
+from src.crawl.scheduler import CrawlScheduler
+from src.storage.docstore import STORED_COMPRESSION
+from src.storage.segment import write_segment
+from src.storage.segmented import SegmentedIndex
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-def build_index(urls_file: str, compression_method: str) -> InvertedIndex:
-    """Загружает документы и строит индекс с выбранным сжатием"""
-    documents = load_documents_from_urls(urls_file)
-    index = InvertedIndex(compression_method=compression_method)
-
-    for doc in documents:
-        try:
-            index.add_document(Document(doc['doc_id'], doc['text'], doc['metadata']))
-        except Exception as e:
-            logger.debug(f"Ошибка добавления документа {doc['doc_id']}: {str(e)}")
-
+async def index_stream(documents: AsyncIterator[Dict], add_document: Callable[[Dict], object]) -> int:
+    """
+    Индексация документов по мере загрузки; возвращает число проиндексированных.
+
+    add_document выполняется в отдельном потоке, чтобы цикл событий продолжал
+    загрузку страниц во время анализа текста. Следующий документ берётся из очереди
+    только после индексации предыдущего — так загрузка притормаживается,
+    когда индексация отстаёт.
+    """
+    loop = asyncio.get_running_loop()
+    count = 0
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        async for doc in documents:
+            try:
+                await loop.run_in_executor(executor, add_document, doc)
+                count += 1
+            except Exception as e:
+                logger.debug(f"Ошибка добавления документа {doc['doc_id']}: {str(e)}")
+    return count
+
+
+def build_index(urls_file: str, compression_method: str, workers: int = 1,
+                extract_workers: Optional[int] = None, cache: Optional[CrawlCache] = None,
+                scheduler: Optional[CrawlScheduler] = None, positions: bool = False) -> InvertedIndex:
+    """
+    Загружает документы и строит индекс с выбранным сжатием. При workers == 1 индексация
+    идёт параллельно с загрузкой; workers > 1 — анализ в нескольких процессах после загрузки.
+    extract_workers — число процессов для разбора HTML (None — по числу ядер),
+    cache — кэш загруженных страниц, scheduler — планировщик запросов загрузчика,
+    positions — хранить позиции терминов для фраз и NEAR.
+    """
+    index = InvertedIndex(compression_method=compression_method, positions=positions)
+
+    if workers > 1:
+        valid = []
+        for doc in load_documents_from_urls(urls_file, extract_workers=extract_workers, cache=cache,
+                                            scheduler=scheduler):
+            try:
+                valid.append(Document(doc['doc_id'], doc['text'], doc['metadata']))
+            except Exception as e:
+                logger.debug(f"Ошибка добавления документа {doc['doc_id']}: {str(e)}")
+        return ParallelIndexBuilder(index, workers).build(valid)
+
+    builder = IndexBuilder(index)
+    asyncio.run(index_stream(
+        stream_documents_from_urls(urls_file, extract_workers=extract_workers, cache=cache, scheduler=scheduler),
+        lambda doc: builder.add_document(Document(doc['doc_id'], doc['text'], doc['metadata'])),
+    ))
+    return builder.finalize()
+
+
+def update_index(index_path: str, urls_file: str, compression_method: str,
+                 removed_urls: list[str] = (), extract_workers: Optional[int] = None,
+                 cache: Optional[CrawlCache] = None, scheduler: Optional[CrawlScheduler] = None,
+                 positions: bool = False) -> SegmentedIndex:
+    """
+    Обновление составного индекса без полной переиндексации: страница с уже известным
+    URL заменяет прежнюю версию, новые страницы получают новые ID. С кэшем загрузки
+    проиндексированные страницы с прежним содержимым не разбираются и не переиндексируются.
+    positions задаёт хранение позиций только для нового индекса: существующий сохраняет свой режим
+    """
+    index = SegmentedIndex(index_path, compression_method=compression_method, positions=positions)
+    ids = {index.documents.metadata(doc_id).get('url'): doc_id for doc_id in index.documents}
+    next_id = max(index.documents, default=0) + 1
+
+    for url in removed_urls:
+        if url in ids:
+            index.delete_document(ids.pop(url))
+
+    def add_document(doc: Dict) -> None:
+        nonlocal next_id
+        url = doc['metadata'].get('url')
+        doc_id = ids.get(url)
+        if doc_id is None:
+            doc_id = ids[url] = next_id
+            next_id += 1
+        index.add_document(Document(doc_id, doc['text'], doc['metadata']))
+
+    asyncio.run(index_stream(
+        stream_documents_from_urls(urls_file, extract_workers=extract_workers, cache=cache, indexed_urls=ids,
+                                   scheduler=scheduler),
+        add_document,
+    ))
+    index.close()
     return index
 
 
-def save_index(index: InvertedIndex, path: str) -> None:
-    """Сохранение индекса в JSON с кодированием бинарных данных"""
+def save_index(index: InvertedIndex, path: str, index_format: str = 'segment',
+               stored_compression: str = 'zlib') -> None:
+    """Сохранение индекса: бинарный сегмент (каталог) или JSON старого формата"""
+    if index_format == 'segment':
+        write_segment(index, path, stored_compression)
+        return
+
     # Преобразуем бинарные данные в base64
     index_data = {
         "index": {
@@ -41,8 +132,17 @@ def save_index(index: InvertedIndex, path: str) -> None:
             for doc_id, doc in index.documents.items()
         },
         "compression_method": index.compression_method,
-        "term_frequencies": index.term_frequencies
+        "block_size": index.block_size,
+        "doc_lengths": index.doc_lengths,
+        "idf": index.idf,
+        "max_scores": index.max_scores,
+        "bm25": {"k1": index.scorer.k1, "b": index.scorer.b}
     }
+    if index.positions is not None:
+        index_data["positions"] = {
+            term: base64.b64encode(bytes(data)).decode("utf-8")
+            for term, data in index.positions.items()
+        }
 
     with open(path, "w", encoding="utf-8") as f:
         json.dump(index_data, f, indent=2, ensure_ascii=False)
@@ -51,17 +151,54 @@ def save_index(index: InvertedIndex, path: str) -> None:
 def main():
     """Точка входа для скрипта индексации"""
     parser = argparse.ArgumentParser(description='Индексатор документов')
-    parser.add_argument('--input', required=True, help='Файл со списком URL')
-    parser.add_argument('--output', required=True, help='Файл для сохранения индекса')
-    parser.add_argument('--compression', choices=['none', 'gamma', 'delta'],
-                        default='none', help='Метод сжатия (gamma/delta)')
+    parser.add_argument('--input', help='Файл со списком URL')
+    parser.add_argument('--output', required=True, help='Каталог (или JSON-файл) для сохранения индекса')
+    parser.add_argument('--compression', choices=available_methods(),
+                        default='none', help='Метод сжатия (gamma/delta/vbyte/simple8b/pfor)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Количество процессов для анализа текста')
+    parser.add_argument('--extract-workers', type=int,
+                        help='Количество процессов для разбора HTML (по умолчанию — по числу ядер)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Обновить составной индекс в каталоге --output вместо полной переиндексации')
+    parser.add_argument('--remove', help='Файл с URL страниц, удаляемых из составного индекса')
+    parser.add_argument('--format', choices=['segment', 'json'], default='segment',
+                        help='Бинарный сегмент с mmap или JSON старого формата')
+    parser.add_argument('--store-compression', choices=STORED_COMPRESSION, default='zlib',
+                        help='Сжатие текста документов в сегменте')
+    parser.add_argument('--positions', action='store_true',
+                        help='Хранить позиции терминов для поиска фраз и NEAR/k')
+    parser.add_argument('--migrate', metavar='JSON',
+                        help='Перевести JSON-индекс старого формата и сохранить его в --output')
+    add_crawl_arguments(parser)
     args = parser.parse_args()
+    if not args.input and not args.migrate:
+        parser.error('Требуется --input (или --migrate)')
 
     try:
+        if args.migrate:
+            save_index(load_index(args.migrate), args.output, args.format, args.store_compression)
+            logger.info(f"Индекс {args.migrate} сохранён в новом формате в {args.output}")
+            return
+
+        cache = cache_from_args(args)
+        scheduler = scheduler_from_args(args)
+        if args.incremental:
+            removed_urls = []
+            if args.remove:
+                with open(args.remove, 'r', encoding='utf-8') as f:
+                    removed_urls = [line.strip() for line in f if line.strip()]
+            index = update_index(args.output, args.input, args.compression, removed_urls,
+                                 args.extract_workers, cache, scheduler, args.positions)
+            logger.info(f"Индекс {args.output} обновлён: {len(index.documents)} документов, "
+                        f"{len(index.segments)} сегментов")
+            return
+
         logger.info(f"Начало индексации с методом сжатия: {args.compression}")
-        index = build_index(args.input, args.compression)
+        index = build_index(args.input, args.compression, args.workers, args.extract_workers,
+                            cache, scheduler, args.positions)
 
-        save_index(index, args.output)
+        save_index(index, args.output, args.format, args.store_compression)
 
         logger.info(f"Индекс успешно сохранён в {args.output}")
 
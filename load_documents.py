@@ -1,29 +1,83 @@
+import argparse
 import asyncio
-from typing import List, Dict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Callable, Container, List, Dict, Optional, Tuple
 
 import aiohttp
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
+from src.crawl.cache import DEFAULT_CACHE_DIR, CrawlCache
+from src.crawl.scheduler import DEFAULT_MAX_CONCURRENCY, DEFAULT_PER_HOST, DEFAULT_RETRIES, CrawlScheduler
 from src.utils.logger import get_logger
 
+try:
+    import lxml
+except ImportError:  # lxml необязателен: без него используется встроенный html.parser
+    lxml = None
+
 logger = get_logger(__name__)
 
+HAS_LXML = lxml is not None
+PARSERS = ('html.parser', 'lxml')
+DEFAULT_PARSER = 'lxml' if HAS_LXML else 'html.parser'
+DEFAULT_QUEUE_SIZE = 100  # Загруженных, но ещё не проиндексированных документов
+BINARY_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.doc', '.docx', '.xls', '.xlsx')
+
+
+def add_crawl_arguments(parser: argparse.ArgumentParser) -> None:
+    """Аргументы командной строки для кэша и планировщика загрузки"""
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Каталог кэша загруженных страниц')
+    parser.add_argument('--no-cache', action='store_true', help='Загружать страницы без кэша')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--offline', action='store_true',
+                      help='Использовать только сохранённые страницы, не обращаясь к сети')
+    mode.add_argument('--refresh', action='store_true',
+                      help='Перепроверить сохранённые страницы условными запросами')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help='Наибольшее число одновременных запросов (фактическое подбирается по задержке)')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help='Наибольшее число одновременных запросов к одному хосту')
+    parser.add_argument('--host-rate', type=float, help='Наибольшее число запросов в секунду к одному хосту')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help='Число повторов при сетевых ошибках и ответах 429/5xx')
+
+
+def cache_from_args(args: argparse.Namespace) -> Optional[CrawlCache]:
+    """Кэш загрузки по аргументам из add_crawl_arguments"""
+    if args.no_cache:
+        return None
+    mode = 'offline' if args.offline else 'refresh' if args.refresh else 'cached'
+    return CrawlCache(args.cache_dir, mode)
+
 
-def load_documents_from_urls(file_path: str, max_docs: int = 40000) -> List[Dict]:
+def scheduler_from_args(args: argparse.Namespace) -> CrawlScheduler:
+    """Планировщик загрузки по аргументам из add_crawl_arguments"""
+    return CrawlScheduler(args.concurrency, args.per_host, args.host_rate, args.retries)
+
+
+def read_urls(file_path: str, max_docs: int = 40000) -> List[str]:
+    """Чтение списка URL-адресов из файла (первое поле каждой строки)"""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+
+    logger.info(f"Найдено {len(lines)} URL-адресов в файле {file_path}")
+    return [line.strip().split()[0] for line in lines[:max_docs] if line.strip()]
+
+
+def load_documents_from_urls(file_path: str, max_docs: int = 40000, extract_workers: Optional[int] = None,
+                             cache: Optional[CrawlCache] = None,
+                             scheduler: Optional[CrawlScheduler] = None) -> List[Dict]:
     """
     Асинхронная загрузка документов из URL-адресов, указанных в файле
     """
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-
-        logger.info(f"Найдено {len(lines)} URL-адресов в файле {file_path}")
-        urls = [line.strip().split()[0] for line in lines[:max_docs]]
+        urls = read_urls(file_path, max_docs)
 
         # Запуск асинхронной обработки
         loop = asyncio.get_event_loop()
-        documents = loop.run_until_complete(process_batch(urls))
+        documents = loop.run_until_complete(process_batch(urls, extract_workers=extract_workers, cache=cache,
+                                                               scheduler=scheduler))
 
         logger.info(f"Успешно загружено {len(documents)} документов")
         return documents
@@ -33,62 +87,189 @@ def load_documents_from_urls(file_path: str, max_docs: int = 40000) -> List[Dict
         raise
 
 
-async def process_batch(urls: List[str], max_workers: int = 10) -> List[Dict]:
+async def process_batch(urls: List[str], max_workers: int = DEFAULT_MAX_CONCURRENCY,
+                        extract_workers: Optional[int] = None, cache: Optional[CrawlCache] = None,
+                        scheduler: Optional[CrawlScheduler] = None) -> List[Dict]:
     """Обработка пакета URL-адресов с ограниченной параллельностью"""
-    connector = aiohttp.TCPConnector(limit=max_workers)
+    results = []
+    with tqdm(total=len(urls), desc="Обработка URL-адресов") as progress:
+        async for document in stream_documents(urls, max_workers, extract_workers=extract_workers,
+                                               cache=cache, scheduler=scheduler, progress=progress.update):
+            results.append(document)
+    return results
+
+
+async def stream_documents(urls: List[str], max_workers: int = DEFAULT_MAX_CONCURRENCY,
+                           queue_size: int = DEFAULT_QUEUE_SIZE,
+                           extract_workers: Optional[int] = None, parser: str = DEFAULT_PARSER,
+                           cache: Optional[CrawlCache] = None, indexed_urls: Container[str] = (),
+                           scheduler: Optional[CrawlScheduler] = None,
+                           progress: Optional[Callable[[int], object]] = None) -> AsyncIterator[Dict]:
+    """
+    Асинхронный генератор документов в порядке готовности.
+
+    Загрузчики берут URL по одному и складывают документы в ограниченную очередь:
+    если потребитель (индексация) отстаёт, очередь заполняется и загрузка
+    приостанавливается, поэтому в памяти не больше queue_size документов.
+    Разбор HTML выполняется в пуле из extract_workers процессов (None — по числу ядер,
+    0 — в цикле событий).
+
+    С кэшем страницы читаются и сохраняются через него; страницы из indexed_urls,
+    содержимое которых не изменилось, пропускаются без разбора.
+
+    Запросы проходят через планировщик (по умолчанию — с пределом max_workers),
+    который ограничивает нагрузку на хосты и повторяет неудачные запросы.
+    Задачи создаются по числу загрузчиков, а не по числу URL.
+    """
+    scheduler = scheduler or CrawlScheduler(max_concurrency=max_workers)
+    max_workers = scheduler.max_concurrency
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    pending = iter(enumerate(urls, 1))  # Общий итератор: каждый URL достаётся одному загрузчику
+    connector = aiohttp.TCPConnector(limit=max_workers, limit_per_host=scheduler.per_host)
+    executor = ProcessPoolExecutor(max_workers=extract_workers) if extract_workers != 0 else None
+
     async with aiohttp.ClientSession(connector=connector) as session:
-        tasks = []
-        for doc_id, url in enumerate(urls, 1):
-            tasks.append(fetch_and_process(session, url, doc_id))
+        async def fetch_worker():
+            for doc_id, url in pending:
+                result = await fetch_and_process(session, url, doc_id, executor=executor, parser=parser,
+                                                 cache=cache, indexed_urls=indexed_urls, scheduler=scheduler)
+                if progress:
+                    progress(1)
+                if result:
+                    await queue.put(result)
 
-        results = []
-        for future in tqdm(asyncio.as_completed(tasks), total=len(urls), desc="Обработка URL-адресов"):
-            result = await future
-            if result:
-                results.append(result)
-        return results
+        async def close_queue():
+            await asyncio.gather(*workers)
+            await queue.put(None)
 
+        workers = [asyncio.create_task(fetch_worker()) for _ in range(max_workers)]
+        closer = asyncio.create_task(close_queue())
+        try:
+            while (document := await queue.get()) is not None:
+                yield document
+        finally:
+            # Потребитель мог остановиться раньше: незавершённые загрузки отменяются
+            for task in [*workers, closer]:
+                task.cancel()
+            await asyncio.gather(*workers, closer, return_exceptions=True)
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
 
-async def fetch_and_process(session: aiohttp.ClientSession, url: str, doc_id: int) -> Dict:
-    """Загрузка и обработка одного URL-адреса"""
-    try:
-        # Пропуск бинарных файлов
-        if any(url.lower().endswith(ext) for ext in
-               ['.pdf', '.jpg', '.jpeg', '.png', '.doc', '.docx', '.xls', '.xlsx']):
-            logger.debug(f"Пропуск бинарного файла: {url}")
+
+async def stream_documents_from_urls(file_path: str, max_docs: int = 40000,
+                                     max_workers: int = DEFAULT_MAX_CONCURRENCY,
+                                     queue_size: int = DEFAULT_QUEUE_SIZE, extract_workers: Optional[int] = None,
+                                     cache: Optional[CrawlCache] = None, indexed_urls: Container[str] = (),
+                                     scheduler: Optional[CrawlScheduler] = None) -> AsyncIterator[Dict]:
+    """Потоковая загрузка документов из URL-адресов, указанных в файле"""
+    urls = read_urls(file_path, max_docs)
+    scheduler = scheduler or CrawlScheduler(max_concurrency=max_workers)
+    count = 0
+    with tqdm(total=len(urls), desc="Обработка URL-адресов") as progress:
+        async for document in stream_documents(urls, max_workers, queue_size, extract_workers, cache=cache,
+                                               indexed_urls=indexed_urls, scheduler=scheduler,
+                                               progress=progress.update):
+            count += 1
+            yield document
+    logger.info(f"Успешно загружено {count} документов")
+    report = scheduler.report()
+    logger.info(f"Загрузка: {report['pages_per_second']:.1f} стр/с, {report['bytes_per_second'] / 1024:.0f} КБ/с, "
+                f"повторов {report['retries']}, неудачных URL {report['failed']}, "
+                f"итоговый предел одновременных запросов {report['concurrency']:.1f}")
+    if cache is not None:
+        logger.info(f"Кэш загрузки: {cache.cache_info()}")
+
+
+def extract_document(html: str, url: str, doc_id: int, parser: str = DEFAULT_PARSER) -> Dict:
+    """
+    Извлечение текста и заголовка из HTML (выполняется в процессе пула:
+    разбор занимает процессор и не должен блокировать цикл событий)
+    """
+    soup = BeautifulSoup(html, parser)
+
+    # Удаление ненужных элементов
+    for element in soup(['script', 'style', 'nav', 'footer']):
+        element.decompose()
+
+    text = soup.get_text(separator=' ', strip=True)
+    title = soup.title.string if soup.title else url
+
+    return {
+        'doc_id': doc_id,
+        'text': text,
+        'metadata': {
+            'title': str(title) if title is not None else None,  # NavigableString не передаётся между процессами
+            'source': 'spbu.ru',
+            'url': url
+        }
+    }
+
+
+async def fetch_page(session: aiohttp.ClientSession, url: str, cache: Optional[CrawlCache] = None,
+                     scheduler: Optional[CrawlScheduler] = None) -> Optional[Tuple[Optional[str], bool]]:
+    """
+    HTML страницы и признак изменения содержимого; None — страница недоступна.
+    HTML равен None, если страница не изменилась и её нужно прочитать из кэша.
+    """
+    entry = cache.entry(url) if cache is not None else None
+    if cache is not None and cache.mode != 'refresh':
+        if entry is not None:
+            cache.hits += 1
+            return None, False
+        if cache.mode == 'offline':
+            cache.misses += 1
             return None
 
-        async with session.get(url, timeout=10) as response:
-            # Пропуск ответов с ошибками
-            if response.status != 200:
-                logger.debug(f"Пропуск URL с HTTP {response.status}: {url}")
-                return None
+    async def handle(response: aiohttp.ClientResponse) -> Optional[Tuple[Optional[str], bool]]:
+        if response.status == 304 and entry is not None:
+            cache.revalidated(entry, response.headers)
+            return None, False
 
-            content_type = response.headers.get('Content-Type', '')
-            if 'text/html' not in content_type:
-                logger.debug(f"Пропуск не-HTML контента: {url} ({content_type})")
-                return None
+        # Пропуск ответов с ошибками
+        if response.status != 200:
+            logger.debug(f"Пропуск URL с HTTP {response.status}: {url}")
+            return None
 
-            html = await response.text()
+        content_type = response.headers.get('Content-Type', '')
+        if 'text/html' not in content_type:
+            logger.debug(f"Пропуск не-HTML контента: {url} ({content_type})")
+            return None
 
-        soup = BeautifulSoup(html, 'html.parser')
+        html = await response.text()
+        changed = cache.store(url, html, response.headers) if cache is not None else True
+        return html, changed
 
-        # Удаление ненужных элементов
-        for element in soup(['script', 'style', 'nav', 'footer']):
-            element.decompose()
+    headers = cache.conditional_headers(entry) if cache is not None else {}
+    return await (scheduler or CrawlScheduler()).fetch(session, url, handle, headers)
 
-        text = soup.get_text(separator=' ', strip=True)
-        title = soup.title.string if soup.title else url
 
-        return {
-            'doc_id': doc_id,
-            'text': text,
-            'metadata': {
-                'title': title,
-                'source': 'spbu.ru',
-                'url': url
-            }
-        }
+async def fetch_and_process(session: aiohttp.ClientSession, url: str, doc_id: int,
+                            executor: Optional[Executor] = None, parser: str = DEFAULT_PARSER,
+                            cache: Optional[CrawlCache] = None, indexed_urls: Container[str] = (),
+                            scheduler: Optional[CrawlScheduler] = None) -> Dict:
+    """Загрузка одного URL-адреса и разбор страницы в executor (без него — в цикле событий)"""
+    try:
+        # Пропуск бинарных файлов
+        if url.lower().endswith(BINARY_EXTENSIONS):
+            logger.debug(f"Пропуск бинарного файла: {url}")
+            return None
+
+        page = await fetch_page(session, url, cache, scheduler)
+        if page is None:
+            return None
+        html, changed = page
+        if not changed and url in indexed_urls:
+            logger.debug(f"Страница не изменилась: {url}")
+            return None
+        if html is None:
+            html = cache.load(cache.entry(url))
+            if html is None:
+                return None
+
+        if executor is None:
+            return extract_document(html, url, doc_id, parser)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, extract_document, html, url, doc_id, parser)
 
     except Exception as e:
         logger.debug(f"Ошибка обработки {url}: {str(e)}")
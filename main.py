@@ -1,7 +1,10 @@
+import argparse
 import os.path
 import time
 
-from load_documents import load_documents_from_urls
+from load_documents import add_crawl_arguments, cache_from_args, load_documents_from_urls, scheduler_from_args
+from src.compression.codecs import available_methods
+from src.core.builder import IndexBuilder
 from src.core.document import Document
 from src.core.index import InvertedIndex
 from src.utils.logger import get_logger
@@ -11,36 +14,42 @@ logger = get_logger(__name__)
 
 def main():
     """Сравнение производительности индекса со сжатием и без"""
+    parser = argparse.ArgumentParser(description='Сравнение методов сжатия индекса')
+    add_crawl_arguments(parser)
+    args = parser.parse_args()
+
     try:
         logger.info("Запуск тестирования производительности индекса")
 
         # Загрузка документов
         logger.info("Загрузка документов из файла URLs...")
-        documents = load_documents_from_urls(os.path.join("data", "internal_links.txt"))
+        documents = load_documents_from_urls(os.path.join("data", "internal_links.txt"),
+                                             cache=cache_from_args(args), scheduler=scheduler_from_args(args))
 
         if not documents:
             logger.error("Документы для тестирования не найдены")
             return
 
-        # Тестирование без сжатия
-        logger.info("Запуск теста БЕЗ сжатия...")
-        no_compression = run_indexation_test(documents, 'none')
-
-        # Тестирование со сжатием Gamma
-        logger.info("Запуск теста СО сжатием Gamma...")
-        gamma_compression = run_indexation_test(documents, 'gamma')
+        # Тестирование всех методов сжатия, включая вариант без сжатия
+        results = {}
+        for method in available_methods():
+            logger.info(f"Запуск теста с методом сжатия {method}...")
+            results[method] = run_indexation_test(documents, method)
 
         # Вывод результатов
         logger.info("\nРезультаты сравнения:")
-        print_results("Без сжатия", no_compression)
-        print_results("Gamma сжатие", gamma_compression)
-
-        # Расчёт коэффициентов
-        compression_ratio = no_compression['index_size'] / gamma_compression['index_size']
-        slowdown_factor = gamma_compression['indexing_time'] / no_compression['indexing_time']
-
-        logger.info(f"\nКоэффициент сжатия: {compression_ratio:.2f}x")
-        logger.info(f"Замедление индексации: {slowdown_factor:.2f}x")
+        for method, data in results.items():
+            print_results("Без сжатия" if method == 'none' else f"Сжатие {method}", data)
+
+        # Расчёт коэффициентов относительно индекса без сжатия
+        no_compression = results['none']
+        for method, data in results.items():
+            if method == 'none':
+                continue
+            compression_ratio = no_compression['index_size'] / data['index_size']
+            slowdown_factor = data['indexing_time'] / no_compression['indexing_time']
+            logger.info(f"\n{method}: коэффициент сжатия {compression_ratio:.2f}x, "
+                        f"замедление индексации {slowdown_factor:.2f}x")
 
     except Exception as e:
         logger.error(f"Ошибка тестирования: {str(e)}", exc_info=True)
@@ -49,37 +58,61 @@ def main():
 def run_indexation_test(documents: list[dict], method: str) -> dict:
     """Запуск одного теста индексации"""
     index = InvertedIndex(compression_method=method)
+    builder = IndexBuilder(index)
     start_time = time.time()
 
     # Индексация документов
     for doc in documents:
         try:
-            index.add_document(Document(doc['doc_id'], doc['text'], doc['metadata']))
+            builder.add_document(Document(doc['doc_id'], doc['text'], doc['metadata']))
         except Exception as e:
             logger.debug(f"Ошибка добавления документа {doc['doc_id']}: {str(e)}")
             continue
 
+    builder.finalize()
     indexing_time = time.time() - start_time
 
-    # Расчёт размера индекса
+    # Расчёт размера индекса (частоты хранятся в тех же списках и тоже учитываются)
     index_size = sum(
         len(term.encode('utf-8')) + len(encoded_postings)
         for term, encoded_postings in index.index.items()
     )
 
+    encode_throughput, decode_throughput = measure_codec_throughput(index)
+
     # Тест поиска
     search_start = time.time()
-    results = index.search("Ректор СПбГУ")
+    results = index.search("Ректор СПбГУ", k=None)  # Все найденные документы, а не только лучшие k
     search_time = time.time() - search_start
 
     return {
         'indexing_time': indexing_time,
         'index_size': index_size,
         'search_time': search_time,
-        'results_count': len(results)
+        'results_count': len(results),
+        'encode_throughput': encode_throughput,
+        'decode_throughput': decode_throughput
     }
 
 
+def measure_codec_throughput(index: InvertedIndex) -> tuple[float, float]:
+    """Пропускная способность кодирования и декодирования списков (ID в секунду)"""
+    postings = [index.postings_with_frequencies(term) for term in index.index]
+    total_ids = sum(len(doc_ids) for doc_ids, _ in postings)
+
+    start_time = time.perf_counter()
+    for doc_ids, frequencies in postings:
+        index._encode_postings(doc_ids, frequencies)
+    encode_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for encoded in index.index.values():
+        index._decode_postings_array(encoded)
+    decode_time = time.perf_counter() - start_time
+
+    return total_ids / max(encode_time, 1e-9), total_ids / max(decode_time, 1e-9)
+
+
 def print_results(label: str, data: dict):
     """Форматированный вывод результатов"""
     logger.info(f"\n{label}:")
@@ -87,6 +120,8 @@ def print_results(label: str, data: dict):
     logger.info(f"Размер индекса: {data['index_size'] / (1024 * 1024):.2f} МБ")
     logger.info(f"Время поиска: {data['search_time']:.4f} сек")
     logger.info(f"Найдено документов: {data['results_count']}")
+    logger.info(f"Кодирование: {data['encode_throughput'] / 1e6:.2f} млн ID/сек")
+    logger.info(f"Декодирование: {data['decode_throughput'] / 1e6:.2f} млн ID/сек")
 
 
 if __name__ == "__main__":
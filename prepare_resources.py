@@ -0,0 +1,28 @@
+import argparse
+
+from src.utils.logger import get_logger
+from src.utils.resources import ResourceManager
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Точка входа для подготовки ресурсов NLTK перед развёртыванием"""
+    parser = argparse.ArgumentParser(description='Подготовка ресурсов NLTK')
+    parser.add_argument('--data-dir', default=None, help='Каталог для данных NLTK')
+    args = parser.parse_args()
+
+    try:
+        manager = ResourceManager(args.data_dir)
+        downloaded = manager.prepare()
+
+        if downloaded:
+            logger.info(f"Загружены ресурсы: {', '.join(downloaded)}")
+        logger.info(f"Все ресурсы доступны в {manager.data_dir}")
+
+    except Exception as e:
+        logger.error(f"Ошибка подготовки ресурсов: {str(e)}", exc_info=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,34 @@
 import argparse
 import base64
 import json
+from typing import Union
 
 from src.core.document import Document
 from src.core.index import InvertedIndex
+from src.core.scoring import BM25
+from src.service.server import DEFAULT_RELOAD_INTERVAL, IndexHolder, create_server
+from src.storage.docstore import MemoryDocumentStore
+from src.storage.segment import is_segment, load_segment
+from src.storage.segmented import SegmentedIndex, is_segmented
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-def load_index(path: str) -> InvertedIndex:
-    """Загрузка индекса из JSON"""
+def load_index(path: str) -> Union[InvertedIndex, SegmentedIndex]:
+    """Загрузка индекса: сегменты открываются через mmap, JSON читается целиком"""
+    if is_segmented(path):
+        return SegmentedIndex(path, read_only=True)
+    if is_segment(path):
+        return load_segment(path)
+
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    index = InvertedIndex(compression_method=data["compression_method"])
+    # Индексы без поля block_size сохранены в старом формате без блоков
+    index = InvertedIndex(compression_method=data["compression_method"],
+                          block_size=data.get("block_size", 0),
+                          scorer=BM25(**data.get("bm25", {})))
 
     # Декодирование с учетом метода сжатия
     index.index = {
@@ -22,41 +36,115 @@ def load_index(path: str) -> InvertedIndex:
         for term, encoded_data in data["index"].items()
     }
 
+    if "positions" in data:
+        index.positions = {
+            term: base64.b64decode(encoded_data)
+            for term, encoded_data in data["positions"].items()
+        }
+
     # Восстановление документов
-    index.documents = {
+    index.documents = MemoryDocumentStore({
         int(doc_id): Document(
             doc_data["doc_id"],
             doc_data["text"],
             doc_data["metadata"]
         )
         for doc_id, doc_data in data["documents"].items()
-    }
-
-    index.term_frequencies = data["term_frequencies"]
+    })
+
+    if "term_frequencies" in data:
+        migrate_frequencies(index, data["term_frequencies"])
+
+    # Длины документов для BM25; в старых индексах восстанавливаются по частотам
+    if "doc_lengths" in data:
+        doc_lengths = {int(doc_id): length for doc_id, length in data["doc_lengths"].items()}
+    else:
+        doc_lengths = {doc_id: 0 for doc_id in index.documents}
+        for term in index.index:
+            for doc_id, count in zip(*index.postings_with_frequencies(term)):
+                doc_lengths[doc_id] = doc_lengths.get(doc_id, 0) + count
+    for doc_id, length in doc_lengths.items():
+        index._set_length(doc_id, length)
+
+    if "idf" in data:
+        index.idf = data["idf"]
+        index.max_scores = data.get("max_scores", {})
+    else:
+        index.compute_term_statistics()
     return index
 
 
-def search_in_index(index_path: str, query: str) -> list[Document]:
+def migrate_frequencies(index: InvertedIndex, term_frequencies: dict) -> None:
+    """
+    Перевод JSON-индекса старого формата, где частоты хранились отдельным словарём,
+    в списки с частотами внутри блоков
+    """
+    for term, encoded in index.index.items():
+        # Ключи JSON — строки, ID документов приводятся обратно к int
+        frequencies = {int(doc_id): count for doc_id, count in term_frequencies.get(term, {}).items()}
+        doc_ids = index._decode_legacy_postings(encoded)
+        index.index[term] = index._encode_postings(doc_ids, [frequencies.get(doc_id, 1) for doc_id in doc_ids])
+    logger.info(f"Индекс старого формата переведён на частоты внутри списков: {len(index.index)} терминов")
+
+
+def search_in_index(index_path: str, query: str, top: int = 10, mode: str = 'and') -> list[Document]:
     """Выполняет поиск в сохранённом индексе"""
     index = load_index(index_path)
-    return index.search(query)
+    return index.search(query, k=top, mode=mode)
+
+
+def search_metadata(index_path: str, query: str, top: int = 10, mode: str = 'and') -> list[tuple[int, float, dict]]:
+    """Поиск без загрузки текста документов: (ID, оценка, метаданные)"""
+    index = load_index(index_path)
+    hits = index.search_scored(query, k=top, mode=mode)
+    return [(doc_id, score, index.documents.metadata(doc_id)) for doc_id, score in hits]
+
+
+def serve(index_path: str, host: str = "127.0.0.1", port: int = 8080, socket_path: str = None,
+          reload_interval: float = DEFAULT_RELOAD_INTERVAL) -> None:
+    """Режим сервера: индекс загружается один раз и перезагружается при изменении файла"""
+    holder = IndexHolder(index_path, load_index, reload_interval)
+    server = create_server(holder, host, port, socket_path)
+    logger.info(f"Сервер поиска слушает {socket_path or f'http://{host}:{port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Остановка сервера")
+    finally:
+        server.server_close()
 
 
 def main():
     """Точка входа для скрипта поиска"""
     parser = argparse.ArgumentParser(description='Поиск по индексу')
-    parser.add_argument('--index', required=True, help='Файл индекса')
-    parser.add_argument('--query', required=True, help='Поисковый запрос')
+    parser.add_argument('--index', required=True, help='Каталог сегмента или JSON-файл индекса')
+    parser.add_argument('--query', help='Поисковый запрос')
+    parser.add_argument('--top', type=int, default=10, help='Количество результатов')
+    parser.add_argument('--mode', choices=['and', 'or'], default='and',
+                        help='Все термины запроса (and) или любой из них (or)')
+    parser.add_argument('--serve', action='store_true', help='Запустить HTTP-сервер поиска')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес сервера')
+    parser.add_argument('--port', type=int, default=8080, help='Порт сервера')
+    parser.add_argument('--socket', help='Путь к Unix-сокету вместо TCP-порта')
+    parser.add_argument('--reload-interval', type=float, default=DEFAULT_RELOAD_INTERVAL,
+                        help='Период проверки изменения индекса в секундах')
     args = parser.parse_args()
 
+    if args.serve:
+        serve(args.index, args.host, args.port, args.socket, args.reload_interval)
+        return
+    if args.query is None:
+        parser.error("Требуется --query или --serve")
+
     try:
         logger.info(f"Поиск запроса: {args.query}")
-        results = search_in_index(args.index, args.query)
+        # Для вывода достаточно метаданных: текст страниц с диска не читается
+        results = search_metadata(args.index, args.query, args.top, args.mode)
 
         logger.info(f"Найдено документов: {len(results)}")
-        for doc in results:
-            logger.info(f"ID: {doc.doc_id} | Заголовок: {doc.metadata.get('title', '')}")
-            logger.info(f"URL: {doc.metadata.get('url', '')}\n")
+        for doc_id, score, metadata in results:
+            logger.info(f"ID: {doc_id} | Оценка: {score:.3f} | Заголовок: {metadata.get('title', '')}")
+            logger.info(f"URL: {metadata.get('url', '')}\n")
 
     except Exception as e:
         logger.error(f"Ошибка поиска: {str(e)}", exc_info=True)
@@ -0,0 +1,149 @@
+from . import vectorized
+from .vbyte import VByteEncoder
+from ..utils.exceptions import CompressionError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BLOCK_SIZE = 128  # Чисел в одном упакованном блоке
+
+
+def pack_fixed_width(values: list[int], width: int) -> bytes:
+    """Упаковка чисел фиксированной ширины (старшие биты вперёд) с выравниванием до байта"""
+    if width == 0 or not values:
+        return b""
+    packed = 0
+    for value in values:
+        packed = (packed << width) | value
+    bits = len(values) * width
+    padding = -bits & 7
+    return (packed << padding).to_bytes((bits + padding) >> 3, 'big')
+
+
+def choose_width(lengths: list[int]) -> int:
+    """Выбор ширины блока с минимальным размером с учётом исключений (PFor)"""
+    count = len(lengths)
+    histogram = [0] * 65
+    for length in lengths:
+        histogram[length] += 1
+
+    best_width = max(lengths)
+    best_cost = (count * best_width + 7) >> 3
+    exceptions = 0
+    # Перебор ширин сверху вниз: всё, что шире, становится исключением
+    for width in range(best_width - 1, -1, -1):
+        exceptions += histogram[width + 1]
+        # Позиция — 1 байт, старшая часть — в среднем около 1–2 байтов varint
+        cost = ((count * width + 7) >> 3) + exceptions * 3
+        if cost < best_cost:
+            best_width, best_cost = width, cost
+    return best_width
+
+
+class BitPackedEncoder:
+    """Блочный кодер: по 128 чисел фиксированной ширины с исключениями в стиле PFor"""
+
+    @staticmethod
+    def encode(numbers: list[int]) -> bytes:
+        """Пакетное кодирование: количество чисел, затем блоки [ширина, исключения, биты]"""
+        if not numbers:
+            return b""
+
+        if min(numbers) < 0:
+            logger.error(f"Для битовой упаковки требуются неотрицательные числа, получено: {min(numbers)}")
+            raise CompressionError("Число должно быть неотрицательным для битовой упаковки")
+
+        out = bytearray(VByteEncoder.encode([len(numbers)]))
+        for start in range(0, len(numbers), BLOCK_SIZE):
+            block = numbers[start: start + BLOCK_SIZE]
+            width = choose_width([n.bit_length() for n in block])
+
+            low_mask = (1 << width) - 1
+            positions = [i for i, n in enumerate(block) if n >> width]
+            out.append(width)
+            out.append(len(positions))
+            out += pack_fixed_width([n & low_mask for n in block], width)
+            out += bytes(positions)
+            out += VByteEncoder.encode([block[i] >> width for i in positions])
+
+        return bytes(out)
+
+    @staticmethod
+    def _blocks(byte_data: bytes):
+        """Разбор блоков: (ширина, количество, упакованные биты, позиции, старшие части)"""
+        total, offset = 0, 0
+        shift = 0
+        for offset, byte in enumerate(byte_data):
+            total |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                break
+            shift += 7
+        offset += 1
+
+        remaining = total
+        while remaining > 0:
+            count = min(BLOCK_SIZE, remaining)
+            width = byte_data[offset]
+            n_exceptions = byte_data[offset + 1]
+            offset += 2
+
+            packed_size = (count * width + 7) >> 3
+            packed = byte_data[offset: offset + packed_size]
+            offset += packed_size
+
+            positions = byte_data[offset: offset + n_exceptions]
+            offset += n_exceptions
+
+            highs = []
+            while len(highs) < n_exceptions:
+                value = 0
+                shift = 0
+                while True:
+                    byte = byte_data[offset]
+                    offset += 1
+                    value |= (byte & 0x7F) << shift
+                    if not byte & 0x80:
+                        break
+                    shift += 7
+                highs.append(value)
+
+            yield width, count, packed, positions, highs
+            remaining -= count
+
+    @staticmethod
+    def decode(byte_data: bytes) -> list[int]:
+        """Декодирование байтов в список чисел"""
+        if not byte_data:
+            return []
+
+        numbers = []
+        for width, count, packed, positions, highs in BitPackedEncoder._blocks(byte_data):
+            if width:
+                value = int.from_bytes(packed, 'big') >> (len(packed) * 8 - count * width)
+                mask = (1 << width) - 1
+                block = [(value >> ((count - 1 - i) * width)) & mask for i in range(count)]
+            else:
+                block = [0] * count
+            for position, high in zip(positions, highs):
+                block[position] |= high << width
+            numbers.extend(block)
+        return numbers
+
+    @staticmethod
+    def decode_array(byte_data: bytes):
+        """Векторное декодирование блоков в массив uint32"""
+        if not vectorized.HAS_NUMPY:
+            return BitPackedEncoder.decode(byte_data)
+        np = vectorized.np
+        if not byte_data:
+            return np.zeros(0, dtype=np.uint32)
+
+        blocks = []
+        for width, count, packed, positions, highs in BitPackedEncoder._blocks(byte_data):
+            block = vectorized.unpack_fixed_width(packed, width, count).astype(np.uint32)
+            if positions:
+                block[np.frombuffer(positions, dtype=np.uint8)] |= (
+                    np.array(highs, dtype=np.uint32) << np.uint32(width)
+                )
+            blocks.append(block)
+        return np.concatenate(blocks)
@@ -0,0 +1,40 @@
+from .bitpacking import BitPackedEncoder
+from .elias import EliasDeltaEncoder, EliasGammaEncoder
+from .simple8b import Simple8bEncoder
+from .vbyte import VByteEncoder
+from ..utils.exceptions import CompressionError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Имя метода сжатия (как в заголовке индекса) -> кодер списков чисел
+CODECS = {
+    'gamma': EliasGammaEncoder,
+    'delta': EliasDeltaEncoder,
+    'vbyte': VByteEncoder,
+    'simple8b': Simple8bEncoder,
+    'pfor': BitPackedEncoder,
+}
+
+DEFAULT_CODEC = 'gamma'
+
+
+def register_codec(name: str, codec) -> None:
+    """Регистрация кодера: объект с методами encode(list[int]) и decode(bytes)"""
+    if name == 'none':
+        raise CompressionError("Имя 'none' зарезервировано для несжатого формата")
+    CODECS[name] = codec
+
+
+def get_codec(method: str):
+    """Кодер по имени метода сжатия (gamma по умолчанию)"""
+    codec = CODECS.get(method)
+    if codec is None:
+        logger.debug(f"Неизвестный метод сжатия '{method}', используется {DEFAULT_CODEC}")
+        codec = CODECS[DEFAULT_CODEC]
+    return codec
+
+
+def available_methods() -> list[str]:
+    """Все методы сжатия, доступные для выбора в CLI"""
+    return ['none'] + list(CODECS)
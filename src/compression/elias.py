@@ -5,6 +5,102 @@ from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Число ведущих нулей в байте (для нулевого байта — 8)
+LEADING_ZEROS = bytes(8 - value.bit_length() for value in range(256))
+
+# Порог сброса накопителя в байтовый буфер при кодировании
+_FLUSH_BITS = 64
+
+
+def _pack_codes(codes: list[tuple[int, int]]) -> bytes:
+    """Упаковка пар (значение, ширина в битах) в байты старшими битами вперёд"""
+    out = bytearray()
+    acc = 0
+    acc_bits = 0
+    for value, width in codes:
+        acc = (acc << width) | value
+        acc_bits += width
+        if acc_bits >= _FLUSH_BITS:
+            # Сброс целых байтов, остаток битов остаётся в накопителе
+            rest = acc_bits & 7
+            out += (acc >> rest).to_bytes((acc_bits - rest) >> 3, 'big')
+            acc &= (1 << rest) - 1
+            acc_bits = rest
+
+    if acc_bits:
+        # Выравнивание хвоста нулями до границы байта
+        padding = -acc_bits & 7
+        out += (acc << padding).to_bytes((acc_bits + padding) >> 3, 'big')
+    return bytes(out)
+
+
+class _BitReader:
+    """
+    Последовательное чтение битов из байтов через целочисленный накопитель.
+
+    Между вызовами в накопителе остаётся не больше 8 непрочитанных битов,
+    поэтому ведущие нули окна находятся одним обращением к таблице LEADING_ZEROS.
+    """
+
+    __slots__ = ("data", "pos", "acc", "acc_bits")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0  # Следующий непрочитанный байт
+        self.acc = 0  # Непрочитанные биты текущего окна
+        self.acc_bits = 0
+
+    def gamma(self) -> int:
+        """Чтение следующего гамма-кода; 0, если единиц в потоке больше нет"""
+        data = self.data
+        pos = self.pos
+        acc = self.acc
+        acc_bits = self.acc_bits
+
+        # Ведущие нули: пустые байты пропускаются целиком, остаток — по таблице
+        zeros = 0
+        while not acc:
+            zeros += acc_bits
+            if pos >= len(data):
+                self.pos = pos
+                self.acc_bits = 0
+                return 0
+            acc = data[pos]
+            pos += 1
+            acc_bits = 8
+        lz = LEADING_ZEROS[acc << (8 - acc_bits)]
+        zeros += lz
+        acc_bits -= lz
+
+        # Код занимает zeros + 1 бит, начиная с ведущей 1
+        width = zeros + 1
+        while acc_bits < width:
+            acc = (acc << 8) | (data[pos] if pos < len(data) else 0)  # Обрыв потока читается как нули
+            pos += 1
+            acc_bits += 8
+        acc_bits -= width
+        self.pos = pos
+        self.acc = acc & ((1 << acc_bits) - 1)
+        self.acc_bits = acc_bits
+        return acc >> acc_bits
+
+    def read(self, width: int) -> int:
+        """Чтение width битов как беззнакового числа"""
+        acc = self.acc
+        acc_bits = self.acc_bits
+        if acc_bits < width:
+            data = self.data
+            pos = self.pos
+            while acc_bits < width:
+                acc = (acc << 8) | (data[pos] if pos < len(data) else 0)  # Обрыв потока читается как нули
+                pos += 1
+                acc_bits += 8
+            self.pos = pos
+        acc_bits -= width
+        self.acc = acc & ((1 << acc_bits) - 1)
+        self.acc_bits = acc_bits
+        return acc >> acc_bits
+
 
 class EliasGammaEncoder:
     """Кодер Элиаса-Гамма для положительных целых чисел"""
@@ -25,22 +121,14 @@ class EliasGammaEncoder:
         if not numbers:
             return b""
 
-        bitstring = ""
+        codes = []
         for n in numbers:
-            bitstring += EliasGammaEncoder.encode_number(n)
-
-        # Выравнивание длины битовой строки до кратной 8
-        padding = 8 - len(bitstring) % 8
-        if padding != 8:
-            bitstring += "0" * padding
+            if n <= 0:
+                EliasGammaEncoder.encode_number(n)  # Единая обработка ошибки
+            # Код гаммы: (длина - 1) нулей и само число
+            codes.append((n, 2 * n.bit_length() - 1))
 
-        # Преобразование битовой строки в байты
-        byte_array = bytearray()
-        for i in range(0, len(bitstring), 8):
-            byte = bitstring[i: i + 8]
-            byte_array.append(int(byte, 2))
-
-        return bytes(byte_array)
+        return _pack_codes(codes)
 
     @staticmethod
     def decode(byte_data: bytes) -> list[int]:
@@ -48,27 +136,15 @@ class EliasGammaEncoder:
         if not byte_data:
             return []
 
-        bitstring = "".join(f"{byte:08b}" for byte in byte_data)
+        reader = _BitReader(byte_data)
+        gamma = reader.gamma
         numbers = []
-        i = 0
-        n = len(bitstring)
-
-        zero_counter = 0
-        while i < n:
-            # Подсчёт ведущих нулей
-            if bitstring[i] == "0":
-                zero_counter += 1
-                i += 1
-                continue
-
-            # Извлечение закодированного числа
-            number = int(bitstring[i: i + zero_counter + 1], 2)
-            numbers.append(number)
-
-            i += zero_counter + 1
-            zero_counter = 0
-
-        return numbers
+        append = numbers.append
+        while True:
+            number = gamma()
+            if not number:
+                return numbers
+            append(number)
 
 
 class EliasDeltaEncoder:
@@ -91,22 +167,19 @@ class EliasDeltaEncoder:
         if not numbers:
             return b""
 
-        bitstring = ""
+        codes = []
         for n in numbers:
-            bitstring += EliasDeltaEncoder.encode_number(n)
-
-        # Выравнивание длины битовой строки до кратной 8
-        padding = 8 - len(bitstring) % 8
-        if padding != 8:
-            bitstring += "0" * padding
-
-        # Преобразование битовой строки в байты
-        byte_array = bytearray()
-        for i in range(0, len(bitstring), 8):
-            byte = bitstring[i: i + 8]
-            byte_array.append(int(byte, 2))
-
-        return bytes(byte_array)
+            if n <= 0:
+                EliasDeltaEncoder.encode_number(n)  # Единая обработка ошибки
+            length = n.bit_length()
+            # Гамма-код длины, затем число без ведущей 1
+            low_bits = length - 1
+            codes.append((
+                (length << low_bits) | (n & ((1 << low_bits) - 1)),
+                2 * length.bit_length() - 1 + low_bits,
+            ))
+
+        return _pack_codes(codes)
 
     @staticmethod
     def decode(byte_data: bytes) -> list[int]:
@@ -114,28 +187,16 @@ class EliasDeltaEncoder:
         if not byte_data:
             return []
 
-        bitstring = "".join(f"{byte:08b}" for byte in byte_data)
+        reader = _BitReader(byte_data)
+        gamma = reader.gamma
+        read = reader.read
         numbers = []
-        i = 0
-        n = len(bitstring)
-
-        zero_counter = 0
-        while i < n:
-            # Определение длины кода длины
-            if bitstring[i] == "0":
-                zero_counter += 1
-                i += 1
-                continue
-
-            # Декодирование длины числа
-            bit_count = int(bitstring[i: i + zero_counter + 1], 2)
-            i += zero_counter + 1
-
-            # Восстановление исходного числа
-            number = int("1" + bitstring[i: i + bit_count - 1], 2)
-            numbers.append(number)
-
-            i += bit_count - 1
-            zero_counter = 0
-
-        return numbers
+        append = numbers.append
+        while True:
+            length = gamma()  # Длина числа в битах
+            if not length:
+                return numbers
+
+            # Восстановление ведущей 1 перед младшими битами
+            low_bits = length - 1
+            append((1 << low_bits) | read(low_bits))
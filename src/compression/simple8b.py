@@ -0,0 +1,110 @@
+from . import vectorized
+from .vbyte import VByteEncoder
+from ..utils.exceptions import CompressionError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Селектор -> (количество чисел в слове, ширина в битах); селекторы 0 и 1 — серии единиц
+SELECTORS = [
+    (240, 0), (120, 0), (60, 1), (30, 2), (20, 3), (15, 4), (12, 5), (10, 6),
+    (8, 7), (7, 8), (6, 10), (5, 12), (4, 15), (3, 20), (2, 30), (1, 60),
+]
+
+
+class Simple8bEncoder:
+    """Словный кодер Simple-8b: до 240 чисел в 64-битном слове с 4-битным селектором"""
+
+    @staticmethod
+    def encode(numbers: list[int]) -> bytes:
+        """Пакетное кодирование: заголовок с количеством чисел и слова little-endian"""
+        if not numbers:
+            return b""
+
+        if min(numbers) < 0:
+            logger.error(f"Для кодирования Simple-8b требуются неотрицательные числа, получено: {min(numbers)}")
+            raise CompressionError("Число должно быть неотрицательным для кодирования Simple-8b")
+
+        out = bytearray(VByteEncoder.encode([len(numbers)]))
+        lengths = [n.bit_length() for n in numbers]
+        total = len(numbers)
+        i = 0
+        while i < total:
+            for selector, (count, width) in enumerate(SELECTORS):
+                window = lengths[i: i + count]
+                if width == 0:
+                    # Серия единиц: у единицы и только у неё длина ровно 1 бит
+                    if window.count(1) != len(window):
+                        continue
+                elif max(window) > width:
+                    continue
+
+                word = selector << 60
+                if width:
+                    for position in range(len(window)):
+                        word |= numbers[i + position] << (position * width)
+                out += word.to_bytes(8, 'little')
+                i += len(window)
+                break
+            else:
+                value = numbers[i]
+                logger.error(f"Число вне диапазона Simple-8b: {value}")
+                raise CompressionError(f"Число {value} не помещается в слово Simple-8b")
+
+        return bytes(out)
+
+    @staticmethod
+    def _split_header(byte_data: bytes) -> tuple[int, int]:
+        """Чтение количества чисел и смещения начала слов"""
+        total = 0
+        shift = 0
+        for offset, byte in enumerate(byte_data):
+            total |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return total, offset + 1
+            shift += 7
+        raise CompressionError("Повреждённый заголовок Simple-8b")
+
+    @staticmethod
+    def decode(byte_data: bytes) -> list[int]:
+        """Декодирование байтов в список чисел"""
+        if not byte_data:
+            return []
+
+        total, offset = Simple8bEncoder._split_header(byte_data)
+        numbers = []
+        for start in range(offset, len(byte_data), 8):
+            word = int.from_bytes(byte_data[start: start + 8], 'little')
+            count, width = SELECTORS[word >> 60]
+            if width == 0:
+                numbers.extend([1] * count)
+            else:
+                mask = (1 << width) - 1
+                numbers.extend((word >> (k * width)) & mask for k in range(count))
+        return numbers[:total]
+
+    @staticmethod
+    def decode_array(byte_data: bytes):
+        """Векторное декодирование: слова группируются по селектору"""
+        if not vectorized.HAS_NUMPY:
+            return Simple8bEncoder.decode(byte_data)
+        np = vectorized.np
+        if not byte_data:
+            return np.zeros(0, dtype=np.uint32)
+
+        total, offset = Simple8bEncoder._split_header(byte_data)
+        words = np.frombuffer(byte_data, dtype='<u8', offset=offset)
+        selectors = (words >> np.uint64(60)).astype(np.int64)
+        counts = np.array([count for count, _ in SELECTORS], dtype=np.int64)[selectors]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        out = np.ones(int(counts.sum()), dtype=np.uint64)
+        for selector in np.unique(selectors):
+            count, width = SELECTORS[selector]
+            if width == 0:
+                continue
+            rows = selectors == selector
+            shifts = np.arange(count, dtype=np.uint64) * np.uint64(width)
+            values = (words[rows, None] >> shifts) & np.uint64((1 << width) - 1)
+            out[starts[rows, None] + np.arange(count)] = values
+        return out[:total].astype(np.uint32)
@@ -1,4 +1,7 @@
-from .elias import EliasDeltaEncoder, EliasGammaEncoder
+from array import array
+
+from . import vectorized
+from .codecs import get_codec
 
 
 def encode_postings(postings: list[int], method: str) -> bytes:
@@ -10,22 +13,41 @@ def encode_postings(postings: list[int], method: str) -> bytes:
     for i in range(1, len(sorted_postings)):
         deltas.append(sorted_postings[i] - sorted_postings[i - 1])
 
-    if method == 'delta':
-        return EliasDeltaEncoder.encode(deltas)
-    return EliasGammaEncoder.encode(deltas)  # по умолчанию gamma
+    return get_codec(method).encode(deltas)  # по умолчанию gamma
 
 
-def decode_postings(encoded: bytes, method: str) -> list[int]:
-    if method == 'delta':
-        deltas = EliasDeltaEncoder.decode(encoded)
-    else:  # gamma по умолчанию
-        deltas = EliasGammaEncoder.decode(encoded)
+def decode_postings(encoded: bytes, method: str, base: int = 0) -> list[int]:
+    deltas = get_codec(method).decode(encoded)
 
     if not deltas:
         return []
 
-    postings = [deltas[0]]
+    postings = [base + deltas[0]]
     for delta in deltas[1:]:
         postings.append(postings[-1] + delta)
 
     return postings
+
+
+def decode_plain(encoded: bytes) -> list[int]:
+    """Декодирование несжатого списка ID (ASCII через запятую)"""
+    if not encoded:
+        return []
+    return [int(doc_id) for doc_id in encoded.decode('utf-8').split(",")]
+
+
+def decode_postings_array(encoded: bytes, method: str, base: int = 0):
+    """Декодирование списка ID сразу в массив uint32 (np.ndarray или array('I'))"""
+    if method == 'none':
+        if not vectorized.HAS_NUMPY:
+            return array('I', decode_plain(encoded))
+        if not encoded:
+            return vectorized.np.zeros(0, dtype=vectorized.np.uint32)
+        return vectorized.np.fromstring(encoded, dtype=vectorized.np.uint32, sep=',')
+
+    if not vectorized.HAS_NUMPY:
+        return array('I', decode_postings(encoded, method, base))
+
+    codec = get_codec(method)
+    decode = getattr(codec, 'decode_array', codec.decode)
+    return vectorized.gaps_to_ids(decode(encoded), base)
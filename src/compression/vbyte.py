@@ -0,0 +1,44 @@
+from . import vectorized
+from ..utils.exceptions import CompressionError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class VByteEncoder:
+    """Байтовый кодер VByte (varint): 7 бит данных на байт, старший бит — продолжение"""
+
+    @staticmethod
+    def encode(numbers: list[int]) -> bytes:
+        """Пакетное кодирование списка неотрицательных чисел в байты"""
+        out = bytearray()
+        for n in numbers:
+            if n < 0:
+                logger.error(f"Для кодирования VByte требуются неотрицательные числа, получено: {n}")
+                raise CompressionError("Число должно быть неотрицательным для кодирования VByte")
+            while n >= 0x80:
+                out.append((n & 0x7F) | 0x80)
+                n >>= 7
+            out.append(n)
+        return bytes(out)
+
+    @staticmethod
+    def decode(byte_data: bytes) -> list[int]:
+        """Декодирование байтов в список чисел"""
+        numbers = []
+        value = 0
+        shift = 0
+        for byte in byte_data:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+            else:
+                numbers.append(value)
+                value = 0
+                shift = 0
+        return numbers
+
+    @staticmethod
+    def decode_array(byte_data: bytes):
+        """Векторное декодирование в массив uint32"""
+        return vectorized.decode_varint(byte_data)
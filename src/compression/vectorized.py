@@ -0,0 +1,94 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется чистый Python
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def gaps_to_ids(deltas, base: int = 0):
+    """Восстановление абсолютных ID из разностей через np.cumsum (отсчёт от base)"""
+    if not HAS_NUMPY:
+        postings = array('I')
+        current = base
+        for delta in deltas:
+            current += delta
+            postings.append(current)
+        return postings
+    if base:
+        return (np.cumsum(np.asarray(deltas, dtype=np.int64)) + base).astype(np.uint32)
+    return np.cumsum(np.asarray(deltas, dtype=np.uint32), dtype=np.uint32)
+
+
+def unpack_fixed_width(data: bytes, width: int, count: int) -> list[int]:
+    """Векторная распаковка count чисел фиксированной ширины (старшие биты вперёд)"""
+    if count == 0:
+        return np.zeros(0, dtype=np.uint32) if HAS_NUMPY else []
+    if width == 0:
+        return np.zeros(count, dtype=np.uint32) if HAS_NUMPY else [0] * count
+
+    if not HAS_NUMPY:
+        value = int.from_bytes(data, 'big')
+        total_bits = len(data) * 8
+        mask = (1 << width) - 1
+        return [
+            (value >> (total_bits - (i + 1) * width)) & mask
+            for i in range(count)
+        ]
+
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=count * width)
+    weights = np.left_shift(np.uint64(1), np.arange(width - 1, -1, -1, dtype=np.uint64))
+    return (bits.reshape(count, width).astype(np.uint64) @ weights).astype(np.uint32)
+
+
+def decode_varint(data: bytes) -> list[int]:
+    """Векторное декодирование VByte: 7 бит на байт, старший бит — продолжение"""
+    if not data:
+        return np.zeros(0, dtype=np.uint32) if HAS_NUMPY else []
+
+    if not HAS_NUMPY:
+        numbers = []
+        value = 0
+        shift = 0
+        for byte in data:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+            else:
+                numbers.append(value)
+                value = 0
+                shift = 0
+        return numbers
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)  # Последний байт каждого числа
+    if not len(ends):
+        return np.zeros(0, dtype=np.uint32)  # Ни одного завершённого числа, как в скалярной ветви
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+
+    # Позиция байта внутри своего числа задаёт сдвиг 7 * k
+    positions = np.arange(ends[-1] + 1) - np.repeat(starts, ends - starts + 1)
+    payload = (raw[:ends[-1] + 1] & 0x7F).astype(np.uint64) << (positions.astype(np.uint64) * np.uint64(7))
+    return np.add.reduceat(payload, starts).astype(np.uint32)
+
+
+def concatenate(arrays: list):
+    """Склейка массивов ID в один массив uint32"""
+    if HAS_NUMPY:
+        return np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.uint32)
+    result = array('I')
+    for part in arrays:
+        result.extend(part)
+    return result
+
+
+def intersect_sorted(left, right):
+    """Пересечение двух отсортированных массивов уникальных ID"""
+    if HAS_NUMPY:
+        return np.intersect1d(left, right, assume_unique=True)
+    right_set = set(right)
+    return array('I', [doc_id for doc_id in left if doc_id in right_set])
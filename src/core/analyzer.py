@@ -0,0 +1,99 @@
+from functools import lru_cache
+
+from ..utils.logger import get_logger
+from ..utils.resources import ResourceManager, get_resource_manager
+
+logger = get_logger(__name__)
+
+
+class Analyzer:
+    """Анализатор текста: токенизация, удаление стоп-слов и стемминг с кэшем основ"""
+
+    def __init__(self,
+                 stopword_languages: tuple[str, ...] = ('russian', 'english'),
+                 stemmer_language: str = 'russian',
+                 min_token_length: int = 3,
+                 cache_size: int = 100_000,
+                 resources: ResourceManager = None):
+        self.resources = resources  # Менеджер ресурсов NLTK (общий по умолчанию)
+        self.stopword_languages = stopword_languages
+        self.stemmer_language = stemmer_language
+        self.min_token_length = min_token_length
+        self.cache_size = cache_size
+        self.stop_words: frozenset[str] = None  # Строится один раз при первом анализе
+        self.stemmer = None
+        self.tokenize = None
+        self._stem = lru_cache(maxsize=cache_size)(self._stem_token)  # Токен -> основа
+
+    def __getstate__(self) -> dict:
+        """Для передачи в другие процессы: только настройки, ресурсы загружаются заново"""
+        state = self.__dict__.copy()
+        for name in ("stop_words", "stemmer", "tokenize", "_stem"):
+            state[name] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._stem = lru_cache(maxsize=self.cache_size)(self._stem_token)
+
+    def _load(self) -> None:
+        """Однократная загрузка токенизатора, стоп-слов и стеммера"""
+        resources = self.resources or get_resource_manager()
+        self.tokenize = resources.tokenizer()
+        self.stop_words = frozenset(
+            word for language in self.stopword_languages for word in resources.stopwords(language)
+        )
+        self.stemmer = resources.stemmer(self.stemmer_language)
+
+    def _stem_token(self, token: str) -> str:
+        if self.stemmer is None:
+            self._load()
+        return self.stemmer.stem(token)
+
+    def analyze(self, text: str) -> list[str]:
+        """Обработка текста: токенизация, нормализация и стемминг"""
+        if not isinstance(text, str):
+            return []
+
+        text = text.lower().strip()
+        if not text:
+            return []
+
+        if self.stop_words is None:
+            self._load()
+
+        stem = self._stem
+        stop_words = self.stop_words
+        min_length = self.min_token_length
+        return [
+            stem(token) for token in self.tokenize(text)
+            if token.isalnum()
+               and len(token) >= min_length
+               and token not in stop_words
+        ]
+
+    def stem(self, token: str) -> str:
+        """Стемминг одного токена через кэш"""
+        return self._stem(token)
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля обращений к кэшу основ, обслуженных без вызова стеммера"""
+        info = self._stem.cache_info()
+        total = info.hits + info.misses
+        return info.hits / total if total else 0.0
+
+    def cache_info(self) -> dict:
+        """Статистика кэша основ"""
+        info = self._stem.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear_cache(self) -> None:
+        """Очистка кэша основ"""
+        self._stem.cache_clear()
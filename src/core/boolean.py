@@ -0,0 +1,482 @@
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .query import ProximityClause, union_postings
+from ..compression.vectorized import intersect_sorted
+from ..utils.exceptions import QueryError
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from .query import QueryExecutor
+
+logger = get_logger(__name__)
+
+# Фраза в кавычках, скобка, минус перед операндом (не внутри слова «научно-технический») или слово
+TOKEN_PATTERN = re.compile(r'"[^"]*"|[()]|(?<![^\s(])-(?=[^\s-])|[^\s()"]+')
+OPERATOR_PATTERN = re.compile(r'\b(?:AND|OR|NOT)\b|[()]|(?<![^\s(])-(?=[^\s-])')
+KEYWORD_PATTERN = re.compile(r'\b(?:AND|OR|NOT)\b|(?<![^\s(])-(?=[^\s-])')  # Операторы без скобок
+NEAR_TOKEN = re.compile(r"NEAR/(\d+)")
+OPERATORS = ("AND", "OR", "NOT", "-")
+
+
+def has_operators(query: str) -> bool:
+    """Есть ли в запросе булевы операторы или скобки (иначе хватает обычного поиска)"""
+    return OPERATOR_PATTERN.search(query) is not None
+
+
+@dataclass
+class QueryNode(ABC):
+    """Узел дерева запроса с оценкой планировщика и статистикой выполнения"""
+    estimate: int = 0  # Оценка числа документов по документным частотам
+    actual: Optional[int] = None  # Фактическое число документов (None — узел не выполнялся)
+    elapsed: float = 0.0  # Время выполнения вместе с потомками, с
+    note: str = ""  # Способ выполнения (svs, gallop, проверка позиций)
+
+    @property
+    def children(self) -> list["QueryNode"]:
+        return []
+
+    @abstractmethod
+    def describe(self) -> str:
+        """Описание узла для плана запроса"""
+
+    def signature(self) -> str:
+        """Каноническая запись запроса (для ключа кэша)"""
+        return self.describe()
+
+
+@dataclass
+class TermQuery(QueryNode):
+    term: str = ""
+
+    def describe(self) -> str:
+        return f"TERM {self.term}"
+
+
+@dataclass
+class PrefixQuery(QueryNode):
+    prefix: str = ""
+    terms: list[str] = field(default_factory=list)  # Раскрытые термины (заполняет планировщик)
+    truncated: bool = False
+
+    def describe(self) -> str:
+        return f"PREFIX {self.prefix}* ({len(self.terms)} терминов{', усечено' if self.truncated else ''})"
+
+    def signature(self) -> str:
+        return f"PREFIX {self.prefix}*"
+
+
+@dataclass
+class ProximityQuery(QueryNode):
+    clause: ProximityClause = None
+
+    def describe(self) -> str:
+        if self.clause.distance is None:
+            return f'PHRASE "{" ".join(self.clause.terms)}"'
+        return f"NEAR/{self.clause.distance} ({' '.join(self.clause.terms)})"
+
+
+@dataclass
+class AndQuery(QueryNode):
+    operands: list[QueryNode] = field(default_factory=list)
+
+    @property
+    def children(self) -> list[QueryNode]:
+        return self.operands
+
+    def describe(self) -> str:
+        return "AND"
+
+    def signature(self) -> str:
+        return "(" + " AND ".join(sorted(child.signature() for child in self.operands)) + ")"
+
+
+@dataclass
+class OrQuery(QueryNode):
+    operands: list[QueryNode] = field(default_factory=list)
+
+    @property
+    def children(self) -> list[QueryNode]:
+        return self.operands
+
+    def describe(self) -> str:
+        return "OR"
+
+    def signature(self) -> str:
+        return "(" + " OR ".join(sorted(child.signature() for child in self.operands)) + ")"
+
+
+@dataclass
+class NotQuery(QueryNode):
+    operand: QueryNode = None
+
+    @property
+    def children(self) -> list[QueryNode]:
+        return [self.operand]
+
+    def describe(self) -> str:
+        return "NOT"
+
+    def signature(self) -> str:
+        return f"NOT {self.operand.signature()}"
+
+
+def _combine(node_type, nodes: list[Optional[QueryNode]]) -> Optional[QueryNode]:
+    """Узел AND/OR из операндов: пустые операнды отбрасываются, вложенные узлы того же типа раскрываются"""
+    operands = []
+    for node in nodes:
+        if isinstance(node, node_type):
+            operands.extend(node.operands)
+        elif node is not None:
+            operands.append(node)
+    if not operands:
+        return None
+    return operands[0] if len(operands) == 1 else node_type(operands=operands)
+
+
+class _Parser:
+    """
+    Разбор запроса методом рекурсивного спуска. Приоритет: NOT (или «-»), AND, OR;
+    соседние операнды без оператора соединяются оператором по умолчанию
+    """
+
+    def __init__(self, query: str, analyze: Callable[[str], list[str]], default_operator: str):
+        self.tokens = TOKEN_PATTERN.findall(query)
+        self.analyze = analyze
+        self.default_operator = default_operator
+        self.pos = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _next(self) -> Optional[str]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def parse(self) -> Optional[QueryNode]:
+        if not self.tokens:
+            return None
+        node = self._or()
+        if self._peek() is not None:
+            raise QueryError("Лишняя закрывающая скобка в запросе")
+        return node
+
+    def _or(self) -> Optional[QueryNode]:
+        operands = [self._and()]
+        explicit = []  # explicit[i] — операнды i и i + 1 соединены явным OR
+        while self._peek() not in (None, ")"):
+            if self._peek() == "OR":
+                self.pos += 1
+                explicit.append(True)
+            elif self.default_operator == 'or':
+                explicit.append(False)
+            else:
+                break
+            operands.append(self._and())
+
+        # Отрицание, присоединённое оператором по умолчанию, исключает документы и в режиме 'or':
+        # «а б -в» — это (а OR б) AND NOT в, а не объединение с дополнением «в»
+        nodes, excluded = [], []
+        for i, node in enumerate(operands):
+            joined = (i > 0 and explicit[i - 1]) or (i < len(explicit) and explicit[i])
+            if isinstance(node, NotQuery) and not joined:
+                excluded.append(node)
+            else:
+                nodes.append(node)
+        return _combine(AndQuery, [_combine(OrQuery, nodes), *excluded])
+
+    def _and(self) -> Optional[QueryNode]:
+        nodes = [self._unary()]
+        while True:
+            token = self._peek()
+            if token == "AND":
+                self.pos += 1
+            elif token in (None, ")", "OR") or self.default_operator == 'or':
+                break
+            nodes.append(self._unary())
+        return _combine(AndQuery, nodes)
+
+    def _unary(self) -> Optional[QueryNode]:
+        if self._peek() in ("NOT", "-"):
+            self.pos += 1
+            operand = self._unary()
+            return NotQuery(operand=operand) if operand is not None else None
+        return self._primary()
+
+    def _primary(self) -> Optional[QueryNode]:
+        token = self._next()
+        if token is None:
+            raise QueryError("Запрос оборвался: после оператора ожидается термин")
+        if token == "(":
+            node = self._or()
+            if self._next() != ")":
+                raise QueryError("Не закрыта скобка в запросе")
+            return node
+        if token == ")" or token in OPERATORS:
+            raise QueryError(f"Неожиданный оператор '{token}' в запросе")
+        if token.startswith('"'):
+            return self._terms(token.strip('"'), phrase=True)
+
+        if NEAR_TOKEN.fullmatch(token):
+            raise QueryError(f"Оператор {token} без левого операнда")
+
+        words, distances = [token], []
+        while NEAR_TOKEN.fullmatch(self._peek() or ""):
+            operator = self._next()
+            distances.append(int(NEAR_TOKEN.fullmatch(operator).group(1)))
+            following = self._peek()
+            if following == "(":
+                # «а NEAR/3 (б OR в)» — близость к каждому слову группы
+                return self._near_group(words, max(distances), self._primary())
+            if following is None or following in (")", "AND", "OR", "NOT", "-") or following.startswith('"'):
+                raise QueryError(f"Оператор {operator} соединяет только слова")
+            words.append(self._next())
+        if distances:
+            # В цепочке «а NEAR/3 б NEAR/5 в» действует наибольшее расстояние, как в split_proximity
+            return self._terms(" ".join(words), phrase=False, distance=max(distances))
+
+        if len(token) > 1 and token.endswith("*"):
+            return PrefixQuery(prefix=token.rstrip("*").lower())
+        return self._terms(token)
+
+    def _near_group(self, words: list[str], distance: int, group: Optional[QueryNode]) -> Optional[QueryNode]:
+        """
+        NEAR со скобками справа: группа из слов, соединённых OR, раскрывается в OR условий близости.
+        Для других групп позиции не проверяются — остаётся AND с предупреждением в журнале
+        """
+        left = self.analyze(" ".join(words))
+        if group is None or not left:
+            return _combine(AndQuery, [self._terms(" ".join(words)), group])
+        alternatives = group.operands if isinstance(group, OrQuery) else [group]
+        if not all(isinstance(node, TermQuery) for node in alternatives):
+            logger.warning(f"NEAR/{distance} с составной группой выполняется как AND")
+            return _combine(AndQuery, [self._terms(" ".join(words)), group])
+        return _combine(OrQuery, [ProximityQuery(clause=ProximityClause(left + [node.term], distance))
+                                  for node in alternatives])
+
+    def _terms(self, text: str, phrase: Optional[bool] = None, distance: Optional[int] = None) -> Optional[QueryNode]:
+        """Термины текста после анализа: один — TERM, несколько — фраза, NEAR или AND"""
+        terms = self.analyze(text)
+        if not terms:
+            return None  # Стоп-слова и знаки препинания
+        if len(terms) == 1:
+            return TermQuery(term=terms[0])
+        if phrase is None:
+            return AndQuery(operands=[TermQuery(term=term) for term in dict.fromkeys(terms)])
+        return ProximityQuery(clause=ProximityClause(terms, None if phrase else distance))
+
+
+def parse_boolean(query: str, analyze: Callable[[str], list[str]],
+                  default_operator: str = 'and') -> tuple[bool, Optional[QueryNode]]:
+    """
+    (булев ли запрос, дерево). Запрос, где из операторов есть только скобки и который
+    не разбирается («смайлик :)»), считается обычным текстом
+    """
+    if not has_operators(query):
+        return False, None
+    try:
+        return True, parse_query(query, analyze, default_operator)
+    except QueryError:
+        if KEYWORD_PATTERN.search(query):
+            raise
+        return False, None
+
+
+def parse_query(query: str, analyze: Callable[[str], list[str]], default_operator: str = 'and') -> Optional[QueryNode]:
+    """
+    Разбор булева запроса: AND, OR, NOT (или «-»), скобки, фразы в кавычках, NEAR/k и префиксы «слово*».
+    Возвращает None, если в запросе не осталось терминов
+    """
+    return _Parser(query, analyze, default_operator).parse()
+
+
+def query_terms(node: QueryNode, negated: bool = False) -> tuple[list[str], list[str]]:
+    """Термины узла (без префиксов) и раскрытые термины префиксов; negated — включать термины под NOT"""
+    terms, expanded = [], []
+    if isinstance(node, NotQuery) and not negated:
+        return terms, expanded
+    if isinstance(node, TermQuery):
+        terms.append(node.term)
+    elif isinstance(node, ProximityQuery):
+        terms.extend(node.clause.terms)
+    elif isinstance(node, PrefixQuery):
+        expanded.extend(node.terms)
+    for child in node.children:
+        child_terms, child_expanded = query_terms(child, negated)
+        terms.extend(child_terms)
+        expanded.extend(child_expanded)
+    return terms, expanded
+
+
+def has_prefixes(node: QueryNode) -> bool:
+    return isinstance(node, PrefixQuery) or any(has_prefixes(child) for child in node.children)
+
+
+class QueryPlanner:
+    """
+    Планирование и выполнение дерева булева запроса.
+
+    Размер результата каждого узла оценивается по документным частотам. Операнды AND
+    выполняются от самого дешёвого; каждый следующий операнд пересекается только
+    с уже найденными кандидатами, а пустой промежуточный результат прекращает выполнение.
+    Позиции фраз проверяются после пересечения всех положительных операндов, NOT применяется
+    последним как фильтр кандидатов. Операнды OR объединяются слиянием через кучу.
+    """
+
+    def __init__(self, executor: "QueryExecutor"):
+        self.executor = executor
+        self.index = executor.index
+        self.num_documents = len(self.index.documents)
+        self.rank_time = 0.0
+        self.candidates = 0
+
+    def plan(self, node: QueryNode) -> QueryNode:
+        """Оценка размеров узлов и переупорядочивание операндов (изменяет и возвращает дерево)"""
+        index = self.index
+        if isinstance(node, TermQuery):
+            node.estimate = index.document_frequency(node.term)
+        elif isinstance(node, PrefixQuery):
+            node.terms, node.truncated = self.executor.expand(node.prefix)
+            node.estimate = min(self.num_documents, sum(map(index.document_frequency, node.terms)))
+        elif isinstance(node, ProximityQuery):
+            node.estimate = min(map(index.document_frequency, node.clause.terms))
+        elif isinstance(node, NotQuery):
+            self.plan(node.operand)
+            node.estimate = max(0, self.num_documents - node.operand.estimate)
+        elif isinstance(node, AndQuery):
+            for child in node.operands:
+                self.plan(child)
+            positive = sorted((child for child in node.operands if not isinstance(child, NotQuery)),
+                              key=lambda child: child.estimate)
+            # Фильтры NOT — после всех положительных операндов, первым тот, что отсеет больше
+            negative = sorted((child for child in node.operands if isinstance(child, NotQuery)),
+                              key=lambda child: child.estimate)
+            node.operands = positive + negative
+            node.estimate = positive[0].estimate if positive else min(child.estimate for child in negative)
+        elif isinstance(node, OrQuery):
+            for child in node.operands:
+                self.plan(child)
+            node.operands.sort(key=lambda child: child.estimate)
+            node.estimate = min(self.num_documents, sum(child.estimate for child in node.operands))
+        return node
+
+    def execute(self, node: QueryNode, deleted: frozenset = frozenset()) -> list[int]:
+        """ID документов, удовлетворяющих запросу, по возрастанию"""
+        doc_ids = self._evaluate(node, None)
+        if deleted:
+            doc_ids = [doc_id for doc_id in doc_ids if doc_id not in deleted]
+        return doc_ids
+
+    def search(self, node: QueryNode, k: Optional[int], deleted: frozenset = frozenset()) -> list[tuple[int, float]]:
+        """Планирование, выполнение и ранжирование: k лучших по BM25 (термины под NOT в оценке не участвуют)"""
+        self.plan(node)
+        doc_ids = self.execute(node, deleted)
+        self.candidates = len(doc_ids)
+
+        terms, expanded = query_terms(node)
+        terms = list(dict.fromkeys(terms))
+        expanded = [term for term in dict.fromkeys(expanded) if term not in terms]
+        start_time = time.perf_counter()
+        results = self.executor.rank(doc_ids, terms, k, expanded)
+        self.rank_time = time.perf_counter() - start_time
+        self.executor.last_stats = {"plan": node, "candidates": self.candidates, "rank_time": self.rank_time}
+        return results
+
+    def _universe(self) -> list[int]:
+        return sorted(self.index.documents)
+
+    def _evaluate(self, node: QueryNode, within: Optional[list[int]], verify: bool = True) -> list[int]:
+        """Документы узла; within — кандидаты, которыми ограничен результат (None — все документы)"""
+        start_time = time.perf_counter()
+        result = self._dispatch(node, within, verify)
+        node.actual = len(result)
+        node.elapsed = time.perf_counter() - start_time
+        return result
+
+    def _dispatch(self, node: QueryNode, within: Optional[list[int]], verify: bool) -> list[int]:
+        executor = self.executor
+        if isinstance(node, TermQuery):
+            if within is None:
+                return self.index.postings(node.term)
+            result, (_, node.note, _) = executor.intersect(within, node.term)
+            return result
+
+        if isinstance(node, PrefixQuery):
+            result = union_postings(self.index.postings(term) for term in node.terms)
+            node.note = f"объединение {sum(map(self.index.document_frequency, node.terms))} -> {len(result)}"
+            return result if within is None else intersect_sorted(within, result).tolist()
+
+        if isinstance(node, ProximityQuery):
+            candidates = within
+            for term in sorted(node.clause.terms, key=self.index.document_frequency):
+                candidates = self.index.postings(term) if candidates is None else executor.intersect(candidates, term)[0]
+                if not candidates:
+                    return []
+            return self._verify(node, candidates) if verify else candidates
+
+        if isinstance(node, NotQuery):
+            base = within if within is not None else self._universe()
+            excluded = set(self._evaluate(node.operand, base))
+            return [doc_id for doc_id in base if doc_id not in excluded]
+
+        if isinstance(node, OrQuery):
+            return union_postings([self._evaluate(child, within) for child in node.operands])
+
+        # AND: положительные операнды от дешёвых, проверка позиций и фильтры NOT — в конце
+        candidates = within
+        deferred = []
+        for child in node.operands:
+            if isinstance(child, NotQuery):
+                if candidates is None:
+                    candidates = self._universe()  # Запрос только из отрицаний
+                if candidates:
+                    for phrase in deferred:
+                        candidates = self._verify(phrase, candidates)
+                    deferred = []
+                if not candidates:
+                    break
+                candidates = self._evaluate(child, candidates)
+            else:
+                candidates = self._evaluate(child, candidates, verify=False)
+                if isinstance(child, ProximityQuery):
+                    deferred.append(child)
+            if not candidates:
+                break  # Ранний выход: остальные операнды не выполняются
+        for phrase in deferred:
+            if candidates:
+                candidates = self._verify(phrase, candidates)
+        return candidates or []
+
+    def _verify(self, node: ProximityQuery, candidates: list[int]) -> list[int]:
+        """Проверка позиций фразы или NEAR у кандидатов"""
+        if self.index.positions is None:
+            node.note = "без проверки позиций: индекс построен без позиций"
+            return candidates
+        start_time = time.perf_counter()
+        result = self.executor.verify(candidates, [node.clause])
+        node.note = f"позиции проверены у {len(candidates)} документов"
+        node.actual = len(result)
+        node.elapsed += time.perf_counter() - start_time
+        return result
+
+    def format(self, node: QueryNode, depth: int = 0) -> list[str]:
+        """Строки плана: узел, оценка, фактическое число документов и время"""
+        actual = "не выполнялся" if node.actual is None else f"найдено={node.actual}"
+        line = f"{'  ' * depth}{node.describe()}  оценка={node.estimate} {actual} {node.elapsed * 1000:.3f} мс"
+        if node.note:
+            line += f" [{node.note}]"
+        lines = [line]
+        for child in node.children:
+            lines.extend(self.format(child, depth + 1))
+        return lines
+
+    def explain(self, node: QueryNode, k: Optional[int]) -> str:
+        """Выполнение запроса и выбранный план с временем по узлам"""
+        self.search(node, k)
+        lines = self.format(node)
+        lines.append(f"RANK k={k}: {self.candidates} кандидатов, {self.rank_time * 1000:.3f} мс")
+        return "\n".join(lines)
@@ -0,0 +1,82 @@
+from array import array
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+
+from .document import Document
+from .positions import token_positions
+from ..utils.exceptions import IndexationError
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from .index import InvertedIndex
+
+logger = get_logger(__name__)
+
+
+class IndexBuilder:
+    """Пакетное построение индекса: каждый список кодируется один раз в finalize()"""
+
+    def __init__(self, index: "InvertedIndex"):
+        self.index = index
+        # Термин -> несжатые ID и частоты в порядке добавления документов
+        self._postings: dict[str, tuple[array, array]] = defaultdict(lambda: (array('I'), array('I')))
+        self._positions: dict[str, list[list[int]]] = defaultdict(list)  # Позиции в том же порядке
+
+    @property
+    def pending(self) -> bool:
+        """Есть ли документы, ещё не записанные в индекс через finalize()"""
+        return bool(self._postings)
+
+    def add_document(self, document: Document) -> None:
+        """Добавление документа в буфер построителя"""
+        try:
+            if document.doc_id in self.index.documents:
+                logger.warning(f"Документ с ID {document.doc_id} уже существует. Перезапись.")
+
+            self.index.documents[document.doc_id] = document
+            tokens = self.index._process_text(document.text)
+            counts = Counter(tokens)
+            self.index._add_length(document.doc_id, sum(counts.values()))
+            self.index.query_cache.clear()  # Оценки всех запросов зависят от числа документов и средней длины
+
+            for term, count in counts.items():
+                doc_ids, frequencies = self._postings[term]
+                doc_ids.append(document.doc_id)
+                frequencies.append(count)
+            if self.index.positions is not None:
+                for term, positions in token_positions(tokens).items():
+                    self._positions[term].append(positions)
+
+        except Exception as e:
+            logger.error(f"Ошибка добавления документа {document.doc_id}: {str(e)}")
+            raise IndexationError(f"Ошибка индексации: {str(e)}")
+
+    def finalize(self) -> "InvertedIndex":
+        """Кодирование накопленных списков и запись их в индекс"""
+        index = self.index
+        for term, (doc_ids, frequencies) in self._postings.items():
+            positions = self._positions.get(term)
+            if term in index.index or any(a >= b for a, b in zip(doc_ids, doc_ids[1:])):
+                # Слияние с уже записанным списком или документы пришли не по порядку:
+                # частоты повторно добавленных документов суммируются
+                merged = dict(zip(*index.postings_with_frequencies(term)))
+                for doc_id, count in zip(doc_ids, frequencies):
+                    merged[doc_id] = merged.get(doc_id, 0) + count
+                if positions is not None:
+                    merged_positions = dict(zip(index.postings(term), index.term_positions(term)))
+                    for doc_id, doc_positions in zip(doc_ids, positions):
+                        merged_positions[doc_id] = sorted(set(merged_positions.get(doc_id, ())) | set(doc_positions))
+                doc_ids = sorted(merged)
+                frequencies = [merged[doc_id] for doc_id in doc_ids]
+                if positions is not None:
+                    positions = [merged_positions[doc_id] for doc_id in doc_ids]
+            index.index[term] = index._encode_postings(list(doc_ids), list(frequencies))
+            if positions is not None:
+                index.positions[term] = index._encode_positions(positions)
+            index.postings_cache.discard(term)
+
+        index.compute_term_statistics()
+        logger.debug(f"Построитель закодировал {len(self._postings)} списков")
+        self._postings = defaultdict(lambda: (array('I'), array('I')))
+        self._positions = defaultdict(list)
+        return index
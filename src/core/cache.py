@@ -0,0 +1,263 @@
+import heapq
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_QUERY_CACHE_ENTRIES = 1024
+DEFAULT_QUERY_CACHE_BYTES = 16 * 1024 * 1024
+DEFAULT_POSTINGS_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _results_size(results: tuple) -> int:
+    """Приблизительный объём результатов в памяти"""
+    return sys.getsizeof(results) + sum(
+        sys.getsizeof(hit) + sys.getsizeof(hit[0]) + sys.getsizeof(hit[1]) for hit in results
+    )
+
+
+class QueryCache:
+    """
+    LRU-кэш результатов запросов с ограничениями по числу записей и объёму.
+
+    Ключ — нормализованный набор терминов после анализа и параметры ранжирования,
+    поэтому запросы, различающиеся регистром, словоформами или порядком слов,
+    попадают в одну запись. Любое изменение индекса очищает кэш целиком:
+    число документов и средняя длина входят в оценки BM25 всех запросов.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_QUERY_CACHE_ENTRIES,
+                 max_bytes: int = DEFAULT_QUERY_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[tuple, int]] = OrderedDict()  # Ключ -> (результаты, объём)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()  # Кэш общий для потоков сервера поиска
+
+    @staticmethod
+    def key(terms: Iterable[str], k: Optional[int], mode: str, params: tuple = ()) -> tuple:
+        """Ключ запроса: уникальные термины без учёта порядка, k, режим и параметры ранжирования"""
+        return tuple(sorted(set(terms))), k, mode, params
+
+    def get(self, key: tuple) -> Optional[list[tuple[int, float]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return list(entry[0])
+
+    def put(self, key: tuple, results: list[tuple[int, float]]) -> None:
+        results = tuple(results)
+        size = _results_size(results) + sys.getsizeof(key) + sum(sys.getsizeof(term) for term in key[0])
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (results, size)
+            self.bytes += size
+
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: tuple) -> None:
+        _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self) -> None:
+        """Полная очистка после любого изменения индекса"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля запросов, обслуженных из кэша"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def cache_info(self) -> dict:
+        """Статистика кэша запросов"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "max_size": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hit_rate,
+        }
+
+
+def _array_size(postings) -> int:
+    """Объём массива ID (np.ndarray, array('I') или memoryview)"""
+    nbytes = getattr(postings, "nbytes", None)
+    if nbytes is None:
+        nbytes = postings.itemsize * len(postings)
+    return nbytes + 64  # Заголовок объекта массива
+
+
+def _read_only(postings):
+    """Массив из кэша общий для всех запросов, поэтому он хранится только для чтения"""
+    if hasattr(postings, "flags"):
+        postings.flags.writeable = False
+        return postings
+    return memoryview(postings).toreadonly()  # У array('I') нет флага записи
+
+
+@dataclass
+class _PostingsEntry:
+    postings: object  # np.ndarray или memoryview над array('I'), только для чтения
+    size: int  # Объём в памяти
+    encoded_size: int  # Объём сжатого списка
+    cost: float  # Время декодирования, с
+    frequency: int  # Количество обращений
+    priority: float
+
+
+class PostingsCache:
+    """
+    Кэш декодированных списков документов с ограничением по объёму (GreedyDual-Size-Frequency).
+
+    Приоритет записи — частота обращений, умноженная на время декодирования
+    и делённая на объём массива: дольше остаются часто запрашиваемые и дорогие
+    в декодировании списки. Вытесняется запись с наименьшим приоритетом,
+    а её приоритет становится базой для новых записей, поэтому давно не
+    использованные списки постепенно «стареют».
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_POSTINGS_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: dict[str, _PostingsEntry] = {}
+        self._heap: list[tuple[float, int, str]] = []  # (приоритет, порядковый номер, термин)
+        self._counter = 0
+        self._inflation = 0.0  # Приоритет последней вытесненной записи
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0  # Сжатые байты, которые не пришлось декодировать
+        self.decode_time_saved = 0.0  # Сэкономленное время декодирования, с
+        self._lock = threading.Lock()
+
+    def _prioritize(self, term: str, entry: _PostingsEntry) -> None:
+        entry.priority = self._inflation + entry.frequency * max(entry.cost, 1e-9) / entry.size
+        self._counter += 1
+        heapq.heappush(self._heap, (entry.priority, self._counter, term))
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            # Устаревшие элементы кучи накапливаются при каждом обращении
+            self._heap = [(item.priority, i, key) for i, (key, item) in enumerate(self._entries.items())]
+            heapq.heapify(self._heap)
+
+    def get(self, term: str):
+        """Декодированный список термина или None"""
+        with self._lock:
+            entry = self._entries.get(term)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_saved += entry.encoded_size
+            self.decode_time_saved += entry.cost
+            entry.frequency += 1
+            self._prioritize(term, entry)
+            return entry.postings
+
+    def put(self, term: str, postings, encoded_size: int, cost: float) -> None:
+        """Добавление декодированного списка; cost — время его декодирования"""
+        postings = _read_only(postings)
+        size = _array_size(postings)
+        with self._lock:
+            self._store(term, postings, size, encoded_size, cost, frequency=1)
+
+    def update(self, term: str, postings, encoded_size: int) -> None:
+        """Замена списка после перекодирования с сохранением статистики обращений"""
+        postings = _read_only(postings)
+        size = _array_size(postings)
+        with self._lock:
+            entry = self._entries.get(term)
+            if entry is not None:
+                self._store(term, postings, size, encoded_size, entry.cost, entry.frequency)
+
+    def _store(self, term: str, postings, size: int, encoded_size: int, cost: float, frequency: int) -> None:
+        """Запись списка; вызывается под блокировкой"""
+        previous = self._entries.pop(term, None)
+        if previous is not None:
+            self.bytes -= previous.size
+        if size > self.max_bytes:
+            return
+        entry = _PostingsEntry(postings, size, encoded_size, cost, frequency, 0.0)
+        self._entries[term] = entry
+        self.bytes += size
+        self._prioritize(term, entry)
+        self._evict()
+
+    def _evict(self) -> None:
+        while self.bytes > self.max_bytes and self._heap:
+            priority, _, term = heapq.heappop(self._heap)
+            entry = self._entries.get(term)
+            if entry is None or entry.priority != priority:
+                continue  # Устаревший элемент кучи
+            del self._entries[term]
+            self.bytes -= entry.size
+            self._inflation = priority
+            self.evictions += 1
+
+    def discard(self, term: str) -> None:
+        """Удаление списка термина (после изменения индекса)"""
+        with self._lock:
+            entry = self._entries.pop(term, None)
+            if entry is not None:
+                self.bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._heap = []
+            self.bytes = 0
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля обращений, обслуженных без декодирования"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def cache_info(self) -> dict:
+        """Статистика кэша списков"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "bytes_saved": self.bytes_saved,
+            "decode_time_saved": self.decode_time_saved,
+            "hit_rate": self.hit_rate,
+        }
@@ -1,30 +1,85 @@
-from collections import defaultdict
-
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import SnowballStemmer
-from nltk.tokenize import word_tokenize
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Mapping
+from array import array
+from typing import Iterable, Iterator, Optional
 
+from .analyzer import Analyzer
+from .boolean import QueryNode, QueryPlanner, has_prefixes, parse_boolean, parse_query, query_terms
+from .builder import IndexBuilder
+from .cache import PostingsCache, QueryCache
 from .document import Document
-from ..compression.utils import encode_postings, decode_postings
+from .parallel import ParallelIndexBuilder
+from .positions import (PositionReader, decode_all_positions, decode_positions, encode_positions,
+                        token_positions)
+from .postings import (DEFAULT_BLOCK_SIZE, PostingCursor, decode_blocks, encode_blocks, pack_block, posting_count,
+                       unpack_block)
+from .query import QueryExecutor, split_prefixes, split_proximity
+from .scoring import BM25, CollectionStatistics
+from ..compression.codecs import get_codec
+from ..compression.utils import encode_postings, decode_plain, decode_postings, decode_postings_array
+from ..compression.vectorized import concatenate
+from ..storage.docstore import DocumentStore, MemoryDocumentStore
 from ..utils.exceptions import IndexationError
 from ..utils.logger import get_logger
 
-nltk.download('punkt_tab')
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-
 logger = get_logger(__name__)
 
 
+class TermFrequencies(Mapping):
+    """
+    Частоты терминов: термин -> {ID документа: частота}.
+
+    Отдельно частоты не хранятся — они закодированы в блоках списков рядом с ID
+    и декодируются при обращении к термину.
+    """
+
+    def __init__(self, index: "InvertedIndex"):
+        self._index = index
+
+    def __getitem__(self, term: str) -> dict[int, int]:
+        if term not in self._index.index:
+            return {}
+        return dict(zip(*self._index.postings_with_frequencies(term)))
+
+    def __contains__(self, term) -> bool:
+        return term in self._index.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index.index)
+
+    def __len__(self) -> int:
+        return len(self._index.index)
+
+
 class InvertedIndex:
     """Класс обратного индекса для поисковой системы"""
 
-    def __init__(self, compression_method: str = 'none'):
-        self.index: dict[str, bytes] = {}  # Термин -> сжатый список ID
-        self.documents: dict[int, Document] = {}  # Хранилище документов
+    def __init__(self, compression_method: str = 'none', analyzer: Analyzer = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE, scorer: BM25 = None,
+                 query_cache: Optional[QueryCache] = None, postings_cache: Optional[PostingsCache] = None,
+                 positions: bool = False):
+        self.analyzer = analyzer if analyzer is not None else Analyzer()  # Анализатор текста
+        self.index: dict[str, bytes] = {}  # Термин -> сжатый список ID с частотами
+        # Термин -> позиции в документах списка (отдельный поток; None — индекс без позиций)
+        self.positions: Optional[dict[str, bytes]] = {} if positions else None
+        self.documents: DocumentStore = MemoryDocumentStore()  # Хранилище документов
         self.compression_method = compression_method  # Метод сжатия
-        self.term_frequencies: dict[str, dict[int, int]] = defaultdict(dict)  # Частоты терминов
+        self.block_size = block_size  # Размер блока списков (0 — старый формат без блоков)
+        self.executor = QueryExecutor(self)  # Исполнитель запросов
+        self.term_frequencies = TermFrequencies(self)  # Частоты терминов (представление над списками)
+        self.scorer = scorer if scorer is not None else BM25()  # Ранжирующая функция
+        self.doc_lengths: dict[int, int] = {}  # ID -> количество терминов документа
+        self.total_length = 0  # Суммарная длина документов
+        self.idf: dict[str, float] = {}  # Термин -> IDF (вычисляется при построении)
+        self.max_scores: dict[str, float] = {}  # Термин -> максимальный вклад в оценку (для MaxScore)
+        self.query_cache = query_cache if query_cache is not None else QueryCache()  # Кэш результатов
+        # Статистики внешней коллекции (если индекс — сегмент составного индекса)
+        self.collection: Optional[CollectionStatistics] = None
+        # Кэш декодированных списков
+        self.postings_cache = postings_cache if postings_cache is not None else PostingsCache()
+        self._sorted_terms: tuple[int, list[str]] = (-1, [])  # Отсортированные термины словаря в памяти
 
     def add_document(self, document: Document) -> None:
         """Добавление документа в индекс"""
@@ -33,99 +88,396 @@ class InvertedIndex:
                 logger.warning(f"Документ с ID {document.doc_id} уже существует. Перезапись.")
 
             self.documents[document.doc_id] = document
-            terms = self._process_text(document.text)
+            tokens = self._process_text(document.text)
+            counts = Counter(tokens)
+            self._add_length(document.doc_id, sum(counts.values()))
+            # Новый документ меняет число документов и среднюю длину, а с ними все оценки BM25
+            self.query_cache.clear()
+            term_positions = token_positions(tokens) if self.positions is not None else None
 
-            for term in terms:
+            # Каждый список перекодируется один раз на документ, а не на каждое вхождение
+            for term, count in counts.items():
                 if term not in self.index:
-                    self.index[term] = self._encode_postings([document.doc_id])
-                else:
-                    current = self._decode_postings(self.index[term])
-                    if document.doc_id not in current:
-                        current.append(document.doc_id)
-                        self.index[term] = self._encode_postings(sorted(current))
+                    self.index[term] = self._encode_postings([document.doc_id], [count])
+                    if term_positions is not None:
+                        self.positions[term] = self._encode_positions([term_positions[term]])
+                    continue
 
-                # Обновление частоты термина
-                self.term_frequencies[term][document.doc_id] = \
-                    self.term_frequencies[term].get(document.doc_id, 0) + 1
+                doc_ids, frequencies = self.postings_with_frequencies(term)
+                position = bisect_left(doc_ids, document.doc_id)
+                positions = self.term_positions(term) if term_positions is not None else None
+                if position < len(doc_ids) and doc_ids[position] == document.doc_id:
+                    frequencies[position] += count  # Повторное добавление: частоты суммируются
+                    self.index[term] = self._encode_postings(doc_ids, frequencies)
+                    if positions is not None:
+                        positions[position] = sorted(set(positions[position]) | set(term_positions[term]))
+                        self.positions[term] = self._encode_positions(positions)
+                else:
+                    doc_ids.insert(position, document.doc_id)
+                    frequencies.insert(position, count)
+                    self.index[term] = self._encode_postings(doc_ids, frequencies)
+                    if positions is not None:
+                        positions.insert(position, term_positions[term])
+                        self.positions[term] = self._encode_positions(positions)
+                    # Декодированный список уже есть: кэш обновляется без повторного декодирования
+                    self.postings_cache.update(term, array('I', doc_ids), len(self.index[term]))
 
         except Exception as e:
             logger.error(f"Ошибка добавления документа {document.doc_id}: {str(e)}")
             raise IndexationError(f"Ошибка индексации: {str(e)}")
 
-    def search(self, query: str) -> list[Document]:
-        """Поиск документов, содержащих все термины из запроса"""
+    def add_documents(self, documents: Iterable[Document], workers: int = 1) -> None:
+        """Пакетное добавление документов с однократным кодированием списков (workers > 1 — в процессах)"""
+        if workers > 1:
+            ParallelIndexBuilder(self, workers).build(documents)
+            return
+
+        builder = IndexBuilder(self)
+        for document in documents:
+            builder.add_document(document)
+        builder.finalize()
+
+    def search(self, query: str, k: Optional[int] = 10, mode: str = 'and') -> list[Document]:
+        """Поиск k лучших по BM25 документов: mode='and' — все термины, 'or' — любой"""
+        return [self.documents[doc_id] for doc_id, _ in self.search_scored(query, k, mode)]
+
+    def search_scored(self, query: str, k: Optional[int] = 10, mode: str = 'and',
+                      strict: bool = False) -> list[tuple[int, float]]:
+        """
+        Поиск с оценками: пары (ID, оценка BM25) по убыванию оценки.
+        Запросы с AND/OR/NOT и скобками выполняются планировщиком; синтаксическая ошибка — QueryError.
+        Внутренние ошибки записываются в журнал и дают пустой результат; strict=True пробрасывает их
+        """
+        boolean, node = parse_boolean(query, self._process_text, mode)
+        if boolean:
+            return self._search_boolean(node, query, k, mode, strict)
         try:
-            terms = self._process_text(query)
-            if not terms:
+            text, clauses = split_proximity(query, self._process_text)
+            text, prefixes = split_prefixes(text)
+            terms = list(dict.fromkeys(self._process_text(text)))  # Повторы терминов не обрабатываются дважды
+            if prefixes:
+                # Не кэшируется: новые документы могут добавить термины с тем же префиксом
+                return self.executor.search(terms, k, mode, prefixes, clauses)
+            if not terms and not clauses:
                 return []
 
-            # Получение списков документов для каждого термина
-            postings_sets = []
-            for term in terms:
-                if term not in self.index:
-                    return []  # Если хотя бы один термин не найден
-                try:
-                    postings = self._decode_postings(self.index[term])
-                    postings_sets.append(set(postings))
-                except Exception as e:
-                    logger.error(f"Ошибка декодирования для термина '{term}': {str(e)}")
-                    return []
-
-            # Поиск пересечения всех списков
-            result_ids = set(postings_sets[0])
-            for s in postings_sets[1:]:
-                result_ids.intersection_update(s)
-
-            # Сортировка по частоте терминов (простой ранжинг)
-            ranked_ids = sorted(
-                result_ids,
-                key=lambda doc_id: sum(
-                    self.term_frequencies[term].get(doc_id, 0)
-                    for term in terms
-                ),
-                reverse=True
-            )
-
-            return [self.documents[doc_id] for doc_id in ranked_ids]
+            all_terms = terms + [term for clause in clauses for term in clause.terms]
+            key = self.query_cache.key(all_terms, k, mode, (self.scorer.k1, self.scorer.b,
+                                                            tuple(clause.key for clause in clauses)))
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+
+            try:
+                if clauses:
+                    # Фразы и NEAR: позиции проверяются после пересечения по ID
+                    results = self.executor.search(terms, k, mode, clauses=clauses)
+                elif mode == 'or':
+                    # Дизъюнкция с отсечением документов, не способных войти в топ (MaxScore)
+                    results = self.executor.disjunctive(terms, k)
+                else:
+                    # Пересечение от самого редкого термина; пустой результат, если термина нет
+                    results = self.executor.rank(self.executor.conjunctive(terms), terms, k)
+            except Exception as e:
+                logger.error(f"Ошибка декодирования для запроса '{query}': {str(e)}")
+                if strict:
+                    raise
+                return []
+
+            self.query_cache.put(key, results)
+            return results
 
         except Exception as e:
             logger.error(f"Ошибка поиска по запросу '{query}': {str(e)}")
+            if strict:
+                raise
             return []
 
-    @staticmethod
-    def _process_text(text: str) -> list[str]:
-        """Обработка текста: токенизация, нормализация и стемминг"""
-        if not isinstance(text, str):
+    def _search_boolean(self, node: Optional[QueryNode], query: str, k: Optional[int],
+                        mode: str, strict: bool = False) -> list[tuple[int, float]]:
+        """Булев запрос: план по документным частотам, выполнение и ранжирование"""
+        if node is None:
             return []
+        # Префиксы раскрываются по текущему словарю и, как в обычном поиске, не кэшируются
+        cacheable = not has_prefixes(node)
+        key = None
+        if cacheable:
+            terms, _ = query_terms(node, negated=True)
+            key = self.query_cache.key(terms, k, mode, (self.scorer.k1, self.scorer.b, node.signature()))
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            results = QueryPlanner(self.executor).search(node, k)
+        except Exception as e:
+            logger.error(f"Ошибка выполнения запроса '{query}': {str(e)}")
+            if strict:
+                raise
+            return []
+        if cacheable:
+            self.query_cache.put(key, results)
+        return results
+
+    def explain(self, query: str, k: Optional[int] = 10, mode: str = 'and') -> str:
+        """
+        Выбранный план запроса: узлы с оценкой числа документов по документным частотам,
+        фактическим числом документов и временем выполнения; последняя строка — ранжирование
+        """
+        node = parse_query(query, self._process_text, mode)
+        if node is None:
+            return "Пустой запрос: после анализа не осталось терминов"
+        return QueryPlanner(self.executor).explain(node, k)
+
+    def use_collection_statistics(self, collection: Optional[CollectionStatistics]) -> None:
+        """Оценка по статистикам всей коллекции вместо статистик этого индекса"""
+        self.collection = collection
+        self.query_cache.clear()
+
+    def term_idf(self, term: str) -> float:
+        """IDF термина: заранее вычисленное значение или расчёт по текущему индексу"""
+        if self.collection is not None:
+            return self.collection.idf(term)
+        idf = self.idf.get(term)
+        if idf is None:
+            idf = self.scorer.idf(self.document_frequency(term), len(self.documents))
+            self.idf[term] = idf
+        return idf
+
+    def average_length(self) -> float:
+        """Средняя длина документа в терминах"""
+        if self.collection is not None:
+            return self.collection.average_length
+        return self.total_length / len(self.doc_lengths) if self.doc_lengths else 0.0
 
-        text = text.lower().strip()
-        if not text:
+    def term_upper_bound(self, term: str) -> float:
+        """Верхняя граница вклада термина: точная после построения, иначе общая оценка BM25"""
+        if self.collection is not None:
+            # Точные границы посчитаны по статистикам сегмента и к коллекции неприменимы
+            return self.scorer.upper_bound(self.term_idf(term))
+        bound = self.max_scores.get(term)
+        if bound is None:
+            bound = self.scorer.upper_bound(self.term_idf(term))
+        return bound
+
+    def compute_term_statistics(self) -> None:
+        """Предварительный расчёт IDF и максимальных вкладов всех терминов (после построения)"""
+        # Статистики коллекции меняют оценки любых запросов: кэш очищается целиком
+        self.query_cache.clear()
+        num_documents = len(self.documents)
+        avg_length = self.average_length()
+        self.idf = {}
+        self.max_scores = {}
+        for term in self.index:
+            idf = self.scorer.idf(self.document_frequency(term), num_documents)
+            self.idf[term] = idf
+            self.max_scores[term] = max((
+                self.scorer.score(count, self.doc_lengths.get(doc_id, 0), avg_length, idf)
+                for doc_id, count in zip(*self.postings_with_frequencies(term))
+            ), default=0.0)
+
+    def _add_length(self, doc_id: int, length: int) -> None:
+        """
+        Учёт длины добавленного текста. Частоты терминов повторно добавленного документа
+        суммируются с прежними, поэтому и длина суммируется: она остаётся суммой частот
+        """
+        self._set_length(doc_id, self.doc_lengths.get(doc_id, 0) + length)
+
+    def _set_length(self, doc_id: int, length: int) -> None:
+        """Учёт длины документа; любые изменения сбрасывают статистики терминов"""
+        self.total_length += length - self.doc_lengths.get(doc_id, 0)
+        self.doc_lengths[doc_id] = length
+        self.idf = {}
+        self.max_scores = {}
+
+    def postings(self, term: str) -> list[int]:
+        """ID документов термина по возрастанию"""
+        return self.postings_array(term).tolist()
+
+    def postings_array(self, term: str):
+        """Массив ID документов термина из кэша декодированных списков (только для чтения)"""
+        postings = self.postings_cache.get(term)
+        if postings is not None:
+            return postings
+        encoded = self.index.get(term)
+        if not encoded:
+            return concatenate([])
+
+        start_time = time.perf_counter()
+        postings = self._decode_postings_array(encoded)
+        self.postings_cache.put(term, postings, len(encoded), time.perf_counter() - start_time)
+        return postings
+
+    def postings_with_frequencies(self, term: str) -> tuple[list[int], list[int]]:
+        """ID документов термина по возрастанию и частоты термина в них"""
+        encoded = self.index.get(term)
+        if not encoded:
+            return [], []
+        return self.postings(term), self._decode_frequencies(encoded)
+
+    def cursor(self, term: str) -> PostingCursor:
+        """Курсор по списку документов термина (с частотами)"""
+        if not self.block_size:
+            return PostingCursor.from_ids(*self.postings_with_frequencies(term))
+        return PostingCursor(self.index.get(term, b""), self._decode_block, self.block_size,
+                             self._decode_block_frequencies)
+
+    def terms_range(self, start: Optional[str] = None, end: Optional[str] = None) -> list[str]:
+        """Термины start <= термин < end в порядке сортировки (None — без границы)"""
+        if not isinstance(self.index, dict):
+            return list(self.index.range(start, end))  # Словарь сегмента: двоичный поиск по блокам
+        terms = self.sorted_terms()
+        lo = 0 if start is None else bisect_left(terms, start)
+        hi = len(terms) if end is None else bisect_left(terms, end)
+        return terms[lo: max(lo, hi)]
+
+    def terms_with_prefix(self, prefix: str) -> list[str]:
+        """Термины, начинающиеся с prefix, в порядке сортировки"""
+        if not isinstance(self.index, dict):
+            return list(self.index.prefix(prefix))
+        terms = self.sorted_terms()
+        lo = bisect_left(terms, prefix)
+        hi = lo
+        while hi < len(terms) and terms[hi].startswith(prefix):
+            hi += 1
+        return terms[lo: hi]
+
+    def prefix_forms(self, prefix: str) -> list[str]:
+        """
+        Формы префикса для поиска по словарю: как введён (в нижнем регистре) и после анализа.
+        В словаре хранятся основы: «расписание*» должно найти и термин «расписан»
+        """
+        forms = [prefix.lower()]
+        analyzed = self._process_text(prefix)
+        if len(analyzed) == 1 and analyzed[0] != forms[0]:
+            forms.append(analyzed[0])
+        return forms
+
+    def sorted_terms(self) -> list[str]:
+        """
+        Термины словаря в памяти по возрастанию (порядок строк совпадает с порядком байтов UTF-8).
+        Термины только добавляются, поэтому список пересортировывается при изменении их числа
+        """
+        size, terms = self._sorted_terms
+        if size != len(self.index):
+            terms = sorted(self.index)
+            self._sorted_terms = (len(terms), terms)
+        return terms
+
+    def term_positions(self, term: str) -> list[list[int]]:
+        """Позиции термина во всех документах его списка (в порядке ID)"""
+        if self.positions is None:
+            raise IndexationError("Индекс построен без позиций терминов")
+        return decode_all_positions(self.positions.get(term, b""), self._decode_position_list)
+
+    def document_positions(self, term: str, doc_id: int) -> list[int]:
+        """
+        Позиции термина в одном документе (пусто, если термина в нём нет).
+        Декодируется только запись документа в потоке позиций
+        """
+        if self.positions is None:
+            raise IndexationError("Индекс построен без позиций терминов")
+        postings = self.postings_array(term)
+        ordinal = bisect_left(postings, doc_id)
+        if ordinal == len(postings) or postings[ordinal] != doc_id:
             return []
+        return decode_positions(self.positions[term], ordinal, self._decode_position_list)
 
-        # Токенизация
-        tokens = word_tokenize(text)
+    def position_reader(self, term: str) -> PositionReader:
+        """Чтение позиций термина по порядковым номерам документов в его списке"""
+        if self.positions is None:
+            raise IndexationError("Индекс построен без позиций терминов")
+        return PositionReader(self.positions.get(term, b""), self._decode_position_list)
 
-        # Удаление стоп-слов и коротких токенов
-        stop_words = set(stopwords.words('russian') + stopwords.words('english'))
-        tokens = [
-            token for token in tokens
-            if token.isalnum()
-               and len(token) > 2
-               and token not in stop_words
-        ]
+    def document_frequency(self, term: str) -> int:
+        """Количество документов с термином (без декодирования блоков)"""
+        encoded = self.index.get(term)
+        if not encoded:
+            return 0
+        if not self.block_size:
+            return len(self.postings_array(term))
+        return posting_count(encoded)
 
-        # Стемминг для русского языка
-        stemmer = SnowballStemmer('russian')
-        return [stemmer.stem(token) for token in tokens]
+    def _process_text(self, text: str) -> list[str]:
+        """Обработка текста: токенизация, нормализация и стемминг"""
+        return self.analyzer.analyze(text)
+
+    def _encode_postings(self, postings: list[int], frequencies: Optional[list[int]] = None) -> bytes:
+        """Кодирование списка ID документов и частот с выбранным методом (без частот — по 1)"""
+        if frequencies is None:
+            frequencies = [1] * len(postings)
+        if self.block_size:
+            return encode_blocks(postings, frequencies, self._encode_block, self.block_size)
+        return self._encode_block(postings, frequencies, 0)
 
-    def _encode_postings(self, postings: list[int]) -> bytes:
-        """Кодирование списка ID документов с выбранным методом"""
+    def _encode_positions(self, lists: list[list[int]]) -> bytes:
+        """Кодирование позиций термина в документах списка: разности тем же методом сжатия"""
+        return encode_positions(lists, self._encode_position_list)
+
+    def _encode_position_list(self, positions: list[int]) -> bytes:
         if self.compression_method == 'none':
-            return ",".join(map(str, postings)).encode('utf-8')
-        return encode_postings(postings, self.compression_method)
+            return ",".join(map(str, positions)).encode('utf-8')
+        return encode_postings(positions, self.compression_method)
+
+    def _decode_position_list(self, encoded: bytes) -> list[int]:
+        return self._decode_ids(encoded, 0)
 
     def _decode_postings(self, encoded: bytes) -> list[int]:
         """Декодирование списка ID документов"""
+        if self.block_size:
+            return [doc_id for block in decode_blocks(encoded, self._decode_block, self.block_size)
+                    for doc_id in block]
+        return self._decode_block(encoded, 0)
+
+    def _decode_frequencies(self, encoded: bytes) -> list[int]:
+        """Декодирование частот списка (в порядке ID)"""
+        if self.block_size:
+            return [tf for block in decode_blocks(encoded, self._decode_block_frequencies, self.block_size)
+                    for tf in block]
+        return self._decode_block_frequencies(encoded)
+
+    def _decode_legacy_postings(self, encoded: bytes) -> list[int]:
+        """Декодирование списка старого формата: блоки только из ID, частоты хранились отдельно"""
+        if self.block_size:
+            return [doc_id for block in decode_blocks(encoded, self._decode_ids, self.block_size)
+                    for doc_id in block]
+        return self._decode_ids(encoded, 0)
+
+    def _decode_postings_array(self, encoded: bytes):
+        """Декодирование списка ID в массив uint32 (NumPy, если доступен)"""
+        if self.block_size:
+            return concatenate(decode_blocks(encoded, self._decode_block_array, self.block_size))
+        return self._decode_block_array(encoded, 0)
+
+    def _encode_block(self, doc_ids: list[int], frequencies: list[int], base: int) -> bytes:
+        """
+        Кодирование блока: ID (разности отсчитываются от последнего ID предыдущего блока)
+        и следом частоты тех же документов тем же методом сжатия
+        """
+        if self.compression_method == 'none':
+            return pack_block(",".join(map(str, doc_ids)).encode('utf-8'),
+                              ",".join(map(str, frequencies)).encode('utf-8'))
+        if base:
+            doc_ids = [doc_id - base for doc_id in doc_ids]
+        return pack_block(encode_postings(doc_ids, self.compression_method),
+                          get_codec(self.compression_method).encode(frequencies) if frequencies else b"")
+
+    def _decode_ids(self, encoded: bytes, base: int) -> list[int]:
+        """Декодирование байтов ID блока"""
         if self.compression_method == 'none':
-            return [int(doc_id) for doc_id in encoded.decode('utf-8').split(",")]
-        return decode_postings(encoded, self.compression_method)
+            return decode_plain(encoded)
+        return decode_postings(encoded, self.compression_method, base)
+
+    def _decode_block(self, encoded: bytes, base: int) -> list[int]:
+        """Декодирование ID блока (частоты не декодируются)"""
+        return self._decode_ids(unpack_block(encoded)[0], base)
+
+    def _decode_block_frequencies(self, encoded: bytes, base: int = 0) -> list[int]:
+        """Декодирование частот блока (base не используется: частоты хранятся без разностей)"""
+        tf_data = unpack_block(encoded)[1]
+        if self.compression_method == 'none':
+            return decode_plain(tf_data)
+        return list(get_codec(self.compression_method).decode(tf_data)) if tf_data else []
+
+    def _decode_block_array(self, encoded: bytes, base: int):
+        """Декодирование ID блока в массив uint32"""
+        return decode_postings_array(unpack_block(encoded)[0], self.compression_method, base)
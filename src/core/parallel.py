@@ -0,0 +1,152 @@
+import heapq
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from .analyzer import Analyzer
+from .document import Document
+from .positions import token_positions
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from .index import InvertedIndex
+
+logger = get_logger(__name__)
+
+CHUNKS_PER_WORKER = 4  # Несколько фрагментов на процесс сглаживают неравномерность документов
+
+# Частичный индекс фрагмента: термин -> (ID по возрастанию, частоты)
+PartialPostings = dict[str, tuple[array, array]]
+# Позиции терминов фрагмента: термин -> {ID: позиции}
+PartialPositions = dict[str, dict[int, list[int]]]
+
+_worker_analyzer: Optional[Analyzer] = None
+_worker_positions = False
+
+
+def _init_worker(analyzer: Analyzer, positions: bool = False) -> None:
+    """Инициализация процесса: анализатор передаётся один раз, а не с каждым фрагментом"""
+    global _worker_analyzer, _worker_positions
+    _worker_analyzer = analyzer
+    _worker_positions = positions
+
+
+def index_chunk(chunk: list[tuple[int, str]], analyzer: Analyzer = None,
+                positions: Optional[bool] = None) -> tuple[PartialPostings, list, PartialPositions]:
+    """
+    Частичный индекс фрагмента документов (выполняется в рабочем процессе).
+
+    Возвращает списки ID с частотами по терминам в порядке первого появления,
+    длины документов в порядке обработки и позиции терминов (если positions).
+    """
+    analyzer = analyzer or _worker_analyzer
+    positions = _worker_positions if positions is None else positions
+    frequencies: dict[str, dict[int, int]] = {}
+    term_positions: PartialPositions = {}
+    lengths = []
+    for doc_id, text in chunk:
+        tokens = analyzer.analyze(text)
+        counts = Counter(tokens)
+        lengths.append((doc_id, sum(counts.values())))
+        for term, count in counts.items():
+            term_frequencies = frequencies.setdefault(term, {})
+            term_frequencies[doc_id] = term_frequencies.get(doc_id, 0) + count
+        if positions:
+            for term, doc_positions in token_positions(tokens).items():
+                documents = term_positions.setdefault(term, {})
+                documents[doc_id] = sorted(set(documents.get(doc_id, ())) | set(doc_positions))
+
+    postings = {}
+    for term, term_frequencies in frequencies.items():
+        doc_ids = sorted(term_frequencies)
+        postings[term] = (array('I', doc_ids), array('I', [term_frequencies[doc_id] for doc_id in doc_ids]))
+    return postings, lengths, term_positions
+
+
+def merge_postings(parts: list[tuple[array, array]]) -> tuple[list[int], list[int]]:
+    """K-путевое слияние отсортированных частичных списков; частоты повторов суммируются"""
+    parts = sorted(parts, key=lambda part: part[0][0])
+    if all(prev[0][-1] < nxt[0][0] for prev, nxt in zip(parts, parts[1:])):
+        # Диапазоны ID фрагментов не пересекаются (обычный случай) — достаточно склейки
+        doc_ids, tfs = array('I'), array('I')
+        for part_ids, part_tfs in parts:
+            doc_ids.extend(part_ids)
+            tfs.extend(part_tfs)
+        return doc_ids.tolist(), tfs.tolist()
+
+    doc_ids, tfs = [], []
+    for doc_id, tf in heapq.merge(*(zip(part_ids, part_tfs) for part_ids, part_tfs in parts)):
+        if doc_ids and doc_ids[-1] == doc_id:
+            tfs[-1] += tf
+        else:
+            doc_ids.append(doc_id)
+            tfs.append(tf)
+    return doc_ids, tfs
+
+
+class ParallelIndexBuilder:
+    """
+    Параллельное построение индекса в нескольких процессах.
+
+    Анализ текста (токенизация и стемминг на чистом Python) распределяется
+    по процессам фрагментами документов; родительский процесс сливает частичные
+    списки и кодирует каждый список один раз. Результат совпадает
+    с последовательным построением через IndexBuilder.
+    """
+
+    def __init__(self, index: "InvertedIndex", workers: int, chunk_size: Optional[int] = None):
+        self.index = index
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def _chunks(self, documents: list[Document]) -> list[list[tuple[int, str]]]:
+        chunk_size = self.chunk_size or max(1, -(-len(documents) // (self.workers * CHUNKS_PER_WORKER)))
+        return [
+            [(document.doc_id, document.text) for document in documents[start: start + chunk_size]]
+            for start in range(0, len(documents), chunk_size)
+        ]
+
+    def build(self, documents: Iterable[Document]) -> "InvertedIndex":
+        """Индексация документов и слияние результатов в индекс"""
+        index = self.index
+        documents = list(documents)
+        for document in documents:
+            if document.doc_id in index.documents:
+                logger.warning(f"Документ с ID {document.doc_id} уже существует. Перезапись.")
+            index.documents[document.doc_id] = document
+
+        chunks = self._chunks(documents)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(index.analyzer, index.positions is not None)) as pool:
+            results = list(pool.map(index_chunk, chunks))
+
+        # Термины в порядке первого появления, как при последовательном построении
+        parts: dict[str, list[tuple[array, array]]] = {}
+        positions: PartialPositions = {}
+        for postings, lengths, term_positions in results:
+            for doc_id, length in lengths:
+                index._add_length(doc_id, length)
+            for term, part in postings.items():
+                parts.setdefault(term, []).append(part)
+            for term, documents in term_positions.items():
+                merged = positions.setdefault(term, {})
+                for doc_id, doc_positions in documents.items():
+                    merged[doc_id] = sorted(set(merged.get(doc_id, ())) | set(doc_positions))
+
+        for term, term_parts in parts.items():
+            term_positions = positions.get(term)
+            if term in index.index:
+                term_parts.append(tuple(array('I', values) for values in index.postings_with_frequencies(term)))
+                if term_positions is not None:
+                    for doc_id, doc_positions in zip(index.postings(term), index.term_positions(term)):
+                        term_positions[doc_id] = sorted(set(term_positions.get(doc_id, ())) | set(doc_positions))
+            doc_ids, tfs = merge_postings(term_parts)
+            index.index[term] = index._encode_postings(doc_ids, tfs)
+            if term_positions is not None:
+                index.positions[term] = index._encode_positions([term_positions[doc_id] for doc_id in doc_ids])
+            index.postings_cache.discard(term)
+
+        index.compute_term_statistics()
+        logger.debug(f"Параллельное построение: {len(chunks)} фрагментов, {len(parts)} списков")
+        return index
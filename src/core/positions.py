@@ -0,0 +1,119 @@
+from typing import Callable, Iterable
+
+from .postings import read_varint
+from ..compression.vbyte import VByteEncoder
+
+POSITIONS_BLOCK = 64  # Документов в блоке потока позиций
+
+# Кодирование позиций одного документа (по возрастанию, с 1) -> байты и обратно
+PositionEncoder = Callable[[list[int]], bytes]
+PositionDecoder = Callable[[bytes], list[int]]
+
+
+def token_positions(tokens: Iterable[str]) -> dict[str, list[int]]:
+    """Позиции терминов в потоке токенов анализатора (с 1, стоп-слова не занимают позиций)"""
+    positions: dict[str, list[int]] = {}
+    for position, term in enumerate(tokens, 1):
+        positions.setdefault(term, []).append(position)
+    return positions
+
+
+def encode_positions(lists: list[list[int]], encode: PositionEncoder, block_size: int = POSITIONS_BLOCK) -> bytes:
+    """
+    Кодирование позиций термина во всех документах списка (в порядке ID).
+
+    Формат: varint число документов, varint размер блока, varint длина в байтах каждого
+    блока, кроме последнего; затем блоки из записей «varint длина, позиции документа».
+    Таблица длин блоков позволяет перейти к документу, не разбирая предыдущие блоки.
+    """
+    blocks = []
+    for start in range(0, len(lists), block_size):
+        out = bytearray()
+        for positions in lists[start: start + block_size]:
+            encoded = encode(positions)
+            out += VByteEncoder.encode([len(encoded)])
+            out += encoded
+        blocks.append(bytes(out))
+    header = VByteEncoder.encode([len(lists), block_size] + [len(block) for block in blocks[:-1]])
+    return header + b"".join(blocks)
+
+
+def _read_header(data: bytes) -> tuple[int, int, list[int], int]:
+    """(число документов, размер блока, длины блоков без последнего, смещение первого блока)"""
+    count, offset = read_varint(data, 0)
+    block_size, offset = read_varint(data, offset)
+    lengths = []
+    for _ in range(max(0, -(-count // block_size) - 1)):
+        length, offset = read_varint(data, offset)
+        lengths.append(length)
+    return count, block_size, lengths, offset
+
+
+class PositionReader:
+    """Позиции отдельных документов списка термина: заголовок разбирается один раз"""
+
+    def __init__(self, data: bytes, decode: PositionDecoder):
+        self._data = data
+        self._decode = decode
+        self.count, self._block_size, lengths, offset = _read_header(data) if data else (0, POSITIONS_BLOCK, [], 0)
+        self._block_starts = [offset]
+        for length in lengths:
+            self._block_starts.append(self._block_starts[-1] + length)
+        self.records_decoded = 0
+
+    def __getitem__(self, ordinal: int) -> list[int]:
+        """Позиции документа с порядковым номером ordinal в списке; декодируется только его запись"""
+        if not 0 <= ordinal < self.count:
+            raise IndexError(ordinal)
+        block, position = divmod(ordinal, self._block_size)
+        data = self._data
+        offset = self._block_starts[block]
+        for _ in range(position):
+            length, offset = read_varint(data, offset)
+            offset += length
+        length, offset = read_varint(data, offset)
+        self.records_decoded += 1
+        return self._decode(data[offset: offset + length])
+
+
+def decode_positions(data: bytes, ordinal: int, decode: PositionDecoder) -> list[int]:
+    """Позиции одного документа списка по его порядковому номеру"""
+    return PositionReader(data, decode)[ordinal]
+
+
+def decode_all_positions(data: bytes, decode: PositionDecoder) -> list[list[int]]:
+    """Позиции всех документов списка"""
+    if not data:
+        return []
+    count, _, _, offset = _read_header(data)
+    lists = []
+    for _ in range(count):
+        length, offset = read_varint(data, offset)
+        lists.append(decode(data[offset: offset + length]))
+        offset += length
+    return lists
+
+
+def phrase_match(lists: list[list[int]]) -> bool:
+    """Есть ли вхождение, где i-й термин фразы стоит на i позиций дальше первого"""
+    starts = set(lists[0])
+    for shift, positions in enumerate(lists[1:], 1):
+        starts &= {position - shift for position in positions}
+        if not starts:
+            return False
+    return bool(starts)
+
+
+def near_match(lists: list[list[int]], distance: int) -> bool:
+    """Есть ли окно, в котором встречаются все термины и крайние позиции отстоят не более чем на distance"""
+    pointers = [0] * len(lists)
+    while True:
+        current = [positions[pointer] for positions, pointer in zip(lists, pointers)]
+        lowest = min(current)
+        if max(current) - lowest <= distance:
+            return True
+        # Окно сдвигается за счёт термина с наименьшей позицией
+        i = current.index(lowest)
+        pointers[i] += 1
+        if pointers[i] == len(lists[i]):
+            return False
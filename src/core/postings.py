@@ -0,0 +1,243 @@
+from bisect import bisect_left
+from typing import Callable, Optional
+
+from ..compression.vbyte import VByteEncoder
+from ..utils.exceptions import CompressionError
+
+DEFAULT_BLOCK_SIZE = 128  # ID документов в одном блоке списка
+
+UNKNOWN_LAST_ID = float('inf')  # Верхняя граница блока без записи в таблице пропусков
+
+# Кодирование блока: (ID блока, частоты, последний ID предыдущего блока) -> байты
+BlockEncoder = Callable[[list[int], list[int], int], bytes]
+# Декодирование блока: (байты, последний ID предыдущего блока) -> ID блока
+BlockDecoder = Callable[[bytes, int], list[int]]
+# Декодирование частот блока: байты блока -> частоты
+FrequencyDecoder = Callable[[bytes], list[int]]
+
+
+def read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """Чтение одного varint, возвращает (значение, новое смещение)"""
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise CompressionError("Повреждённый заголовок списка документов")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def gallop(values: list[int], target: int, lo: int = 0) -> int:
+    """Экспоненциальный (galloping) поиск первой позиции values[i] >= target, начиная с lo"""
+    size = len(values)
+    if lo >= size or values[lo] >= target:
+        return lo
+    step = 1
+    hi = lo + 1
+    while hi < size and values[hi] < target:
+        lo = hi
+        step <<= 1
+        hi = lo + step
+    return bisect_left(values, target, lo + 1, min(hi + 1, size))
+
+
+def pack_block(ids_data: bytes, tf_data: bytes) -> bytes:
+    """Блок списка: varint длина ID в байтах, ID, затем частоты тех же документов"""
+    return VByteEncoder.encode([len(ids_data)]) + ids_data + tf_data
+
+
+def unpack_block(data: bytes) -> tuple[bytes, bytes]:
+    """Разделение блока на байты ID и байты частот"""
+    ids_length, offset = read_varint(data, 0)
+    return data[offset: offset + ids_length], data[offset + ids_length:]
+
+
+def encode_blocks(doc_ids: list[int], frequencies: list[int], encode_block: BlockEncoder,
+                  block_size: int = DEFAULT_BLOCK_SIZE) -> bytes:
+    """
+    Кодирование отсортированного списка ID и частот блоками с таблицей пропусков.
+
+    Формат: varint количество ID; если блоков больше одного — varint число блоков
+    и для каждого блока пара varint (прирост последнего ID, длина в байтах);
+    затем байты блоков подряд. Первый блок отсчитывается от базы -1.
+    Частоты каждого блока хранятся в нём же сразу после ID (pack_block),
+    поэтому пропущенные блоки не требуют и декодирования частот.
+    """
+    blocks = []
+    skip_table = []
+    base = -1
+    for start in range(0, len(doc_ids), block_size):
+        block = doc_ids[start: start + block_size]
+        encoded = encode_block(block, frequencies[start: start + block_size], base)
+        blocks.append(encoded)
+        skip_table.append(block[-1] - base)
+        skip_table.append(len(encoded))
+        base = block[-1]
+
+    header = [len(doc_ids)]
+    if len(blocks) > 1:
+        header.append(len(blocks))
+        header.extend(skip_table)
+    return VByteEncoder.encode(header) + b"".join(blocks)
+
+
+def read_skip_table(data: bytes, block_size: int = DEFAULT_BLOCK_SIZE) -> tuple[int, list[int], list[int]]:
+    """
+    Разбор заголовка: (количество ID, последние ID блоков, смещения блоков).
+
+    Смещений на одно больше, чем блоков: последнее указывает на конец данных.
+    Для списка из одного блока последний ID не хранится и заменяется бесконечностью.
+    """
+    doc_count, offset = read_varint(data, 0)
+    if doc_count <= block_size:
+        return doc_count, [UNKNOWN_LAST_ID], [offset, len(data)]
+
+    block_count, offset = read_varint(data, offset)
+    last_ids = []
+    lengths = []
+    last_id = -1
+    for _ in range(block_count):
+        delta, offset = read_varint(data, offset)
+        length, offset = read_varint(data, offset)
+        last_id += delta
+        last_ids.append(last_id)
+        lengths.append(length)
+
+    offsets = [offset]
+    for length in lengths:
+        offsets.append(offsets[-1] + length)
+    return doc_count, last_ids, offsets
+
+
+def posting_count(data: bytes) -> int:
+    """Количество ID в списке (документная частота) без декодирования блоков"""
+    return read_varint(data, 0)[0] if data else 0
+
+
+def decode_blocks(data: bytes, decode_block: BlockDecoder, block_size: int = DEFAULT_BLOCK_SIZE) -> list[list[int]]:
+    """Полное декодирование всех блоков списка"""
+    if not data:
+        return []
+    _, last_ids, offsets = read_skip_table(data, block_size)
+    blocks = []
+    base = -1
+    for i, last_id in enumerate(last_ids):
+        blocks.append(decode_block(data[offsets[i]: offsets[i + 1]], base))
+        base = last_id
+    return blocks
+
+
+class PostingCursor:
+    """Курсор по списку документов: декодирует только те блоки, которые нужны"""
+
+    def __init__(self, data: bytes, decode_block: BlockDecoder, block_size: int = DEFAULT_BLOCK_SIZE,
+                 decode_frequencies: Optional[FrequencyDecoder] = None):
+        self._data = data
+        self._decode_block = decode_block
+        self._decode_frequencies = decode_frequencies
+        if data:
+            self.doc_count, self._last_ids, self._offsets = read_skip_table(data, block_size)
+        else:
+            self.doc_count, self._last_ids, self._offsets = 0, [], [0]
+        self._block = -1  # Номер текущего декодированного блока
+        self._ids: list[int] = []  # ID текущего блока
+        self._tfs: Optional[list[int]] = None  # Частоты текущего блока (декодируются по запросу)
+        self._pos = -1  # Позиция в текущем блоке
+        self.doc_id: Optional[int] = None  # Текущий ID (None до начала и после конца)
+        self.blocks_decoded = 0
+
+    @classmethod
+    def from_ids(cls, doc_ids: list[int], frequencies: Optional[list[int]] = None) -> "PostingCursor":
+        """Курсор по уже декодированному списку (формат без блоков); без частот они равны 1"""
+        cursor = cls(b"", lambda data, base: [])
+        cursor.doc_count = len(doc_ids)
+        cursor._last_ids = [doc_ids[-1]] if doc_ids else []
+        cursor._block = 0 if doc_ids else -1
+        cursor._ids = list(doc_ids)
+        cursor._tfs = list(frequencies) if frequencies is not None else [1] * len(doc_ids)
+        return cursor
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def _load_block(self, block: int) -> None:
+        base = self._last_ids[block - 1] if block > 0 else -1
+        self._ids = self._decode_block(self._data[self._offsets[block]: self._offsets[block + 1]], base)
+        self._tfs = None
+        self._block = block
+        self._pos = -1
+        self.blocks_decoded += 1
+
+    @property
+    def tf(self) -> int:
+        """Частота термина в текущем документе; частоты блока декодируются при первом обращении"""
+        if self._tfs is None:
+            self._tfs = self._decode_frequencies(self._data[self._offsets[self._block]: self._offsets[self._block + 1]])
+        return self._tfs[self._pos]
+
+    def next(self) -> Optional[int]:
+        """Переход к следующему ID; None, если список исчерпан"""
+        self._pos += 1
+        while self._pos >= len(self._ids):
+            if self._block + 1 >= len(self._last_ids):
+                return self._exhaust()
+            self._load_block(self._block + 1)
+            self._pos = 0
+        self.doc_id = self._ids[self._pos]
+        return self.doc_id
+
+    def advance(self, target: int) -> Optional[int]:
+        """Переход к первому ID >= target, пропуская блоки по таблице; None, если такого нет"""
+        if self.doc_id is not None and self.doc_id >= target:
+            return self.doc_id
+        if self._block >= len(self._last_ids):
+            return None
+
+        # Блоки, целиком лежащие левее target, не декодируются
+        if self._block < 0 or self._last_ids[self._block] < target:
+            block = gallop(self._last_ids, target, self._block + 1)
+            if block >= len(self._last_ids):
+                return self._exhaust()
+            self._load_block(block)
+
+        self._pos = gallop(self._ids, target, max(self._pos, 0))
+        if self._pos >= len(self._ids):
+            return self._exhaust()
+        self.doc_id = self._ids[self._pos]
+        return self.doc_id
+
+    def _exhaust(self) -> None:
+        """Перевод курсора в состояние «список исчерпан»"""
+        self._block = len(self._last_ids)
+        self._ids = []
+        self._tfs = []
+        self._pos = 0
+        self.doc_id = None
+        return None
+
+
+def intersect_cursors(cursors: list[PostingCursor]) -> list[int]:
+    """Пересечение списков: самый короткий ведёт, остальные догоняют через advance()"""
+    if not cursors:
+        return []
+    cursors = sorted(cursors, key=len)
+    lead, others = cursors[0], cursors[1:]
+
+    result = []
+    doc_id = lead.next()
+    while doc_id is not None:
+        for cursor in others:
+            found = cursor.advance(doc_id)
+            if found is None:
+                return result
+            if found != doc_id:
+                doc_id = lead.advance(found)
+                break
+        else:
+            result.append(doc_id)
+            doc_id = lead.next()
+    return result
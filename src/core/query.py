@@ -0,0 +1,390 @@
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from .positions import near_match, phrase_match
+from .postings import PostingCursor
+from .scoring import TopK
+from ..compression.vectorized import intersect_sorted
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from .index import InvertedIndex
+
+logger = get_logger(__name__)
+
+DEFAULT_SVS_RATIO = 8.0  # Списки, различающиеся не более чем во столько раз, сливаются целиком
+DEFAULT_MAX_EXPANSIONS = 1024  # Наибольшее число терминов, на которые раскрывается префикс
+
+PREFIX_PATTERN = re.compile(r"(\w+)\*")  # Префиксный терм запроса: «магистр*»
+PHRASE_PATTERN = re.compile(r'"([^"]*)"')  # Фраза в кавычках: «"приёмная комиссия"»
+NEAR_PATTERN = re.compile(r"\w+(?:\s+NEAR/\d+\s+\w+)+")  # «ректор NEAR/5 университет»
+NEAR_OPERATOR = re.compile(r"\s+NEAR/(\d+)\s+")
+
+
+@dataclass
+class ProximityClause:
+    """
+    Условие на позиции терминов: фраза (термины подряд в заданном порядке)
+    или близость NEAR/k (все термины в окне, крайние позиции отстоят не более чем на k).
+    Позиции считаются по терминам после анализа: стоп-слова позиций не занимают
+    """
+    terms: list[str]
+    distance: Optional[int] = None  # None — фраза
+
+    def matches(self, lists: list[list[int]]) -> bool:
+        """Проверка позиций терминов условия в одном документе"""
+        if self.distance is None:
+            return phrase_match(lists)
+        return near_match(lists, self.distance)
+
+    @property
+    def key(self) -> tuple:
+        return tuple(self.terms), self.distance
+
+
+def split_prefixes(query: str) -> tuple[str, list[str]]:
+    """Выделение префиксных термов из запроса: (остальной текст, уникальные префиксы в нижнем регистре)"""
+    prefixes = list(dict.fromkeys(prefix.lower() for prefix in PREFIX_PATTERN.findall(query)))
+    return PREFIX_PATTERN.sub(" ", query), prefixes
+
+
+def split_proximity(query: str, analyze: Callable[[str], list[str]]) -> tuple[str, list[ProximityClause]]:
+    """
+    Выделение фраз и условий NEAR/k: (остальной текст, условия с проанализированными терминами).
+    Условие из одного термина (например, фраза из стоп-слов и одного слова) остаётся обычным текстом;
+    в цепочке «а NEAR/3 б NEAR/5 в» действует наибольшее расстояние
+    """
+    clauses = []
+    rest = []
+
+    def add(text: str, terms: list[str], distance: Optional[int]) -> str:
+        if len(terms) > 1:
+            clauses.append(ProximityClause(terms, distance))
+        else:
+            rest.append(text)
+        return " "
+
+    query = PHRASE_PATTERN.sub(lambda match: add(match.group(1), analyze(match.group(1)), None), query)
+
+    def near(match) -> str:
+        parts = NEAR_OPERATOR.split(match.group(0))
+        terms = [term for word in parts[::2] for term in analyze(word)]
+        return add(" ".join(parts[::2]), terms, max(int(distance) for distance in parts[1::2]))
+
+    query = NEAR_PATTERN.sub(near, query)
+    return " ".join([query, *rest]), clauses
+
+
+def union_postings(lists: Iterable) -> list[int]:
+    """Объединение отсортированных списков ID слиянием через кучу (k-way merge) без повторов"""
+    result = []
+    last = None
+    for doc_id in heapq.merge(*lists):
+        if doc_id != last:
+            result.append(doc_id)
+            last = doc_id
+    return result
+
+
+def gallop_intersect(candidates: list[int], cursor: PostingCursor) -> list[int]:
+    """Пересечение коротких кандидатов с длинным списком через advance() курсора"""
+    result = []
+    for doc_id in candidates:
+        found = cursor.advance(doc_id)
+        if found is None:
+            break
+        if found == doc_id:
+            result.append(doc_id)
+    return result
+
+
+class QueryExecutor:
+    """Исполнитель конъюнктивных запросов: термины по возрастанию частоты, адаптивное пересечение"""
+
+    def __init__(self, index: "InvertedIndex", svs_ratio: float = DEFAULT_SVS_RATIO,
+                 max_expansions: int = DEFAULT_MAX_EXPANSIONS):
+        self.index = index
+        self.svs_ratio = svs_ratio
+        self.max_expansions = max_expansions
+        self._local = threading.local()
+
+    @property
+    def last_stats(self) -> dict:
+        """Статистика последнего запроса текущего потока: запросы сервера выполняются параллельно"""
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = {}
+        return stats
+
+    @last_stats.setter
+    def last_stats(self, stats: dict) -> None:
+        self._local.stats = stats
+
+    def plan(self, terms: list[str]) -> Optional[list[str]]:
+        """Уникальные термины по возрастанию документной частоты; None, если термина нет в индексе"""
+        unique_terms = list(dict.fromkeys(terms))
+        frequencies = {}
+        for term in unique_terms:
+            frequency = self.index.document_frequency(term)
+            if not frequency:
+                return None
+            frequencies[term] = frequency
+        return sorted(unique_terms, key=frequencies.__getitem__)
+
+    def conjunctive(self, terms: list[str], unions: Iterable[list[int]] = ()) -> list[int]:
+        """
+        ID документов, содержащих все термины, по возрастанию.
+        unions — уже объединённые списки раскрытых префиксов: документ должен быть в каждом
+        """
+        ordered = self.plan(terms)
+        self.last_stats = {"terms": list(ordered or []), "steps": []}
+        unions = sorted(unions, key=len)
+        if ordered is None or not (ordered or unions):
+            return []
+
+        # Начало с самого короткого списка: термина или объединения
+        if unions and (not ordered or len(unions[0]) <= self.index.document_frequency(ordered[0])):
+            candidates = unions.pop(0)
+        else:
+            candidates = self.index.postings(ordered.pop(0))
+        for union in unions:
+            candidates = intersect_sorted(candidates, union).tolist()
+            self.last_stats["steps"].append(("*", "union", len(union)))
+
+        for term in ordered:
+            if not candidates:
+                break  # Ранний выход: пересечение уже пусто
+            candidates, step = self.intersect(candidates, term)
+            self.last_stats["steps"].append(step)
+
+        return candidates
+
+    def intersect(self, candidates: list[int], term: str) -> tuple[list[int], tuple]:
+        """Пересечение кандидатов со списком термина; возвращает результат и шаг (термин, способ, затраты)"""
+        frequency = self.index.document_frequency(term)
+        if frequency <= len(candidates) * self.svs_ratio:
+            # Длины сопоставимы — слияние полностью декодированных списков (SvS)
+            postings = self.index.postings_array(term)
+            return intersect_sorted(candidates, postings).tolist(), (term, "svs", frequency)
+        # Сильный перекос — galloping по таблице пропусков длинного списка
+        cursor = self.index.cursor(term)
+        return gallop_intersect(candidates, cursor), (term, "gallop", cursor.blocks_decoded)
+
+    def rank(self, doc_ids: list[int], terms: list[str], k: Optional[int],
+             expanded: Iterable[str] = ()) -> list[tuple[int, float]]:
+        """
+        Оценка кандидатов (ID по возрастанию) по BM25 с удержанием только k лучших в куче.
+        Частоты читаются курсорами: декодируются только блоки, где есть кандидаты.
+        Термины раскрытых префиксов (expanded) обычно короткие и многочисленные,
+        поэтому их вклад добавляется по одному термину за раз, а не курсором на каждый документ
+        """
+        index = self.index
+        scorer = index.scorer
+        avg_length = index.average_length()
+        weights = [(index.cursor(term), index.term_idf(term)) for term in dict.fromkeys(terms)]
+
+        scores = []
+        for doc_id in doc_ids:
+            doc_length = index.doc_lengths.get(doc_id, 0)
+            scores.append(sum(
+                scorer.score(cursor.tf if cursor.advance(doc_id) == doc_id else 0, doc_length, avg_length, idf)
+                for cursor, idf in weights
+            ))
+
+        positions = None
+        for term in expanded:
+            if positions is None:
+                positions = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+            idf = index.term_idf(term)
+            for doc_id, tf in zip(*index.postings_with_frequencies(term)):
+                i = positions.get(doc_id)
+                if i is not None:
+                    scores[i] += scorer.score(tf, index.doc_lengths.get(doc_id, 0), avg_length, idf)
+
+        top = TopK(k)
+        for doc_id, score in zip(doc_ids, scores):
+            top.push(doc_id, score)
+        return top.results()
+
+    def expand(self, prefix: str) -> tuple[list[str], bool]:
+        """
+        Термины словаря с префиксом prefix (в исходной форме или после анализа) и признак усечения.
+        Если терминов больше max_expansions, остаются самые частые (по документной частоте)
+        """
+        forms = self.index.prefix_forms(prefix)
+        if len(forms) == 1:
+            terms = self.index.terms_with_prefix(forms[0])
+        else:
+            terms = sorted({term for form in forms for term in self.index.terms_with_prefix(form)})
+        if len(terms) <= self.max_expansions:
+            return terms, False
+        return sorted(heapq.nlargest(self.max_expansions, terms, key=self.index.document_frequency)), True
+
+    def verify(self, doc_ids: list[int], clauses: list[ProximityClause]) -> list[int]:
+        """
+        Проверка фраз и условий NEAR для кандидатов (ID по возрастанию), прошедших пересечение по ID.
+        Позиции читаются только для кандидатов и только пока условия не опровергнуты
+        """
+        index = self.index
+        terms = list(dict.fromkeys(term for clause in clauses for term in clause.terms))
+        postings = {term: index.postings_array(term) for term in terms}
+        readers = {term: index.position_reader(term) for term in terms}
+        ordinals = dict.fromkeys(terms, 0)  # Кандидаты по возрастанию: поиск продолжается с прежнего места
+
+        def positions(term: str, doc_id: int) -> list[int]:
+            term_postings = postings[term]
+            ordinal = ordinals[term] = bisect_left(term_postings, doc_id, ordinals[term])
+            if ordinal == len(term_postings) or term_postings[ordinal] != doc_id:
+                return []
+            return readers[term][ordinal]
+
+        result = []
+        for doc_id in doc_ids:
+            cache = {}
+            for clause in clauses:
+                lists = []
+                for term in clause.terms:
+                    if term not in cache:
+                        cache[term] = positions(term, doc_id)
+                    lists.append(cache[term])
+                if not all(lists) or not clause.matches(lists):
+                    break
+            else:
+                result.append(doc_id)
+        self.last_stats["verified"] = len(doc_ids)
+        self.last_stats["positions_decoded"] = sum(reader.records_decoded for reader in readers.values())
+        return result
+
+    def search(self, terms: list[str], k: Optional[int], mode: str = 'and', prefixes: Iterable[str] = (),
+               clauses: Iterable[ProximityClause] = (), deleted: frozenset = frozenset()) -> list[tuple[int, float]]:
+        """
+        Запрос с префиксными термами и условиями на позиции.
+
+        Каждый префикс раскрывается по словарю терминов, списки раскрытых терминов
+        объединяются слиянием через кучу. В режиме 'and' документ должен содержать все термины
+        и хотя бы один термин каждого префикса, в режиме 'or' — любой из них. Фразы и NEAR
+        обязательны в обоих режимах: их позиции проверяются только для кандидатов,
+        прошедших пересечение по ID. deleted — исключаемые документы.
+        """
+        clauses = list(clauses)
+        clause_terms = [term for clause in clauses for term in clause.terms]
+        scored = list(dict.fromkeys([*terms, *clause_terms]))
+
+        start_time = time.perf_counter()
+        groups = {}
+        truncated = []
+        for prefix in prefixes:
+            groups[prefix], cut = self.expand(prefix)
+            if cut:
+                truncated.append(prefix)
+        expansion_time = time.perf_counter() - start_time
+
+        # Раскрытые термины, совпавшие с обычными, учитываются в оценке один раз
+        expanded = [term for term in dict.fromkeys(term for group in groups.values() for term in group)
+                    if term not in scored]
+        start_time = time.perf_counter()
+        # Размеры объединений: сумма длин объединяемых списков и длина результата
+        union_sizes = {}
+        stats = {"terms": list(scored), "steps": []}
+        if mode == 'or' and clauses:
+            # Обязательны только условия на позиции, остальные термины лишь влияют на оценку
+            doc_ids = self.conjunctive(clause_terms)
+            stats = self.last_stats
+        elif mode == 'or':
+            lists = [*scored, *expanded]
+            doc_ids = union_postings(self.index.postings(term) for term in lists)
+            union_sizes["*"] = (sum(map(self.index.document_frequency, lists)), len(doc_ids))
+        else:
+            unions = []
+            for prefix, group in groups.items():
+                unions.append(union_postings(self.index.postings(term) for term in group))
+                union_sizes[prefix] = (sum(map(self.index.document_frequency, group)), len(unions[-1]))
+            doc_ids = []
+            if all(unions):
+                doc_ids = self.conjunctive(scored, unions)
+                stats = self.last_stats
+        union_time = time.perf_counter() - start_time
+        if deleted:
+            doc_ids = [doc_id for doc_id in doc_ids if doc_id not in deleted]
+        candidates = len(doc_ids)
+
+        self.last_stats = stats
+        if clauses and self.index.positions is None:
+            logger.warning("Индекс построен без позиций: фразы и NEAR проверяются только по наличию терминов")
+        elif clauses:
+            doc_ids = self.verify(doc_ids, clauses)
+
+        results = self.rank(doc_ids, scored, k, expanded)
+        stats.update({
+            "expansions": {prefix: len(group) for prefix, group in groups.items()},
+            "truncated": truncated,
+            "expansion_time": expansion_time,
+            "unions": union_sizes,
+            "union_time": union_time,
+            "candidates": candidates,
+        })
+        return results
+
+    def disjunctive(self, terms: list[str], k: Optional[int]) -> list[tuple[int, float]]:
+        """
+        Документы с любым из терминов, k лучших по BM25 (алгоритм MaxScore).
+
+        Термины упорядочены по верхней границе вклада. «Несущественные» термины,
+        сумма границ которых не превышает порога кучи, не порождают кандидатов —
+        их курсоры лишь догоняют кандидатов из существенных списков.
+        """
+        index = self.index
+        scorer = index.scorer
+        avg_length = index.average_length()
+
+        lists = []
+        for term in dict.fromkeys(terms):
+            if index.document_frequency(term):
+                idf = index.term_idf(term)
+                lists.append((index.term_upper_bound(term), idf, index.cursor(term), term))
+        lists.sort(key=lambda item: item[0])
+        self.last_stats = {"terms": [item[3] for item in lists], "scored": 0, "skipped": 0}
+        if not lists:
+            return []
+
+        bounds = []  # Префиксные суммы верхних границ
+        for bound, *_ in lists:
+            bounds.append(bound + (bounds[-1] if bounds else 0.0))
+        for item in lists:
+            item[2].next()
+
+        top = TopK(k)
+        first_essential = 0
+        while True:
+            essential = [item for item in lists[first_essential:] if item[2].doc_id is not None]
+            if not essential:
+                break
+            doc_id = min(item[2].doc_id for item in essential)
+            doc_length = index.doc_lengths.get(doc_id, 0)
+
+            score = 0.0
+            for _, idf, cursor, _ in essential:
+                if cursor.doc_id == doc_id:
+                    score += scorer.score(cursor.tf, doc_length, avg_length, idf)
+                    cursor.next()
+
+            # Несущественные списки проверяются, только пока документ ещё может войти в топ
+            for i in range(first_essential - 1, -1, -1):
+                if score + bounds[i] <= top.threshold:
+                    self.last_stats["skipped"] += 1
+                    break
+                _, idf, cursor, _ = lists[i]
+                if cursor.advance(doc_id) == doc_id:
+                    score += scorer.score(cursor.tf, doc_length, avg_length, idf)
+
+            self.last_stats["scored"] += 1
+            top.push(doc_id, score)
+            while first_essential < len(lists) and bounds[first_essential] <= top.threshold:
+                first_essential += 1
+
+        return top.results()
@@ -0,0 +1,82 @@
+import heapq
+import math
+from typing import Callable, Optional
+
+
+class BM25:
+    """Ранжирующая функция Okapi BM25"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        if k1 < 0 or not 0 <= b <= 1:
+            raise ValueError("Параметры BM25: k1 >= 0, 0 <= b <= 1")
+        self.k1 = k1
+        self.b = b
+
+    @staticmethod
+    def idf(document_frequency: int, num_documents: int) -> float:
+        """Обратная документная частота (всегда неотрицательна)"""
+        return math.log(1 + (num_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def score(self, tf: int, doc_length: int, avg_length: float, idf: float) -> float:
+        """Вклад одного термина в оценку документа"""
+        if not tf:
+            return 0.0
+        norm = self.k1 * (1 - self.b + self.b * doc_length / avg_length) if avg_length else self.k1
+        return idf * tf * (self.k1 + 1) / (tf + norm)
+
+    def upper_bound(self, idf: float) -> float:
+        """Верхняя граница вклада термина при любых tf и длине документа"""
+        return idf * (self.k1 + 1)
+
+
+class TopK:
+    """Ограниченная куча лучших k документов (k=None — без ограничения)"""
+
+    def __init__(self, k: Optional[int]):
+        self.k = k if k is not None else math.inf
+        self._heap: list[tuple[float, int]] = []  # (оценка, -ID): меньший ID выигрывает при равенстве
+
+    @property
+    def threshold(self) -> float:
+        """Минимальная оценка, которую нужно превзойти, чтобы попасть в топ"""
+        return self._heap[0][0] if len(self._heap) >= self.k else 0.0
+
+    def push(self, doc_id: int, score: float) -> None:
+        item = (score, -doc_id)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def results(self) -> list[tuple[int, float]]:
+        """Пары (ID, оценка) по убыванию оценки"""
+        return [(-neg_id, score) for score, neg_id in sorted(self._heap, reverse=True)]
+
+
+class CollectionStatistics:
+    """
+    Статистики всей коллекции для согласованных оценок BM25 в нескольких индексах.
+
+    Каждый сегмент составного индекса оценивает документы по общим числу
+    документов, средней длине и документным частотам, поэтому оценки
+    из разных сегментов сравнимы между собой.
+    """
+
+    def __init__(self, scorer: BM25, num_documents: int, total_length: int,
+                 document_frequency: Callable[[str], int]):
+        self.scorer = scorer
+        self.num_documents = num_documents
+        self.total_length = total_length
+        self.document_frequency = document_frequency  # Термин -> число документов во всей коллекции
+        self._idf: dict[str, float] = {}
+
+    @property
+    def average_length(self) -> float:
+        return self.total_length / self.num_documents if self.num_documents else 0.0
+
+    def idf(self, term: str) -> float:
+        idf = self._idf.get(term)
+        if idf is None:
+            idf = self.scorer.idf(self.document_frequency(term), self.num_documents)
+            self._idf[term] = idf
+        return idf
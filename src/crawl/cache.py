@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Mapping, Optional
+
+from ..storage.docstore import replace_file
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join("data", "crawl_cache")
+
+# cached — сохранённые страницы без обращения к сети, отсутствующие загружаются;
+# refresh — условные запросы (If-None-Match/If-Modified-Since) для сохранённых страниц;
+# offline — только сохранённые страницы, сеть не используется
+CACHE_MODES = ('cached', 'refresh', 'offline')
+
+OBJECTS_DIR = "objects"  # Сжатый HTML по SHA-256 содержимого
+PAGES_DIR = "pages"  # Записи URL -> содержимое и заголовки проверки
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass
+class CachedPage:
+    """Запись о сохранённой странице"""
+    url: str
+    digest: str  # SHA-256 HTML в кодировке UTF-8
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+class CrawlCache:
+    """
+    Кэш загруженных страниц на диске с адресацией по содержимому.
+
+    HTML хранится сжатым в objects/ под SHA-256 содержимого, поэтому одинаковые
+    страницы с разных URL занимают место один раз. Для каждого URL в pages/ хранится
+    запись с хешем и заголовками ETag/Last-Modified для условной перезагрузки.
+    Файлы записываются атомарно: прерванная загрузка не портит кэш.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_DIR, mode: str = 'cached'):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Режим кэша должен быть одним из {CACHE_MODES}")
+        self.path = path
+        self.mode = mode
+        self.hits = 0  # Страницы из кэша без обращения к сети
+        self.not_modified = 0  # Ответы 304 на условные запросы
+        self.fetched = 0  # Полностью загруженные страницы
+        self.unchanged = 0  # Загруженные заново, но с прежним содержимым
+        self.misses = 0  # Страницы, отсутствующие в кэше в режиме offline
+        os.makedirs(os.path.join(path, OBJECTS_DIR), exist_ok=True)
+        os.makedirs(os.path.join(path, PAGES_DIR), exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.path, OBJECTS_DIR, digest[:2], digest)
+
+    def _page_path(self, url: str) -> str:
+        key = _digest(url.encode("utf-8"))
+        return os.path.join(self.path, PAGES_DIR, key[:2], key + ".json")
+
+    def entry(self, url: str) -> Optional[CachedPage]:
+        """Запись о странице или None, если URL не сохранялся"""
+        try:
+            with open(self._page_path(url), "r", encoding="utf-8") as f:
+                return CachedPage(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Повреждённая запись кэша для {url}: {str(e)}")
+            return None
+
+    def load(self, entry: CachedPage) -> Optional[str]:
+        """HTML сохранённой страницы (None, если содержимое удалено из кэша)"""
+        try:
+            with open(self._object_path(entry.digest), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (FileNotFoundError, zlib.error) as e:
+            logger.warning(f"Не удалось прочитать содержимое {entry.url} из кэша: {str(e)}")
+            return None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedPage]) -> dict:
+        """Заголовки условного запроса для сохранённой страницы"""
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, html: str, headers: Mapping[str, str]) -> bool:
+        """Сохранение загруженной страницы; возвращает True, если содержимое изменилось"""
+        data = html.encode("utf-8")
+        digest = _digest(data)
+        previous = self.entry(url)
+
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            with replace_file(object_path) as f:
+                f.write(zlib.compress(data))
+
+        self._write_entry(CachedPage(url, digest, headers.get("ETag"), headers.get("Last-Modified"), time.time()))
+        self.fetched += 1
+        changed = previous is None or previous.digest != digest
+        if not changed:
+            self.unchanged += 1
+        return changed
+
+    def revalidated(self, entry: CachedPage, headers: Mapping[str, str]) -> None:
+        """Ответ 304: содержимое прежнее, обновляются только заголовки проверки"""
+        entry.etag = headers.get("ETag", entry.etag)
+        entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+        entry.fetched_at = time.time()
+        self._write_entry(entry)
+        self.not_modified += 1
+
+    def _write_entry(self, entry: CachedPage) -> None:
+        path = self._page_path(entry.url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with replace_file(path, "w") as f:
+            json.dump(asdict(entry), f, ensure_ascii=False)
+
+    def cache_info(self) -> dict:
+        """Статистика обращений к кэшу за время работы"""
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "fetched": self.fetched,
+            "unchanged": self.unchanged,
+            "misses": self.misses,
+        }
@@ -0,0 +1,193 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from ..utils.exceptions import FetchError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_INITIAL_CONCURRENCY = 4  # Предел растёт от этого значения, пока растёт пропускная способность
+DEFAULT_PER_HOST = 8
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_BACKOFF = 0.5  # Задержка перед первым повтором, с
+MAX_BACKOFF = 30.0
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_EXCEPTIONS = (FetchError, aiohttp.ClientError, asyncio.TimeoutError)
+
+LATENCY_SMOOTHING = 0.2  # Вес нового замера в скользящем среднем задержки
+LATENCY_TOLERANCE = 2.0  # Во сколько раз задержка может превысить минимальную до снижения предела
+LATENCY_SLACK = 0.05  # Абсолютный допуск, с: на быстрых ответах относительный шум велик
+DECREASE_FACTOR = 0.7
+
+
+@dataclass
+class CrawlStats:
+    """Счётчики загрузки и пропускная способность"""
+    pages: int = 0  # Успешные ответы (включая 304 и ответы с ошибкой клиента)
+    bytes: int = 0  # Байты тел ответов
+    retries: int = 0
+    failed: int = 0  # URL, не загруженные после всех повторов
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.started, 1e-9)
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed
+
+
+class _Host:
+    """Ограничения одного хоста: число одновременных запросов и время следующего запроса"""
+
+    def __init__(self, per_host: int):
+        self.semaphore = asyncio.Semaphore(per_host)
+        self.next_time = 0.0
+
+
+class CrawlScheduler:
+    """
+    Планировщик HTTP-запросов загрузчика.
+
+    Ограничивает число одновременных запросов к каждому хосту и их частоту,
+    повторяет запросы при сетевых ошибках, таймаутах и ответах 429/5xx
+    с экспоненциальной задержкой и случайным разбросом. Общий предел одновременных
+    запросов подбирается по принципу AIMD: растёт на единицу за «окно» успешных
+    ответов и умножается на DECREASE_FACTOR при ошибках или росте задержки
+    относительно наименьшей наблюдавшейся.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, per_host: int = DEFAULT_PER_HOST,
+                 host_rate: Optional[float] = None, retries: int = DEFAULT_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT, backoff: float = DEFAULT_BACKOFF,
+                 initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY, min_concurrency: int = 1):
+        if max_concurrency < 1 or per_host < 1:
+            raise ValueError("Пределы одновременных запросов должны быть положительными")
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.per_host = per_host
+        self.host_rate = host_rate  # Запросов в секунду к одному хосту, None — без ограничения
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), max_concurrency))
+        self.stats = CrawlStats()
+        self._active = 0
+        self._condition: Optional[asyncio.Condition] = None  # Создаётся в цикле событий
+        self._hosts: dict[str, _Host] = {}
+        self._latency: Optional[float] = None
+        self._min_latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @asynccontextmanager
+    async def _slot(self, host: str):
+        """Место под запрос: сначала у хоста (с учётом частоты), затем в общем пределе"""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _Host(self.per_host)
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        async with state.semaphore:
+            if self.host_rate:
+                now = time.monotonic()
+                start = max(now, state.next_time)
+                state.next_time = start + 1 / self.host_rate
+                if start > now:
+                    await asyncio.sleep(start - now)
+
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._active < int(self.limit))
+                self._active += 1
+            try:
+                yield
+            finally:
+                async with self._condition:
+                    self._active -= 1
+                    self._condition.notify_all()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Задержка перед повтором номер attempt (с нуля): экспонента с разбросом ±50%"""
+        return min(MAX_BACKOFF, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _record(self, latency: float, error: bool) -> None:
+        """Подстройка общего предела по задержке и ошибкам очередного ответа"""
+        if error:
+            congested = True
+        else:
+            self._latency = latency if self._latency is None else \
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self._latency
+            self._min_latency = min(self._min_latency or self._latency, self._latency)
+            congested = self._latency > LATENCY_TOLERANCE * self._min_latency + LATENCY_SLACK
+
+        if not congested:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            return
+        # Ответы на уже отправленные запросы приходят пачкой: снижение не чаще раза за время ответа
+        now = time.monotonic()
+        if now - self._last_decrease >= (self._latency or 0.0):
+            self.limit = max(float(self.min_concurrency), self.limit * DECREASE_FACTOR)
+            self._last_decrease = now
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str,
+                    handle: Callable[[aiohttp.ClientResponse], Awaitable[T]], headers: Optional[dict] = None) -> T:
+        """
+        GET-запрос с ограничениями и повторами; handle обрабатывает ответ (кроме 429/5xx).
+        После исчерпания повторов пробрасывает последнюю ошибку.
+        """
+        host = urlsplit(url).hostname or ""
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        attempt = 0
+        while True:
+            async with self._slot(host):
+                start = time.monotonic()
+                try:
+                    async with session.get(url, timeout=timeout, headers=headers) as response:
+                        if response.status in RETRY_STATUSES:
+                            raise FetchError(f"HTTP {response.status}")
+                        result = await handle(response)
+                        self.stats.bytes += response.content.total_bytes
+                except RETRY_EXCEPTIONS as e:
+                    self._record(time.monotonic() - start, error=True)
+                    if attempt >= self.retries:
+                        self.stats.failed += 1
+                        raise
+                    logger.debug(f"Повтор {attempt + 1} для {url}: {type(e).__name__} {str(e)}")
+                else:
+                    self._record(time.monotonic() - start, error=False)
+                    self.stats.pages += 1
+                    return result
+            # Ожидание вне слота: повтор не занимает место других запросов
+            self.stats.retries += 1
+            await asyncio.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    def report(self) -> dict:
+        """Пропускная способность и текущее состояние планировщика"""
+        return {
+            "pages": self.stats.pages,
+            "bytes": self.stats.bytes,
+            "retries": self.stats.retries,
+            "failed": self.stats.failed,
+            "pages_per_second": self.stats.pages_per_second,
+            "bytes_per_second": self.stats.bytes_per_second,
+            "concurrency": self.limit,
+            "latency": self._latency,
+        }
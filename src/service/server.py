@@ -0,0 +1,234 @@
+import json
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from ..core.index import InvertedIndex
+from ..storage.segment import META_FILE
+from ..storage.segmented import MANIFEST_FILE, is_segmented
+from ..utils.exceptions import QueryError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_RELOAD_INTERVAL = 1.0  # Как часто (в секундах) проверять изменение файла индекса
+MAX_BATCH_SIZE = 1000  # Ограничение числа запросов в одном пакете
+SEARCH_MODES = ('and', 'or')
+
+
+class IndexHolder:
+    """Загруженный один раз индекс с горячей перезагрузкой при изменении файла"""
+
+    def __init__(self, path: str, loader: Callable[[str], InvertedIndex],
+                 reload_interval: Optional[float] = DEFAULT_RELOAD_INTERVAL):
+        self.path = path
+        self.loader = loader
+        self.reload_interval = reload_interval  # None — без перезагрузки
+        self.generation = 0  # Номер загруженной версии индекса
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._signature = self._current_signature()
+        self._index = loader(path)
+
+    def _current_signature(self) -> Optional[int]:
+        """Время изменения индекса: у сегментов — файл метаданных, записываемый последним"""
+        path = self.path
+        if os.path.isdir(path):
+            path = os.path.join(path, MANIFEST_FILE if is_segmented(path) else META_FILE)
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @property
+    def index(self) -> InvertedIndex:
+        """Текущий индекс; не чаще reload_interval проверяет, не изменился ли файл"""
+        if self.reload_interval is not None and time.monotonic() - self._checked >= self.reload_interval:
+            self.reload_if_changed()
+        return self._index
+
+    def reload_if_changed(self) -> bool:
+        """Перезагрузка индекса, если файл изменился; при ошибке остаётся прежний индекс"""
+        with self._lock:
+            self._checked = time.monotonic()
+            signature = self._current_signature()
+            if signature is None or signature == self._signature:
+                return False
+            try:
+                index = self.loader(self.path)
+            except Exception as e:
+                logger.error(f"Ошибка перезагрузки индекса {self.path}: {str(e)}")
+                return False
+            # Запросы в работе дочитывают старый индекс: ссылка заменяется целиком
+            self._index = index
+            self._signature = signature
+            self.generation += 1
+            logger.info(f"Индекс {self.path} перезагружен (версия {self.generation})")
+            return True
+
+
+def run_query(index: InvertedIndex, query: str, top: int = 10, mode: str = 'and') -> dict:
+    """Ответ на один запрос: найденные ID, оценки и метаданные (без текста документов)"""
+    start_time = time.perf_counter()
+    # Внутренняя ошибка не должна выглядеть как пустой результат
+    hits = index.search_scored(query, k=top, mode=mode, strict=True)
+    return {
+        "query": query,
+        "hits": [
+            {"doc_id": doc_id, "score": score, "metadata": index.documents.metadata(doc_id)}
+            for doc_id, score in hits
+        ],
+        "took_ms": (time.perf_counter() - start_time) * 1000,
+    }
+
+
+def _query_params(request: dict, defaults: dict) -> tuple[str, int, str]:
+    """Проверка параметров одного запроса"""
+    if isinstance(request, str):
+        request = {"query": request}
+    query = request.get("query")
+    top = request.get("top", defaults.get("top", 10))
+    mode = request.get("mode", defaults.get("mode", 'and'))
+    if not isinstance(query, str):
+        raise ValueError("Поле query должно быть строкой")
+    if not isinstance(top, int) or top < 0:
+        raise ValueError("Поле top должно быть неотрицательным целым числом")
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Поле mode должно быть одним из {SEARCH_MODES}")
+    return query, top, mode
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API поиска:
+
+    * GET /search?q=...&top=10&mode=and — один запрос;
+    * POST /search с JSON {"query": ...} или {"queries": [...], "top": ..., "mode": ...} — пакет;
+    * GET /health — состояние сервера, версия индекса и статистика кэшей.
+    """
+
+    protocol_version = "HTTP/1.1"  # Соединения переиспользуются генератором нагрузки
+    # Заголовки и тело уходят отдельными записями: без TCP_NODELAY ответ ждёт отложенного ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            holder = self.server.holder
+            index = holder.index
+            status = {"status": "ok", "documents": len(index.documents), "generation": holder.generation,
+                      "query_cache": index.query_cache.cache_info()}
+            if hasattr(index, "postings_cache"):  # У составного индекса кэши списков в сегментах
+                status["postings_cache"] = index.postings_cache.cache_info()
+            self._send_json(200, status)
+        elif url.path == "/search":
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                request = {"query": params.get("q", params.get("query"))}
+                if "top" in params:
+                    request["top"] = int(params["top"])
+                if "mode" in params:
+                    request["mode"] = params["mode"]
+                query, top, mode = _query_params(request, {})
+                response = run_query(self.server.holder.index, query, top, mode)
+            except (ValueError, QueryError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            except Exception as e:
+                self._send_internal_error(e)
+                return
+            self._send_json(200, response)
+        else:
+            self._send_json(404, {"error": "Неизвестный путь"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/search":
+            self._send_json(404, {"error": "Неизвестный путь"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("Тело запроса должно быть JSON-объектом")
+
+            # Весь пакет выполняется на одной версии индекса
+            index = self.server.holder.index
+            if "queries" in body:
+                requests = body["queries"]
+                if not isinstance(requests, list) or len(requests) > MAX_BATCH_SIZE:
+                    raise ValueError(f"Поле queries должно быть списком не длиннее {MAX_BATCH_SIZE}")
+                params = [_query_params(request, body) for request in requests]
+                response = {"results": [run_query(index, *query_params) for query_params in params]}
+            else:
+                response = run_query(index, *_query_params(body, {}))
+        except (ValueError, QueryError) as e:  # json.JSONDecodeError — подкласс ValueError
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_internal_error(e)
+            return
+        self._send_json(200, response)
+
+    def _send_internal_error(self, error: Exception) -> None:
+        logger.error(f"Ошибка выполнения запроса {self.path}: {str(error)}", exc_info=True)
+        self._send_json(500, {"error": "Внутренняя ошибка поиска"})
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # У Unix-сокета адрес клиента — пустая строка
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class SearchHTTPServer(ThreadingHTTPServer):
+    """Многопоточный HTTP-сервер поиска на TCP-порту"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], holder: IndexHolder):
+        super().__init__(address, SearchRequestHandler)
+        self.holder = holder
+
+
+class UnixSearchRequestHandler(SearchRequestHandler):
+    """Обработчик для Unix-сокета: опция TCP_NODELAY к нему неприменима"""
+
+    disable_nagle_algorithm = False
+
+
+class UnixSearchHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Многопоточный HTTP-сервер поиска на Unix-сокете"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, holder: IndexHolder):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, UnixSearchRequestHandler)
+        self.holder = holder
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def create_server(holder: IndexHolder, host: str = "127.0.0.1", port: int = 8080,
+                  socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """Сервер на Unix-сокете, если указан путь, иначе на TCP-порту"""
+    if socket_path:
+        return UnixSearchHTTPServer(socket_path, holder)
+    return SearchHTTPServer((host, port), holder)
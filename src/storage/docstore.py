@@ -0,0 +1,202 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping, MutableMapping
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from ..core.document import Document
+from ..utils.exceptions import IndexationError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STORED_FILE = "stored.bin"
+TABLE_FILE = "docs.bin"
+
+STORED_COMPRESSION = ('none', 'zlib')
+
+# Запись документа: ID, смещение полей, длина метаданных, длина текста, длина документа в терминах
+DOC_RECORD = struct.Struct("<IQIII")
+
+
+def map_file(path: str):
+    """Отображение файла в память (пустой файл отображать нельзя)"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@contextmanager
+def replace_file(path: str, mode: str = "wb"):
+    """
+    Запись во временный файл с атомарной заменой исходного.
+
+    Открытые через mmap старые файлы остаются целыми: они ссылаются на прежний inode,
+    поэтому процесс, читающий индекс, может безопасно перезагрузить его позже.
+    """
+    tmp_path = path + ".tmp"
+    encoding = None if "b" in mode else "utf-8"
+    with open(tmp_path, mode, encoding=encoding) as f:
+        yield f
+    os.replace(tmp_path, path)
+
+
+class DocumentStore(Mapping):
+    """Хранилище документов: ID -> Document, поля загружаются по требованию"""
+
+    def metadata(self, doc_id: int) -> dict:
+        """Только метаданные документа (без текста)"""
+        return self[doc_id].metadata
+
+    def fetch(self, doc_ids: Iterable[int], metadata_only: bool = False) -> list:
+        """Документы (или их метаданные) для списка ID, например для результатов поиска"""
+        if metadata_only:
+            return [self.metadata(doc_id) for doc_id in doc_ids]
+        return [self[doc_id] for doc_id in doc_ids]
+
+
+class MemoryDocumentStore(DocumentStore, MutableMapping):
+    """Хранилище в памяти, используется при построении индекса"""
+
+    def __init__(self, documents: Mapping = None):
+        self._documents: dict[int, Document] = dict(documents or {})
+
+    def __getitem__(self, doc_id: int) -> Document:
+        return self._documents[doc_id]
+
+    def __setitem__(self, doc_id: int, document: Document) -> None:
+        self._documents[doc_id] = document
+
+    def __delitem__(self, doc_id: int) -> None:
+        del self._documents[doc_id]
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._documents
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._documents)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+class DiskDocumentStore(DocumentStore):
+    """
+    Хранилище на диске: таблица записей фиксированного размера и файл полей.
+
+    Записи адресуются смещениями и отсортированы по ID (двоичный поиск).
+    Метаданные хранятся отдельно от текста, поэтому читаются без его распаковки;
+    текст при необходимости сжимается zlib.
+    """
+
+    def __init__(self, table_data, stored_data, compression: str = 'none'):
+        if compression not in STORED_COMPRESSION:
+            raise IndexationError(f"Неизвестное сжатие хранимых полей: {compression}")
+        self._table = table_data
+        self._stored = stored_data
+        self.compression = compression
+        self._count = len(table_data) // DOC_RECORD.size
+
+    @classmethod
+    def open(cls, path: str, compression: str = 'none') -> "DiskDocumentStore":
+        """Открытие хранилища из каталога через mmap"""
+        return cls(map_file(os.path.join(path, TABLE_FILE)),
+                   map_file(os.path.join(path, STORED_FILE)), compression)
+
+    @staticmethod
+    def write(documents: Mapping, doc_lengths: Mapping, path: str, compression: str = 'none') -> None:
+        """Запись документов в каталог: поля по возрастанию ID и таблица смещений"""
+        if compression not in STORED_COMPRESSION:
+            raise IndexationError(f"Неизвестное сжатие хранимых полей: {compression}")
+        offset = 0
+        with replace_file(os.path.join(path, STORED_FILE)) as stored_file, \
+                replace_file(os.path.join(path, TABLE_FILE)) as table_file:
+            for doc_id in sorted(documents):
+                document = documents[doc_id]
+                metadata = json.dumps(document.metadata, ensure_ascii=False).encode("utf-8")
+                text = document.text.encode("utf-8")
+                if compression == 'zlib':
+                    text = zlib.compress(text)
+
+                stored_file.write(metadata)
+                stored_file.write(text)
+                table_file.write(DOC_RECORD.pack(doc_id, offset, len(metadata), len(text),
+                                                 doc_lengths.get(doc_id, 0)))
+                offset += len(metadata) + len(text)
+
+    def _find(self, doc_id: int) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < doc_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self._record(lo)[0] == doc_id else -1
+
+    def _record(self, i: int) -> tuple[int, int, int, int, int]:
+        return DOC_RECORD.unpack_from(self._table, i * DOC_RECORD.size)
+
+    def _lookup(self, doc_id: int) -> tuple[int, int, int, int, int]:
+        i = self._find(doc_id) if isinstance(doc_id, int) else -1
+        if i < 0:
+            raise KeyError(doc_id)
+        return self._record(i)
+
+    def metadata(self, doc_id: int) -> dict:
+        _, offset, metadata_length, _, _ = self._lookup(doc_id)
+        return json.loads(self._stored[offset: offset + metadata_length].decode("utf-8"))
+
+    def text(self, doc_id: int) -> str:
+        """Только текст документа"""
+        _, offset, metadata_length, text_length, _ = self._lookup(doc_id)
+        start = offset + metadata_length
+        text = self._stored[start: start + text_length]
+        if self.compression == 'zlib':
+            text = zlib.decompress(text)
+        return text.decode("utf-8")
+
+    def length(self, doc_id: int) -> int:
+        """Длина документа в терминах"""
+        return self._lookup(doc_id)[4]
+
+    @property
+    def lengths(self) -> Mapping:
+        """Длины документов в виде отображения ID -> длина"""
+        return _DocLengths(self)
+
+    def __getitem__(self, doc_id: int) -> Document:
+        return Document(doc_id, self.text(doc_id), self.metadata(doc_id))
+
+    def __contains__(self, doc_id) -> bool:
+        return isinstance(doc_id, int) and self._find(doc_id) >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        for i in range(self._count):
+            yield self._record(i)[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class _DocLengths(Mapping):
+    """Длины документов из таблицы дискового хранилища"""
+
+    def __init__(self, store: DiskDocumentStore):
+        self._store = store
+
+    def __getitem__(self, doc_id: int) -> int:
+        return self._store.length(doc_id)
+
+    def __contains__(self, doc_id) -> bool:
+        return doc_id in self._store
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._store)
+
+    def __len__(self) -> int:
+        return len(self._store)
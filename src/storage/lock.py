@@ -0,0 +1,54 @@
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Неблокирующая монопольная блокировка файла между процессами.
+
+    Блокировку держит открытый файл: при завершении процесса она снимается
+    операционной системой, поэтому «зависших» файлов блокировки не остаётся.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: Optional[IO] = None
+
+    @property
+    def locked(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Захват блокировки; False, если её держит другой процесс или объект"""
+        if self._file is not None:
+            return True
+        f = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
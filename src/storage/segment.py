@@ -0,0 +1,166 @@
+import json
+import os
+import struct
+from collections.abc import Mapping, MutableMapping
+from typing import Iterator
+
+from ..core.index import InvertedIndex
+from ..core.scoring import BM25
+from .docstore import DiskDocumentStore, map_file, replace_file
+from .terms import TERM_RECORD, TermDictionary, encode_terms
+from ..utils.exceptions import IndexationError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FORMAT_NAME = "segment"
+FORMAT_VERSION = 4  # 3 — частоты внутри блоков списков, 4 — словарь терминов со сжатием префиксов
+
+META_FILE = "meta.json"
+TERMS_FILE = "terms.bin"
+POSTINGS_FILE = "postings.bin"
+POSITIONS_FILE = "positions.bin"  # Необязательный: только для индексов с позициями
+
+# Запись позиций термина (по номеру термина в словаре): смещение и длина
+POSITION_RECORD = struct.Struct("<QI")
+
+
+def is_segment(path: str) -> bool:
+    """Проверка, что путь указывает на каталог бинарного сегмента"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def write_segment(index: InvertedIndex, path: str, stored_compression: str = 'zlib') -> None:
+    """Запись индекса в каталог сегмента: словарь терминов, списки, хранимые поля"""
+    os.makedirs(path, exist_ok=True)
+    if not index.idf:
+        index.compute_term_statistics()
+
+    # Термины сортируются по байтам UTF-8 — в том же порядке идёт двоичный поиск
+    terms = sorted(index.index, key=lambda term: term.encode("utf-8"))
+    records = []
+    offset = 0
+    with replace_file(os.path.join(path, POSTINGS_FILE)) as postings_file:
+        for term in terms:
+            postings = bytes(index.index[term])
+            postings_file.write(postings)
+            records.append(TERM_RECORD.pack(offset, len(postings), index.term_idf(term), index.term_upper_bound(term)))
+            offset += len(postings)
+
+    with replace_file(os.path.join(path, TERMS_FILE)) as terms_file:
+        terms_file.write(encode_terms([term.encode("utf-8") for term in terms], records))
+
+    if index.positions is not None:
+        # Таблица смещений по номерам терминов, затем позиции подряд; обычные запросы файл не читают
+        records = []
+        offset = 0
+        for term in terms:
+            length = len(index.positions.get(term, b""))
+            records.append(POSITION_RECORD.pack(offset, length))
+            offset += length
+        with replace_file(os.path.join(path, POSITIONS_FILE)) as positions_file:
+            positions_file.write(b"".join(records))
+            for term in terms:
+                positions_file.write(bytes(index.positions.get(term, b"")))
+
+    DiskDocumentStore.write(index.documents, index.doc_lengths, path, stored_compression)
+
+    meta = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "compression_method": index.compression_method,
+        "block_size": index.block_size,
+        "bm25": {"k1": index.scorer.k1, "b": index.scorer.b},
+        "num_terms": len(terms),
+        "num_documents": len(index.documents),
+        "total_length": index.total_length,
+        "stored_compression": stored_compression,
+        "positions": index.positions is not None,
+    }
+    # meta.json пишется последним: его изменение сигнализирует о готовом сегменте
+    with replace_file(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+class _TermPositions(Mapping):
+    """Позиции терминов сегмента: термин -> закодированные позиции (читаются через mmap)"""
+
+    def __init__(self, terms: TermDictionary, data):
+        self._terms = terms
+        self._data = data
+        self._data_start = len(terms) * POSITION_RECORD.size
+
+    def __getitem__(self, term: str) -> bytes:
+        i = self._terms.find(term)
+        if i < 0:
+            raise KeyError(term)
+        offset, length = POSITION_RECORD.unpack_from(self._data, i * POSITION_RECORD.size)
+        start = self._data_start + offset
+        return self._data[start: start + length]
+
+    def __contains__(self, term) -> bool:
+        return term in self._terms
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+class _TermStatistic(MutableMapping):
+    """Статистика термина из словаря (IDF или максимальный вклад) с локальным дополнением"""
+
+    def __init__(self, terms: TermDictionary, field: int):
+        self._terms = terms
+        self._field = field
+        self._overlay: dict[str, float] = {}
+
+    def __getitem__(self, term: str) -> float:
+        if term in self._overlay:
+            return self._overlay[term]
+        i = self._terms.find(term)
+        if i < 0:
+            raise KeyError(term)
+        return self._terms.record(i)[self._field]
+
+    def __setitem__(self, term: str, value: float) -> None:
+        self._overlay[term] = value
+
+    def __delitem__(self, term: str) -> None:
+        del self._overlay[term]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+def load_segment(path: str, analyzer=None) -> InvertedIndex:
+    """Открытие сегмента через mmap: в память читается только то, что затрагивает запрос"""
+    with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_NAME or meta.get("version") != FORMAT_VERSION:
+        raise IndexationError(f"Неподдерживаемый формат индекса в {path}: "
+                              f"версия {meta.get('version')}, ожидается {FORMAT_VERSION}; "
+                              f"индекс нужно построить заново")
+
+    index = InvertedIndex(compression_method=meta["compression_method"], analyzer=analyzer,
+                          block_size=meta["block_size"], scorer=BM25(**meta["bm25"]))
+
+    terms = TermDictionary(map_file(os.path.join(path, TERMS_FILE)),
+                           map_file(os.path.join(path, POSTINGS_FILE)))
+    documents = DiskDocumentStore.open(path, meta["stored_compression"])
+
+    # Сегмент доступен только для чтения: словарь терминов не поддерживает запись
+    index.index = terms
+    if meta.get("positions"):
+        index.positions = _TermPositions(terms, map_file(os.path.join(path, POSITIONS_FILE)))
+    index.idf = _TermStatistic(terms, 2)
+    index.max_scores = _TermStatistic(terms, 3)
+    index.documents = documents
+    index.doc_lengths = documents.lengths
+    index.total_length = meta["total_length"]
+    logger.debug(f"Открыт сегмент {path}: {len(terms)} терминов, {len(documents)} документов")
+    return index
@@ -0,0 +1,509 @@
+import json
+import math
+import os
+import shutil
+import threading
+from array import array
+from typing import Iterable, Iterator, Optional
+
+from ..core.analyzer import Analyzer
+from ..core.boolean import QueryNode, QueryPlanner, has_prefixes, parse_boolean, parse_query, query_terms
+from ..core.builder import IndexBuilder
+from ..core.cache import QueryCache
+from ..core.document import Document
+from ..core.index import InvertedIndex
+from ..core.parallel import merge_postings
+from ..core.postings import DEFAULT_BLOCK_SIZE
+from ..core.query import split_prefixes, split_proximity
+from ..core.scoring import BM25, CollectionStatistics, TopK
+from ..utils.exceptions import IndexationError
+from ..utils.logger import get_logger
+from .docstore import DocumentStore, replace_file
+from .lock import FileLock
+from .segment import load_segment, write_segment
+
+logger = get_logger(__name__)
+
+FORMAT_NAME = "segmented"
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "write.lock"  # Блокировка единственного процесса-писателя
+
+DEFAULT_FLUSH_THRESHOLD = 1000  # Документов в памяти до записи сегмента
+DEFAULT_MERGE_FACTOR = 4  # Сегментов одного уровня, сливаемых вместе
+EXPUNGE_RATIO = 0.5  # Сегмент, где удалена такая доля документов, переписывается
+
+
+def is_segmented(path: str) -> bool:
+    """Проверка, что путь указывает на каталог составного индекса"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+
+def select_merge(sizes: list[tuple[str, int, int]], merge_factor: int, min_size: int) -> Optional[list[str]]:
+    """
+    Многоуровневая политика слияния: сегменты (имя, документов, удалено) делятся
+    на уровни по размеру с шагом merge_factor. Если на уровне накопилось
+    merge_factor сегментов, сливаются самые маленькие из них; сегменты
+    с большой долей удалённых документов переписываются поодиночке.
+    """
+    for name, count, deleted in sizes:
+        if count and deleted / count >= EXPUNGE_RATIO:
+            return [name]
+
+    tiers: dict[int, list[tuple[int, str]]] = {}
+    for name, count, deleted in sizes:
+        live = max(count - deleted, 1)
+        tier = max(0, int(math.log(live / min_size, merge_factor))) if live > min_size else 0
+        tiers.setdefault(tier, []).append((live, name))
+
+    for tier in sorted(tiers):
+        if len(tiers[tier]) >= merge_factor:
+            return [name for _, name in sorted(tiers[tier])[:merge_factor]]
+    return None
+
+
+class SegmentedIndex:
+    """
+    Составной индекс в стиле LSM: изменяемый сегмент в памяти и неизменяемые сегменты на диске.
+
+    Новые документы попадают в сегмент в памяти, который при заполнении
+    записывается на диск. Удаление помечает документ в сегменте (tombstone),
+    повторное добавление ID заменяет прежнюю версию. Поиск идёт по всем
+    сегментам с общими статистиками BM25, а фоновое слияние объединяет
+    сегменты и физически убирает удалённые документы.
+    Изменения становятся постоянными при записи сегмента (flush/close).
+
+    Писатель держит файл блокировки и один удаляет с диска лишние каталоги сегментов.
+    Читатели (read_only=True) открывают индекс параллельно с писателем и ничего не изменяют.
+    """
+
+    def __init__(self, path: str, compression_method: str = 'gamma', analyzer: Analyzer = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE, scorer: BM25 = None,
+                 flush_threshold: int = DEFAULT_FLUSH_THRESHOLD, merge_factor: int = DEFAULT_MERGE_FACTOR,
+                 background_merge: bool = True, positions: bool = False, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+        self.analyzer = analyzer if analyzer is not None else Analyzer()
+        self.compression_method = compression_method
+        self.block_size = block_size
+        self.scorer = scorer if scorer is not None else BM25()
+        self.flush_threshold = flush_threshold
+        self.merge_factor = merge_factor
+        self.background_merge = background_merge and not read_only
+        self.positions = positions  # Хранить позиции терминов (для фраз и NEAR)
+        self.query_cache = QueryCache()  # Очищается при любом изменении
+
+        self._lock = threading.RLock()
+        self._segments: list[tuple[str, InvertedIndex]] = []  # От старых к новым
+        self._deleted: dict[str, set[int]] = {}  # Сегмент -> удалённые ID
+        self._next_segment = 1
+        self._statistics: Optional[CollectionStatistics] = None
+        self._merge_thread: Optional[threading.Thread] = None
+        self._write_lock = FileLock(os.path.join(path, LOCK_FILE))
+
+        if read_only:
+            if not is_segmented(path):
+                raise IndexationError(f"Составной индекс не найден: {path}")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._acquire_write_lock()
+        if is_segmented(path):
+            self._open()
+        else:
+            self._write_manifest()
+        self._memtable, self._builder = self._new_memtable()
+
+    def _acquire_write_lock(self) -> None:
+        """Проверка, что изменять индекс можно: открыт на запись и блокировка писателя у этого объекта"""
+        if self.read_only:
+            raise IndexationError(f"Индекс {self.path} открыт только для чтения")
+        if not self._write_lock.acquire():
+            raise IndexationError(f"Индекс {self.path} уже открыт на запись другим процессом")
+
+    def _open(self) -> None:
+        with open(os.path.join(self.path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT_NAME or manifest.get("version") != FORMAT_VERSION:
+            raise IndexationError(f"Неподдерживаемый формат индекса в {self.path}")
+
+        self.compression_method = manifest["compression_method"]
+        self.block_size = manifest["block_size"]
+        self.scorer = BM25(**manifest["bm25"])
+        self.positions = manifest.get("positions", False)
+        self._next_segment = manifest["next_segment"]
+        for entry in manifest["segments"]:
+            segment = load_segment(os.path.join(self.path, entry["name"]), analyzer=self.analyzer)
+            self._segments.append((entry["name"], segment))
+            self._deleted[entry["name"]] = set(entry["deleted"])
+
+        # Каталоги, не попавшие в манифест (прерванная запись или слияние), удаляет только писатель:
+        # у читателя такой каталог может оказаться сегментом, который писатель ещё не внёс в манифест
+        if self.read_only:
+            return
+        known = {name for name, _ in self._segments}
+        for name in os.listdir(self.path):
+            if name.startswith("seg_") and name not in known:
+                shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _new_memtable(self) -> tuple[InvertedIndex, IndexBuilder]:
+        memtable = InvertedIndex(compression_method=self.compression_method, analyzer=self.analyzer,
+                                 block_size=self.block_size, scorer=self.scorer, positions=self.positions)
+        return memtable, IndexBuilder(memtable)
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "compression_method": self.compression_method,
+            "block_size": self.block_size,
+            "bm25": {"k1": self.scorer.k1, "b": self.scorer.b},
+            "positions": self.positions,
+            "next_segment": self._next_segment,
+            "segments": [
+                {"name": name, "deleted": sorted(self._deleted[name])} for name, _ in self._segments
+            ],
+        }
+        with replace_file(os.path.join(self.path, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def _changed(self) -> None:
+        """Сброс общих статистик и кэша после любого изменения"""
+        self._statistics = None
+        self.query_cache.clear()
+
+    def _segment_name(self) -> str:
+        name = f"seg_{self._next_segment:06d}"
+        self._next_segment += 1
+        return name
+
+    def add_document(self, document: Document) -> None:
+        """Добавление документа; документ с тем же ID заменяется"""
+        self._acquire_write_lock()
+        with self._lock:
+            self.delete_document(document.doc_id)
+            self._builder.add_document(document)
+            self._changed()
+            if len(self._memtable.documents) >= self.flush_threshold:
+                self.flush()
+
+    def add_documents(self, documents: Iterable[Document]) -> None:
+        for document in documents:
+            self.add_document(document)
+
+    def delete_document(self, doc_id: int) -> bool:
+        """Удаление документа; True, если живая версия документа нашлась"""
+        self._acquire_write_lock()
+        with self._lock:
+            found = False
+            if doc_id in self._memtable.documents:
+                # Сегмент в памяти мал: он перестраивается без документа
+                remaining = [self._memtable.documents[i] for i in self._memtable.documents if i != doc_id]
+                self._memtable, self._builder = self._new_memtable()
+                for document in remaining:
+                    self._builder.add_document(document)
+                found = True
+            for name, segment in self._segments:
+                if doc_id not in self._deleted[name] and doc_id in segment.documents:
+                    self._deleted[name].add(doc_id)
+                    found = True
+            if found:
+                self._changed()
+            return found
+
+    def flush(self) -> Optional[str]:
+        """Запись сегмента из памяти на диск; возвращает имя нового сегмента"""
+        with self._lock:
+            if not len(self._memtable.documents):
+                return None
+            self._acquire_write_lock()
+            self._builder.finalize()
+            # В сегмент записываются его собственные статистики, а не статистики коллекции
+            self._memtable.use_collection_statistics(None)
+            name = self._segment_name()
+            segment_path = os.path.join(self.path, name)
+            write_segment(self._memtable, segment_path)
+            self._segments.append((name, load_segment(segment_path, analyzer=self.analyzer)))
+            self._deleted[name] = set()
+            self._memtable, self._builder = self._new_memtable()
+            self._write_manifest()
+            self._changed()
+            logger.debug(f"Записан сегмент {name}")
+        self._schedule_merges()
+        return name
+
+    def close(self) -> None:
+        """Запись данных из памяти, ожидание фоновых слияний и снятие блокировки писателя"""
+        if self.read_only:
+            return
+        self.flush()
+        self.wait_for_merges()
+        with self._lock:
+            if self._write_lock.locked:
+                self._write_manifest()
+            self._write_lock.release()
+
+    def _schedule_merges(self) -> None:
+        if not self.background_merge:
+            self._run_merges()
+            return
+        with self._lock:
+            if self._merge_thread is None or not self._merge_thread.is_alive():
+                self._merge_thread = threading.Thread(target=self._run_merges, daemon=True)
+                self._merge_thread.start()
+
+    def wait_for_merges(self) -> None:
+        thread = self._merge_thread
+        if thread is not None:
+            thread.join()
+
+    def _run_merges(self) -> None:
+        while True:
+            with self._lock:
+                sizes = [(name, len(segment.documents), len(self._deleted[name]))
+                         for name, segment in self._segments]
+            names = select_merge(sizes, self.merge_factor, self.flush_threshold)
+            if not names:
+                return
+            try:
+                self.merge(names)
+            except Exception as e:
+                logger.error(f"Ошибка слияния сегментов {names}: {str(e)}", exc_info=True)
+                return
+
+    def merge(self, names: list[str]) -> str:
+        """Слияние сегментов в один с физическим удалением помеченных документов"""
+        self._acquire_write_lock()
+        with self._lock:
+            snapshot = [(name, segment, frozenset(self._deleted[name]))
+                        for name, segment in self._segments if name in names]
+            merged_name = self._segment_name()
+
+        # Тяжёлая часть идёт без блокировки: сегменты неизменяемы
+        merged = InvertedIndex(compression_method=self.compression_method, analyzer=self.analyzer,
+                               block_size=self.block_size, scorer=self.scorer, positions=self.positions)
+        terms = {}
+        for _, segment, deleted in snapshot:
+            for doc_id in segment.documents:
+                if doc_id not in deleted:
+                    merged.documents[doc_id] = segment.documents[doc_id]
+                    merged._set_length(doc_id, segment.doc_lengths[doc_id])
+            terms.update(dict.fromkeys(segment.index))
+
+        for term in terms:
+            parts = []
+            positions = {} if self.positions else None
+            for _, segment, deleted in snapshot:
+                if term not in segment.index:
+                    continue
+                doc_ids, tfs = array('I'), array('I')
+                for doc_id, tf in zip(*segment.postings_with_frequencies(term)):
+                    if doc_id not in deleted:
+                        doc_ids.append(doc_id)
+                        tfs.append(tf)
+                if doc_ids:
+                    parts.append((doc_ids, tfs))
+                    if positions is not None:
+                        for doc_id, doc_positions in zip(segment.postings(term), segment.term_positions(term)):
+                            if doc_id not in deleted:
+                                positions[doc_id] = doc_positions
+            if parts:
+                doc_ids, tfs = merge_postings(parts)
+                merged.index[term] = merged._encode_postings(doc_ids, tfs)
+                if positions is not None:
+                    merged.positions[term] = merged._encode_positions([positions[doc_id] for doc_id in doc_ids])
+
+        merged.compute_term_statistics()
+        merged_path = os.path.join(self.path, merged_name)
+        write_segment(merged, merged_path)
+        merged_segment = load_segment(merged_path, analyzer=self.analyzer)
+
+        with self._lock:
+            # Удаления, сделанные во время слияния, переносятся в новый сегмент
+            deleted_since = set()
+            for name, _, deleted in snapshot:
+                deleted_since |= self._deleted.pop(name) - deleted
+            position = next(i for i, (name, _) in enumerate(self._segments) if name in names)
+            segments = [item for item in self._segments if item[0] not in names]
+            segments.insert(position, (merged_name, merged_segment))
+            self._segments = segments
+            self._deleted[merged_name] = {doc_id for doc_id in deleted_since if doc_id in merged_segment.documents}
+            self._write_manifest()
+            self._changed()
+
+        for name in names:
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        logger.debug(f"Сегменты {names} слиты в {merged_name}")
+        return merged_name
+
+    @property
+    def segments(self) -> list[str]:
+        """Имена сегментов на диске, от старых к новым"""
+        return [name for name, _ in self._segments]
+
+    def _snapshot(self) -> list[tuple[InvertedIndex, frozenset]]:
+        """Согласованный набор сегментов с удалёнными ID и общими статистиками"""
+        with self._lock:
+            if self._builder.pending:
+                self._builder.finalize()
+            parts = [(segment, frozenset(self._deleted[name])) for name, segment in self._segments]
+            parts.append((self._memtable, frozenset()))
+
+            if self._statistics is None:
+                # Число документов, длины и документная частота считаются по одной совокупности —
+                # вместе с удалёнными, но ещё не слитыми документами (как maxDoc в Lucene):
+                # иначе после замен частота превышает число документов и IDF становится отрицательным
+                indexes = [segment for segment, _ in parts]
+                num_documents = sum(len(segment.documents) for segment in indexes)
+                total_length = sum(segment.total_length for segment in indexes)
+                self._statistics = CollectionStatistics(
+                    self.scorer, num_documents, total_length,
+                    lambda term: sum(index.document_frequency(term) for index in indexes),
+                )
+                for segment, _ in parts:
+                    segment.use_collection_statistics(self._statistics)
+            return parts
+
+    def search(self, query: str, k: Optional[int] = 10, mode: str = 'and') -> list[Document]:
+        return [self.documents[doc_id] for doc_id, _ in self.search_scored(query, k, mode)]
+
+    def search_scored(self, query: str, k: Optional[int] = 10, mode: str = 'and',
+                      strict: bool = False) -> list[tuple[int, float]]:
+        """Поиск по всем сегментам: пары (ID, оценка BM25) по убыванию оценки (strict — см. InvertedIndex)"""
+        boolean, node = parse_boolean(query, self.analyzer.analyze, mode)
+        if boolean:
+            return self._search_boolean(node, query, k, mode, strict)
+        try:
+            text, clauses = split_proximity(query, self.analyzer.analyze)
+            text, prefixes = split_prefixes(text)
+            terms = list(dict.fromkeys(self.analyzer.analyze(text)))
+            if prefixes or clauses:
+                # Префиксы и позиции обрабатываются в каждом сегменте, оценки — по общим статистикам
+                top = TopK(k)
+                for segment, deleted in self._snapshot():
+                    for doc_id, score in segment.executor.search(terms, k, mode, prefixes, clauses, deleted):
+                        top.push(doc_id, score)
+                return top.results()
+            if not terms:
+                return []
+            key = self.query_cache.key(terms, k, mode, (self.scorer.k1, self.scorer.b))
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+
+            top = TopK(k)
+            for segment, deleted in self._snapshot():
+                executor = segment.executor
+                if mode == 'or':
+                    # Запас на удалённые документы, которые могли бы занять места в топе сегмента
+                    limit = None if k is None else k + len(deleted)
+                    hits = executor.disjunctive(terms, limit)
+                else:
+                    doc_ids = [doc_id for doc_id in executor.conjunctive(terms) if doc_id not in deleted]
+                    hits = executor.rank(doc_ids, terms, k)
+                for doc_id, score in hits:
+                    if doc_id not in deleted:
+                        top.push(doc_id, score)
+
+            results = top.results()
+            self.query_cache.put(key, results)
+            return results
+        except Exception as e:
+            logger.error(f"Ошибка поиска по запросу '{query}': {str(e)}")
+            if strict:
+                raise
+            return []
+
+    def _search_boolean(self, node: Optional[QueryNode], query: str, k: Optional[int],
+                        mode: str, strict: bool = False) -> list[tuple[int, float]]:
+        """Булев запрос: план строится в каждом сегменте по его документным частотам"""
+        if node is None:
+            return []
+        cacheable = not has_prefixes(node)
+        key = None
+        if cacheable:
+            terms, _ = query_terms(node, negated=True)
+            key = self.query_cache.key(terms, k, mode, (self.scorer.k1, self.scorer.b, node.signature()))
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            top = TopK(k)
+            for segment, deleted in self._snapshot():
+                # Планировщик сохраняет в узлах статистику, поэтому у каждого сегмента своё дерево
+                plan = parse_query(query, self.analyzer.analyze, mode)
+                for doc_id, score in QueryPlanner(segment.executor).search(plan, k, deleted):
+                    top.push(doc_id, score)
+            results = top.results()
+        except Exception as e:
+            logger.error(f"Ошибка выполнения запроса '{query}': {str(e)}")
+            if strict:
+                raise
+            return []
+        if cacheable:
+            self.query_cache.put(key, results)
+        return results
+
+    def explain(self, query: str, k: Optional[int] = 10, mode: str = 'and') -> str:
+        """Планы запроса по сегментам (см. InvertedIndex.explain)"""
+        sections = []
+        for segment, deleted in self._snapshot():
+            node = parse_query(query, self.analyzer.analyze, mode)
+            if node is None:
+                return "Пустой запрос: после анализа не осталось терминов"
+            planner = QueryPlanner(segment.executor)
+            planner.search(node, k, deleted)
+            lines = planner.format(node)
+            lines.append(f"RANK k={k}: {planner.candidates} кандидатов, {planner.rank_time * 1000:.3f} мс")
+            sections.append(f"Сегмент: {len(segment.documents)} документов, удалено {len(deleted)}\n" + "\n".join(lines))
+        return "\n\n".join(sections)
+
+    @property
+    def documents(self) -> "SegmentedDocuments":
+        return SegmentedDocuments(self)
+
+
+class SegmentedDocuments(DocumentStore):
+    """Живые документы всех сегментов составного индекса"""
+
+    def __init__(self, index: SegmentedIndex):
+        self._index = index
+
+    def _locate(self, doc_id: int) -> InvertedIndex:
+        index = self._index
+        with index._lock:
+            if doc_id in index._memtable.documents:
+                return index._memtable
+            for name, segment in reversed(index._segments):
+                if doc_id not in index._deleted[name] and doc_id in segment.documents:
+                    return segment
+        raise KeyError(doc_id)
+
+    def __getitem__(self, doc_id: int) -> Document:
+        return self._locate(doc_id).documents[doc_id]
+
+    def metadata(self, doc_id: int) -> dict:
+        return self._locate(doc_id).documents.metadata(doc_id)
+
+    def __contains__(self, doc_id) -> bool:
+        try:
+            self._locate(doc_id)
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[int]:
+        index = self._index
+        with index._lock:
+            parts = [(segment, frozenset(index._deleted[name])) for name, segment in index._segments]
+            parts.append((index._memtable, frozenset()))
+        for segment, deleted in parts:
+            for doc_id in list(segment.documents):
+                if doc_id not in deleted:
+                    yield doc_id
+
+    def __len__(self) -> int:
+        index = self._index
+        with index._lock:
+            return len(index._memtable.documents) + sum(
+                len(segment.documents) - len(index._deleted[name]) for name, segment in index._segments
+            )
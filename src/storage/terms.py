@@ -0,0 +1,173 @@
+import struct
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+from ..compression.vbyte import VByteEncoder
+from ..core.postings import read_varint
+
+TERMS_PER_BLOCK = 16  # Терминов в блоке с общим префиксом
+
+# Заголовок: число терминов, число блоков, терминов в блоке
+HEADER = struct.Struct("<III")
+OFFSET = struct.Struct("<I")
+
+# Запись термина: смещение и длина списка (ID с частотами), IDF, максимальный вклад
+TERM_RECORD = struct.Struct("<QIdd")
+
+
+def _common_prefix(left: bytes, right: bytes) -> int:
+    size = min(len(left), len(right))
+    i = 0
+    while i < size and left[i] == right[i]:
+        i += 1
+    return i
+
+
+def _prefix_end(prefix: bytes) -> Optional[bytes]:
+    """Наименьшая строка байтов, большая всех строк с префиксом prefix (None — таких нет)"""
+    stripped = prefix.rstrip(b"\xff")
+    if not stripped:
+        return None
+    return stripped[:-1] + bytes([stripped[-1] + 1])
+
+
+def encode_terms(terms: list[bytes], records: list[bytes], block_terms: int = TERMS_PER_BLOCK) -> bytes:
+    """
+    Кодирование отсортированных терминов со сжатием префиксов (front coding).
+
+    Формат: заголовок; смещения блоков (на одно больше числа блоков); записи терминов
+    фиксированного размера по номеру термина; блоки. Первый термин блока хранится целиком
+    (varint длина и байты), остальные — varint длина общего с предыдущим префикса,
+    varint длина суффикса и суффикс.
+    """
+    blocks = []
+    for start in range(0, len(terms), block_terms):
+        out = bytearray()
+        previous = b""
+        for term in terms[start: start + block_terms]:
+            shared = _common_prefix(previous, term) if out else 0
+            if out:
+                out += VByteEncoder.encode([shared])
+            out += VByteEncoder.encode([len(term) - shared])
+            out += term[shared:]
+            previous = term
+        blocks.append(bytes(out))
+
+    offsets = [0]
+    for block in blocks:
+        offsets.append(offsets[-1] + len(block))
+    return b"".join([HEADER.pack(len(terms), len(blocks), block_terms),
+                     struct.pack(f"<{len(offsets)}I", *offsets), *records, *blocks])
+
+
+class TermDictionary(Mapping):
+    """
+    Отсортированный словарь терминов на mmap со сжатием префиксов.
+
+    В памяти хранится только разреженный индекс — первый термин каждого блока;
+    поиск двоичный по нему, затем разбор одного блока. Номер термина — индекс его записи
+    со смещением списка. Термины упорядочены по байтам UTF-8, что совпадает с порядком строк.
+    """
+
+    def __init__(self, terms_data, postings_data):
+        self._terms = terms_data
+        self._postings = postings_data
+        self._count, self._blocks, self._block_terms = \
+            HEADER.unpack_from(terms_data, 0) if len(terms_data) else (0, 0, TERMS_PER_BLOCK)
+        self._offsets_start = HEADER.size
+        self._records_start = self._offsets_start + (self._blocks + 1) * OFFSET.size
+        self._blocks_start = self._records_start + self._count * TERM_RECORD.size
+        self._first_terms = [self._first_term(block) for block in range(self._blocks)]
+
+    def _block_bounds(self, block: int) -> tuple[int, int]:
+        start, end = struct.unpack_from("<II", self._terms, self._offsets_start + block * OFFSET.size)
+        return self._blocks_start + start, self._blocks_start + end
+
+    def _first_term(self, block: int) -> bytes:
+        offset = self._block_bounds(block)[0]
+        length, offset = read_varint(self._terms, offset)
+        return bytes(self._terms[offset: offset + length])
+
+    def _decode_block(self, block: int) -> list[bytes]:
+        """Все термины блока в байтах UTF-8"""
+        offset, end = self._block_bounds(block)
+        terms = []
+        previous = b""
+        while offset < end:
+            shared = 0
+            if terms:
+                shared, offset = read_varint(self._terms, offset)
+            length, offset = read_varint(self._terms, offset)
+            previous = previous[:shared] + self._terms[offset: offset + length]
+            offset += length
+            terms.append(previous)
+        return terms
+
+    def lower_bound(self, key: bytes) -> int:
+        """Номер первого термина, не меньшего key (по байтам UTF-8)"""
+        block = bisect_right(self._first_terms, key) - 1
+        if block < 0:
+            return 0
+        return block * self._block_terms + bisect_left(self._decode_block(block), key)
+
+    def find(self, term: str) -> int:
+        """Номер термина в словаре или -1"""
+        key = term.encode("utf-8")
+        block = bisect_right(self._first_terms, key) - 1
+        if block < 0:
+            return -1
+        terms = self._decode_block(block)
+        i = bisect_left(terms, key)
+        return block * self._block_terms + i if i < len(terms) and terms[i] == key else -1
+
+    def term(self, i: int) -> str:
+        """Термин по номеру"""
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        block, position = divmod(i, self._block_terms)
+        return self._decode_block(block)[position].decode("utf-8")
+
+    def record(self, i: int) -> tuple:
+        """(смещение списка, длина, IDF, максимальный вклад)"""
+        return TERM_RECORD.unpack_from(self._terms, self._records_start + i * TERM_RECORD.size)
+
+    def postings(self, i: int) -> bytes:
+        offset, length = self.record(i)[:2]
+        return self._postings[offset: offset + length]
+
+    def _iter_ids(self, start: int, end: int) -> Iterator[str]:
+        """Термины с номерами из [start, end): блоки разбираются по порядку"""
+        for block in range(start // self._block_terms, (end + self._block_terms - 1) // self._block_terms):
+            first = block * self._block_terms
+            for term in self._decode_block(block)[max(start - first, 0): end - first]:
+                yield term.decode("utf-8")
+
+    def range(self, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[str]:
+        """Термины start <= термин < end в порядке сортировки (None — без границы)"""
+        lo = 0 if start is None else self.lower_bound(start.encode("utf-8"))
+        hi = self._count if end is None else self.lower_bound(end.encode("utf-8"))
+        return self._iter_ids(lo, max(lo, hi))
+
+    def prefix(self, prefix: str) -> Iterator[str]:
+        """Термины, начинающиеся с prefix, в порядке сортировки"""
+        key = prefix.encode("utf-8")
+        lo = self.lower_bound(key)
+        end = _prefix_end(key)
+        hi = self._count if end is None else self.lower_bound(end)
+        return self._iter_ids(lo, hi)
+
+    def __getitem__(self, term: str) -> bytes:
+        i = self.find(term)
+        if i < 0:
+            raise KeyError(term)
+        return self.postings(i)
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self.find(term) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return self._iter_ids(0, self._count)
+
+    def __len__(self) -> int:
+        return self._count
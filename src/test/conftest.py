@@ -0,0 +1,30 @@
+import re
+
+import pytest
+
+from src.core.index import InvertedIndex
+
+
+class SplitAnalyzer:
+    """Анализатор для тестов без NLTK: слова в нижнем регистре без знаков препинания"""
+
+    def analyze(self, text):
+        return re.findall(r"\w+", text.lower())
+
+
+@pytest.fixture(scope="session")
+def split_analyzer():
+    return SplitAnalyzer()
+
+
+@pytest.fixture(scope="session")
+def make_index(split_analyzer):
+    """Фабрика индексов с SplitAnalyzer: make_index(documents, **параметры InvertedIndex)"""
+
+    def make(documents=(), **kwargs):
+        kwargs.setdefault("analyzer", split_analyzer)
+        index = InvertedIndex(**kwargs)
+        index.add_documents(documents)
+        return index
+
+    return make
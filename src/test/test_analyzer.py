@@ -0,0 +1,81 @@
+import pickle
+
+import pytest
+
+from src.core.analyzer import Analyzer
+from src.core.index import InvertedIndex
+
+
+class FakeStemmer:
+    def stem(self, token):
+        return token[:5]
+
+
+class FakeResources:
+    def __init__(self):
+        self.stopword_calls = 0
+
+    def tokenizer(self):
+        return str.split
+
+    def stopwords(self, language):
+        self.stopword_calls += 1
+        return ["и"]
+
+    def stemmer(self, language):
+        return FakeStemmer()
+
+
+@pytest.fixture
+def resources():
+    return FakeResources()
+
+
+def test_analyzer_builds_resources_once(resources):
+    analyzer = Analyzer(resources=resources)
+    analyzer.analyze("кошки и собаки")
+    analyzer.analyze("собаки и кошки")
+
+    assert resources.stopword_calls == 2  # по одному вызову на язык
+    assert isinstance(analyzer.stop_words, frozenset)
+
+
+def test_analyzer_analyze(resources):
+    analyzer = Analyzer(resources=resources)
+    assert analyzer.analyze("Кошки и СОБАКИ ок") == ["кошки", "собак"]
+
+
+def test_analyzer_stem_cache_hit_rate(resources):
+    analyzer = Analyzer(resources=resources)
+    assert analyzer.hit_rate == 0.0
+
+    for token in ["кошки", "кошки", "кошки", "собаки"]:
+        analyzer.stem(token)
+
+    info = analyzer.cache_info()
+    assert info["hits"] == 2
+    assert info["misses"] == 2
+    assert analyzer.hit_rate == 0.5
+
+
+def test_analyzer_stem_cache_is_bounded(resources):
+    analyzer = Analyzer(cache_size=2, resources=resources)
+    for token in ["кошки", "собаки", "мыши"]:
+        analyzer.stem(token)
+
+    assert analyzer.cache_info()["size"] == 2
+
+
+def test_index_uses_custom_analyzer(split_analyzer):
+    index = InvertedIndex(analyzer=split_analyzer)
+    assert index._process_text("a b") == ["a", "b"]
+
+
+def test_analyzer_is_picklable_without_loaded_resources():
+    analyzer = Analyzer(resources=FakeResources(), stopword_languages=("russian",), cache_size=10)
+    analyzer.analyze("Ректоры университета")
+
+    restored = pickle.loads(pickle.dumps(analyzer))
+
+    assert restored.stemmer is None and restored.cache_info()["size"] == 0
+    assert restored.analyze("Ректоры университета") == analyzer.analyze("Ректоры университета")
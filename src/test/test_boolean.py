@@ -0,0 +1,190 @@
+import random
+
+import pytest
+
+from src.core.boolean import (AndQuery, NotQuery, OrQuery, PrefixQuery, ProximityQuery, QueryPlanner, TermQuery,
+                              has_operators, parse_query)
+from src.core.document import Document
+from src.core.query import ProximityClause
+from src.utils.exceptions import QueryError
+
+VOCABULARY = ["ректор", "приём", "расписание", "стипендия", "общежитие", "факультет", "кафедра", "редкий"]
+
+
+@pytest.fixture(scope="module")
+def index(make_index):
+    rng = random.Random(7)
+    weights = [30, 20, 20, 10, 10, 5, 5, 1]
+    return make_index((Document(doc_id, " ".join(rng.choices(VOCABULARY, weights, k=rng.randint(1, 10))))
+                       for doc_id in range(1, 501)), compression_method="gamma", block_size=8, positions=True)
+
+
+def test_has_operators():
+    assert has_operators("ректор AND приём")
+    assert has_operators("(ректор)")
+    assert has_operators("ректор -приём")
+    assert not has_operators("научно-технический совет")
+    assert not has_operators("ректор приём* \"приёмная комиссия\" а NEAR/2 б")
+    assert not has_operators("android notebook")
+
+
+def test_parse_precedence():
+    node = parse_query("а OR б AND NOT в", str.split)
+    assert node == OrQuery(operands=[TermQuery(term="а"),
+                                     AndQuery(operands=[TermQuery(term="б"), NotQuery(operand=TermQuery(term="в"))])])
+
+
+def test_parse_implicit_operator_and_grouping():
+    assert parse_query("а (б OR в) -г", str.split) == AndQuery(operands=[
+        TermQuery(term="а"), OrQuery(operands=[TermQuery(term="б"), TermQuery(term="в")]),
+        NotQuery(operand=TermQuery(term="г"))])
+    assert parse_query("а б OR в", str.split, "or") == OrQuery(operands=[
+        TermQuery(term="а"), TermQuery(term="б"), TermQuery(term="в")])
+
+
+def test_parse_phrases_near_and_prefixes():
+    node = parse_query('"а б" OR в NEAR/3 г AND д*', str.split)
+    assert node == OrQuery(operands=[
+        ProximityQuery(clause=ProximityClause(["а", "б"])),
+        AndQuery(operands=[ProximityQuery(clause=ProximityClause(["в", "г"], 3)), PrefixQuery(prefix="д")])])
+
+
+def test_parse_drops_stopwords():
+    analyze = lambda text: [word for word in text.split() if word != "и"]
+    assert parse_query("а AND (и OR б) NOT и", analyze) == AndQuery(operands=[TermQuery(term="а"), TermQuery(term="б")])
+    assert parse_query("NOT и", analyze) is None
+
+
+def test_negation_excludes_in_or_mode():
+    assert parse_query("а б -в", str.split, "or") == AndQuery(operands=[
+        OrQuery(operands=[TermQuery(term="а"), TermQuery(term="б")]), NotQuery(operand=TermQuery(term="в"))])
+    # Явный OR сохраняет булев смысл: объединение с дополнением
+    assert parse_query("а OR -в", str.split, "or") == OrQuery(operands=[
+        TermQuery(term="а"), NotQuery(operand=TermQuery(term="в"))])
+
+
+def test_negation_in_or_mode_search(make_index):
+    idx = make_index([Document(1, "a"), Document(2, "a b"), Document(3, "c"), Document(4, "d"), Document(5, "a c")],
+                     compression_method="gamma")
+    assert {doc_id for doc_id, _ in idx.search_scored("a -b", k=None, mode="or")} == {1, 5}
+    assert {doc_id for doc_id, _ in idx.search_scored("a c -b", k=None, mode="or")} == {1, 3, 5}
+
+
+def test_near_with_group_distributes_over_alternatives():
+    assert parse_query("а NEAR/2 (б OR в)", str.split) == OrQuery(operands=[
+        ProximityQuery(clause=ProximityClause(["а", "б"], 2)), ProximityQuery(clause=ProximityClause(["а", "в"], 2))])
+    assert parse_query("а NEAR/2 (б) г", str.split) == AndQuery(operands=[
+        ProximityQuery(clause=ProximityClause(["а", "б"], 2)), TermQuery(term="г")])
+
+
+def test_unbalanced_parentheses_in_plain_text_fall_back_to_plain_search(make_index):
+    idx = make_index([Document(1, "ректор"), Document(2, "смайлик ректор"), Document(3, "приём")],
+                     compression_method="gamma")
+    assert [doc.doc_id for doc in idx.search("смайлик :)")] == [2]
+    assert {doc.doc_id for doc in idx.search("(ректор")} == {1, 2}
+    with pytest.raises(QueryError):
+        idx.search("(ректор OR приём")
+
+
+@pytest.mark.parametrize("query", ["а AND", "(а OR б", "а)", "OR а", "NOT", "а AND OR б", "()",
+                                   "а NEAR/2", "а NEAR/2 OR б", "NEAR/2 а", 'а NEAR/2 "б в"'])
+def test_parse_errors(query):
+    with pytest.raises(QueryError):
+        parse_query(query, str.split)
+
+
+def tokens(index, doc_id):
+    return index.documents[doc_id].text.split()
+
+
+def contains_phrase(words, phrase):
+    return any(words[i: i + len(phrase)] == phrase for i in range(len(words)))
+
+
+@pytest.mark.parametrize("query,predicate", [
+    ("ректор AND приём", lambda w: "ректор" in w and "приём" in w),
+    ("ректор OR редкий", lambda w: "ректор" in w or "редкий" in w),
+    ("ректор AND NOT приём", lambda w: "ректор" in w and "приём" not in w),
+    ("NOT ректор", lambda w: "ректор" not in w),
+    ("(кафедра OR факультет) AND NOT (ректор OR приём)",
+     lambda w: ("кафедра" in w or "факультет" in w) and "ректор" not in w and "приём" not in w),
+    ("стипендия (общежитие OR NOT расписание)",
+     lambda w: "стипендия" in w and ("общежитие" in w or "расписание" not in w)),
+    ('"ректор приём" -кафедра', lambda w: contains_phrase(w, ["ректор", "приём"]) and "кафедра" not in w),
+    ("ректор NEAR/1 стипендия OR редкий",
+     lambda w: "редкий" in w or any({"ректор", "стипендия"} <= set(w[i: i + 2]) for i in range(len(w)))),
+    ("р* AND NOT (с* OR о*)",
+     lambda w: any(t.startswith("р") for t in w) and not any(t[0] in "со" for t in w)),
+    ("ректор AND отсутствует", lambda w: False),
+    ("ректор OR отсутствует", lambda w: "ректор" in w),
+    ("ректор NEAR/1 (стипендия OR редкий)",
+     lambda w: any({"ректор", other} <= set(w[i: i + 2]) for other in ("стипендия", "редкий") for i in range(len(w)))),
+])
+def test_boolean_search_matches_brute_force(index, query, predicate):
+    expected = {doc_id for doc_id in index.documents if predicate(tokens(index, doc_id))}
+    assert {doc_id for doc_id, _ in index.search_scored(query, k=None)} == expected
+
+
+def test_negated_terms_do_not_affect_scores(index):
+    conjunction = dict(index.search_scored("ректор приём", k=None))
+    for doc_id, score in index.search_scored("(ректор приём) NOT кафедра", k=None):
+        assert score == pytest.approx(conjunction[doc_id])
+
+
+def test_planner_orders_cheapest_first_and_not_last(index):
+    node = parse_query("NOT кафедра ректор (приём OR стипендия) редкий", index._process_text)
+    QueryPlanner(index.executor).plan(node)
+
+    assert isinstance(node.operands[0], TermQuery) and node.operands[0].term == "редкий"
+    assert isinstance(node.operands[-1], NotQuery)
+    estimates = [child.estimate for child in node.operands[:-1]]
+    assert estimates == sorted(estimates)
+    assert node.operands[0].estimate == index.document_frequency("редкий")
+
+
+def test_not_is_evaluated_only_for_candidates(index):
+    node = parse_query("редкий AND NOT ректор", index._process_text)
+    planner = QueryPlanner(index.executor)
+    planner.search(node, k=None)
+
+    rare = index.document_frequency("редкий")
+    negation = node.operands[-1]
+    assert negation.operand.actual <= rare  # список «ректор» пересечён только с кандидатами
+    assert negation.operand.note == "gallop"
+
+
+def test_empty_conjunct_skips_remaining_operands(index):
+    node = parse_query("ректор AND приём AND отсутствует", index._process_text)
+    QueryPlanner(index.executor).search(node, k=10)
+    assert node.operands[0].term == "отсутствует" and node.operands[0].actual == 0
+    assert all(child.actual is None for child in node.operands[1:])
+
+
+def test_explain(index):
+    plan = index.explain("(кафедра OR факультет) AND ректор AND NOT приём", k=5)
+    lines = plan.splitlines()
+
+    assert lines[0].startswith("AND  оценка=")
+    assert any(line.startswith("  OR") for line in lines)
+    assert any(line.startswith("    TERM кафедра") for line in lines)
+    assert lines[-2].strip().startswith("TERM приём")
+    assert lines[-3].strip().startswith("NOT")
+    assert lines[-1].startswith("RANK k=5:")
+    assert all(" мс" in line for line in lines)
+    assert index.explain("", k=5) == "Пустой запрос: после анализа не осталось терминов"
+
+
+def test_boolean_results_are_cached(index):
+    index.query_cache.clear()
+    first = index.search_scored("ректор AND NOT приём", k=5)
+    hits = index.query_cache.hits
+    assert index.search_scored("NOT приём AND ректор", k=5) == first
+    assert index.query_cache.hits == hits + 1
+    index.search_scored("маг* OR ректор", k=5)
+    index.search_scored("маг* OR ректор", k=5)
+    assert index.query_cache.hits == hits + 1  # префиксы раскрываются по текущему словарю — не кэшируются
+
+
+def test_syntax_error_is_raised(index):
+    with pytest.raises(QueryError):
+        index.search_scored("(ректор OR приём", k=5)
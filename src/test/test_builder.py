@@ -0,0 +1,77 @@
+import pytest
+
+from src.core.builder import IndexBuilder
+from src.core.document import Document
+from src.core.index import InvertedIndex, IndexationError
+
+
+DOCS = [
+    Document(3, "кот пес кот"),
+    Document(1, "кот мышь"),
+    Document(2, "пес пес мышь"),
+]
+
+
+@pytest.mark.parametrize("method", ["none", "gamma", "delta"])
+def test_builder_matches_incremental_indexing(method, make_index):
+    incremental = make_index(compression_method=method)
+    for doc in DOCS:
+        incremental.add_document(doc)
+
+    bulk = make_index(compression_method=method)
+    bulk.add_documents(DOCS)
+
+    assert bulk.index.keys() == incremental.index.keys()
+    for term in bulk.index:
+        assert bulk._decode_postings(bulk.index[term]) == incremental._decode_postings(incremental.index[term])
+    assert dict(bulk.term_frequencies) == dict(incremental.term_frequencies)
+
+
+def test_builder_encodes_each_term_once(make_index):
+    index = make_index(compression_method="gamma")
+    calls = []
+    encode = index._encode_postings
+    index._encode_postings = lambda postings, frequencies: calls.append(postings) or encode(postings, frequencies)
+
+    builder = IndexBuilder(index)
+    for doc in DOCS:
+        builder.add_document(doc)
+    builder.finalize()
+
+    assert sorted(calls) == [[1, 2], [1, 3], [2, 3]]
+
+
+def test_builder_merges_with_existing_postings(make_index):
+    index = make_index(compression_method="delta")
+    index.add_document(Document(5, "кот"))
+
+    index.add_documents([Document(1, "кот пес")])
+
+    assert index._decode_postings(index.index["кот"]) == [1, 5]
+    assert index._decode_postings(index.index["пес"]) == [1]
+
+
+@pytest.mark.parametrize("method", ["none", "gamma", "vbyte"])
+def test_builder_records_positions_like_incremental_indexing(method, make_index):
+    incremental = make_index(compression_method=method, positions=True)
+    for doc in DOCS + [Document(1, "кот кот")]:
+        incremental.add_document(doc)
+
+    bulk = make_index(compression_method=method, positions=True)
+    bulk.add_documents(DOCS[:2])
+    bulk.add_documents([DOCS[2], Document(1, "кот кот")])  # Слияние с записанными списками
+
+    assert bulk.positions == incremental.positions
+    assert bulk.term_positions("кот") == [[1, 2], [1, 3]]
+    assert bulk.document_positions("пес", 2) == [1, 2] and bulk.document_positions("пес", 1) == []
+
+
+def test_builder_raises_indexation_error():
+    index = InvertedIndex()
+
+    def broken(text):
+        raise ValueError("Ошибка обработки текста")
+
+    index._process_text = broken
+    with pytest.raises(IndexationError):
+        IndexBuilder(index).add_document(Document(1, "Текст"))
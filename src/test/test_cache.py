@@ -0,0 +1,169 @@
+from array import array
+
+import pytest
+
+from src.core.cache import PostingsCache, QueryCache
+from src.core.document import Document
+
+
+def test_key_ignores_order_and_duplicates():
+    assert QueryCache.key(["б", "а", "б"], 10, "and") == QueryCache.key(["а", "б"], 10, "and")
+    assert QueryCache.key(["а"], 10, "and") != QueryCache.key(["а"], 5, "and")
+    assert QueryCache.key(["а"], 10, "and") != QueryCache.key(["а"], 10, "or")
+
+
+def test_lru_eviction_by_entries():
+    cache = QueryCache(max_entries=2)
+    for term in ["a", "b"]:
+        cache.put(cache.key([term], 10, "and"), [(1, 1.0)])
+    cache.get(cache.key(["a"], 10, "and"))
+    cache.put(cache.key(["c"], 10, "and"), [(2, 1.0)])
+
+    assert cache.get(cache.key(["b"], 10, "and")) is None
+    assert cache.get(cache.key(["a"], 10, "and")) == [(1, 1.0)]
+    assert cache.evictions == 1
+    assert cache.cache_info()["hits"] == 2
+
+
+def test_eviction_by_bytes():
+    cache = QueryCache(max_entries=100, max_bytes=3000)
+    for term in "abcdefgh":
+        cache.put(cache.key([term], 10, "and"), [(doc_id, 1.0) for doc_id in range(10)])
+
+    assert 0 < len(cache) < 8
+    assert cache.bytes <= 3000
+    assert cache.get(cache.key(["h"], 10, "and")) is not None
+
+
+def test_oversized_entry_is_not_cached():
+    cache = QueryCache(max_bytes=100)
+    cache.put(cache.key(["a"], 10, "and"), [(1, 1.0)] * 100)
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_clear():
+    cache = QueryCache()
+    cache.put(cache.key(["a", "b"], 10, "and"), [])
+    cache.put(cache.key(["c"], 10, "and"), [])
+
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes == 0
+    assert cache.invalidations == 2
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index((Document(doc_id, text) for doc_id, text in
+                       enumerate(["ректор университета", "приём документов", "ректор приём"], start=1)),
+                      compression_method="gamma")
+
+
+def test_index_serves_repeated_queries_from_cache(index):
+    first = index.search_scored("ректор приём")
+    assert index.search_scored("Приём РЕКТОР приём") == first
+    assert index.query_cache.hits == 1
+    assert index.query_cache.misses == 1
+
+
+def test_add_document_clears_scored_entries(index):
+    index.search_scored("ректор")
+    index.search_scored("документов")
+    index.add_document(Document(4, "ректор ректор"))
+
+    assert [doc_id for doc_id, _ in index.search_scored("ректор")][0] == 4
+    index.search_scored("документов")
+    assert index.query_cache.hits == 0  # число документов и средняя длина изменились
+
+
+def test_cached_scores_follow_collection_statistics(make_index):
+    idx = make_index(compression_method="gamma")
+    idx.add_document(Document(1, "a b"))
+    idx.add_document(Document(2, "a x x x x x x"))
+    idx.add_document(Document(3, "b"))
+    idx.search_scored("a b", k=None, mode="or")
+    for doc_id in range(4, 39):
+        idx.add_document(Document(doc_id, "c"))
+
+    fresh = make_index((idx.documents[doc_id] for doc_id in range(1, 39)),
+                       compression_method="gamma", query_cache=QueryCache(max_entries=0))
+    expected = fresh.search_scored("a b", k=None, mode="or")
+    actual = idx.search_scored("a b", k=None, mode="or")
+    assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+def test_builder_clears_cache(index):
+    index.search_scored("документов")
+    index.add_documents([Document(5, "расписание")])
+    assert len(index.query_cache) == 0
+
+
+def test_postings_cache_hits_report_savings():
+    cache = PostingsCache(max_bytes=10_000)
+    cache.put("a", array("I", [1, 2, 3]), encoded_size=5, cost=0.002)
+
+    assert list(cache.get("a")) == [1, 2, 3]
+    assert cache.get("b") is None
+    info = cache.cache_info()
+    assert (info["hits"], info["misses"], info["bytes_saved"]) == (1, 1, 5)
+    assert info["decode_time_saved"] == pytest.approx(0.002)
+
+
+def test_postings_cache_respects_budget_and_keeps_expensive_lists():
+    cache = PostingsCache(max_bytes=3 * (400 + 64))
+    cache.put("expensive", array("I", range(100)), 50, cost=0.01)
+    cache.put("cheap", array("I", range(100)), 50, cost=0.0001)
+    cache.put("other", array("I", range(100)), 50, cost=0.001)
+    cache.put("new", array("I", range(100)), 50, cost=0.001)
+
+    assert cache.bytes <= cache.max_bytes
+    assert "expensive" in cache and "cheap" not in cache
+    assert cache.evictions == 1
+
+
+def test_postings_cache_prefers_frequent_lists():
+    cache = PostingsCache(max_bytes=2 * (400 + 64))
+    cache.put("popular", array("I", range(100)), 50, cost=0.001)
+    cache.put("rare", array("I", range(100)), 50, cost=0.001)
+    for _ in range(5):
+        cache.get("popular")
+    cache.put("new", array("I", range(100)), 50, cost=0.001)
+
+    assert "popular" in cache and "rare" not in cache
+
+
+def test_postings_cache_skips_oversized_lists():
+    cache = PostingsCache(max_bytes=100)
+    cache.put("big", array("I", range(1000)), 50, cost=1.0)
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_index_decodes_each_list_once(index):
+    index.query_cache.clear()
+    index.postings_cache.clear()
+    index.search_scored("ректор приём")
+    index.query_cache.clear()
+    index.search_scored("приём ректор")
+
+    assert index.postings_cache.hits >= 1
+    assert index.postings_cache.cache_info()["bytes_saved"] > 0
+
+
+def test_add_document_refreshes_cached_postings(index):
+    assert index.postings("ректор") == [1, 3]
+    index.add_document(Document(4, "ректор"))
+
+    assert "ректор" in index.postings_cache
+    assert index.postings("ректор") == [1, 3, 4]
+    assert index._decode_postings(index.index["ректор"]) == [1, 3, 4]
+
+
+def test_postings_cache_stores_read_only_arrays():
+    cache = PostingsCache(max_bytes=10_000)
+    cache.put("a", array("I", [1, 2]), encoded_size=10, cost=0.1)
+    cache.update("a", array("I", [1, 2, 3]), encoded_size=12)
+
+    postings = cache.get("a")
+    assert list(postings) == [1, 2, 3]
+    with pytest.raises(TypeError):
+        postings[0] = 5
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from src.compression import vectorized
+from src.compression.codecs import CODECS, available_methods, get_codec, register_codec
+from src.compression.elias import EliasGammaEncoder
+from src.compression.utils import decode_postings, decode_postings_array, encode_postings
+from src.utils.exceptions import CompressionError
+
+BLOCK_CODECS = ["vbyte", "simple8b", "pfor"]
+
+
+def sample_lists():
+    rng = random.Random(7)
+    yield [0]
+    yield [1] * 500
+    yield [0, 1, 2, 3, 2 ** 31 - 1]
+    yield list(range(300))
+    for _ in range(30):
+        size = rng.randint(1, 600)
+        yield [rng.choice([1, 1, 2, rng.randint(0, 300), rng.randint(0, 2 ** 24)]) for _ in range(size)]
+
+
+@pytest.mark.parametrize("method", BLOCK_CODECS)
+def test_block_codec_round_trip(method):
+    codec = get_codec(method)
+    for numbers in sample_lists():
+        encoded = codec.encode(numbers)
+        assert codec.decode(encoded) == numbers
+        assert list(codec.decode_array(encoded)) == numbers
+
+
+@pytest.mark.parametrize("method", BLOCK_CODECS)
+def test_block_codec_empty(method):
+    codec = get_codec(method)
+    assert codec.encode([]) == b""
+    assert codec.decode(b"") == []
+    assert list(codec.decode_array(b"")) == []
+
+
+@pytest.mark.parametrize("method", BLOCK_CODECS)
+def test_block_codec_rejects_negative(method):
+    with pytest.raises(CompressionError):
+        get_codec(method).encode([1, -1])
+
+
+@pytest.mark.parametrize("method", BLOCK_CODECS)
+def test_block_codec_decode_array_fallback(method, monkeypatch):
+    monkeypatch.setattr(vectorized, "HAS_NUMPY", False)
+    numbers = [5, 1, 1, 300, 70000]
+    assert list(get_codec(method).decode_array(get_codec(method).encode(numbers))) == numbers
+
+
+@pytest.mark.parametrize("method", list(CODECS))
+def test_postings_round_trip_all_codecs(method):
+    postings = [1, 2, 3, 10, 250, 251, 4000, 100000]
+    encoded = encode_postings(postings, method)
+    assert decode_postings(encoded, method) == postings
+    assert list(decode_postings_array(encoded, method)) == postings
+
+
+def test_vbyte_known_bytes():
+    assert get_codec("vbyte").encode([1, 127, 128, 300]) == bytes([0x01, 0x7F, 0x80, 0x01, 0xAC, 0x02])
+
+
+def test_simple8b_packs_runs_of_ones():
+    # Заголовок (2 байта varint) и одно слово на 240 единиц
+    assert len(get_codec("simple8b").encode([1] * 240)) == 10
+
+
+def test_pfor_uses_exceptions_for_outliers():
+    numbers = [1] * 127 + [2 ** 20]
+    # Без исключений блок занял бы 128 * 21 бит = 336 байт
+    assert len(get_codec("pfor").encode(numbers)) < 40
+
+
+def test_registry():
+    assert available_methods()[0] == "none"
+    assert get_codec("unknown") is EliasGammaEncoder
+    with pytest.raises(CompressionError):
+        register_codec("none", EliasGammaEncoder)
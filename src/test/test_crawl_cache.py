@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import os
+import socket
+
+import pytest
+from aiohttp import web
+
+from load_documents import stream_documents
+from src.crawl.cache import OBJECTS_DIR, CrawlCache
+
+PAGES = {
+    "/a": "<html><head><title>А</title></head><body><p>Ректор университета</p></body></html>",
+    "/b": "<html><head><title>Б</title></head><body><p>Приёмная комиссия</p></body></html>",
+    "/c": "<html><head><title>В</title></head><body><p>Расписание занятий</p></body></html>",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class PageServer:
+    """
+    Локальный сервер страниц с ETag и Last-Modified и счётчиком ответов.
+    Порт постоянный, чтобы URL совпадали между запусками загрузки
+    """
+
+    def __init__(self, pages: dict, port: int):
+        self.pages = dict(pages)
+        self.requests = []  # (путь, статус)
+        self.runner = None
+        self.base = f"http://127.0.0.1:{port}"
+        self.port = port
+
+    async def handler(self, request):
+        html = self.pages.get(request.path)
+        if html is None:
+            self.requests.append((request.path, 404))
+            raise web.HTTPNotFound()
+        etag = '"' + hashlib.md5(html.encode("utf-8")).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.requests.append((request.path, 304))
+            return web.Response(status=304, headers={"ETag": etag})
+        self.requests.append((request.path, 200))
+        return web.Response(text=html, content_type='text/html',
+                            headers={"ETag": etag, "Last-Modified": "Wed, 01 Oct 2025 00:00:00 GMT"})
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/{path:.*}', self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '127.0.0.1', self.port).start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
+
+
+def crawl(server: PageServer, paths, cache: CrawlCache, indexed_urls=()) -> dict:
+    """Загрузка страниц сервера через кэш: URL -> текст"""
+    async def run():
+        async with server:
+            urls = [server.base + path for path in paths]
+            documents = [doc async for doc in stream_documents(urls, max_workers=2, extract_workers=0,
+                                                               parser='html.parser', cache=cache,
+                                                               indexed_urls=indexed_urls)]
+            return {doc['metadata']['url'][len(server.base):]: doc['text'] for doc in documents}
+    return asyncio.run(run())
+
+
+def test_store_and_load(tmp_path):
+    cache = CrawlCache(str(tmp_path))
+    assert cache.entry("http://x/a") is None
+
+    assert cache.store("http://x/a", PAGES["/a"], {"ETag": '"1"'}) is True
+    assert cache.store("http://x/a", PAGES["/a"], {"ETag": '"2"'}) is False
+    entry = cache.entry("http://x/a")
+    assert entry.etag == '"2"' and cache.load(entry) == PAGES["/a"]
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"2"'}
+    assert cache.store("http://x/a", PAGES["/b"], {}) is True
+
+
+def test_identical_pages_are_stored_once(tmp_path):
+    cache = CrawlCache(str(tmp_path))
+    cache.store("http://x/a", PAGES["/a"], {})
+    cache.store("http://x/copy", PAGES["/a"], {})
+    objects = [name for _, _, names in os.walk(tmp_path / OBJECTS_DIR) for name in names]
+    assert len(objects) == 1
+
+
+def test_invalid_mode(tmp_path):
+    with pytest.raises(ValueError):
+        CrawlCache(str(tmp_path), mode='always')
+
+
+def test_cached_mode_does_not_refetch(tmp_path):
+    server = PageServer(PAGES, free_port())
+    first = crawl(server, PAGES, CrawlCache(str(tmp_path)))
+    assert first["/b"] == "Б Приёмная комиссия"
+
+    server.requests.clear()
+    cache = CrawlCache(str(tmp_path))
+    assert crawl(server, PAGES, cache) == first
+    assert server.requests == []
+    assert cache.hits == 3
+
+
+def test_offline_replay_never_uses_network(tmp_path):
+    port = free_port()
+    crawl(PageServer(PAGES, port), ["/a", "/b"], CrawlCache(str(tmp_path)))
+
+    server = PageServer({}, port)  # Сервер без страниц: любой запрос вернул бы 404
+    cache = CrawlCache(str(tmp_path), mode='offline')
+    documents = crawl(server, ["/a", "/b", "/c"], cache)
+    assert sorted(documents) == ["/a", "/b"]
+    assert server.requests == []
+    assert cache.cache_info()["misses"] == 1
+
+
+def test_refresh_sends_conditional_requests(tmp_path):
+    server = PageServer(PAGES, free_port())
+    crawl(server, PAGES, CrawlCache(str(tmp_path)))
+
+    server.requests.clear()
+    server.pages["/b"] = PAGES["/b"].replace("Приёмная", "Новая приёмная")
+    cache = CrawlCache(str(tmp_path), mode='refresh')
+    documents = crawl(server, PAGES, cache)
+
+    # Без indexed_urls нужны все документы: неизменённые читаются из кэша
+    assert documents["/a"] == "А Ректор университета"
+    assert documents["/b"] == "Б Новая приёмная комиссия"
+    assert sorted(server.requests) == [("/a", 304), ("/b", 200), ("/c", 304)]
+    assert cache.not_modified == 2 and cache.fetched == 1
+
+
+def test_refresh_skips_unchanged_indexed_pages(tmp_path):
+    server = PageServer(PAGES, free_port())
+    crawl(server, PAGES, CrawlCache(str(tmp_path)))
+
+    server.requests.clear()
+    server.pages["/c"] = PAGES["/c"].replace("занятий", "экзаменов")
+    cache = CrawlCache(str(tmp_path), mode='refresh')
+    documents = crawl(server, PAGES, cache, indexed_urls={server.base + path for path in PAGES})
+
+    # Передаётся и разбирается только изменившаяся страница
+    assert documents == {"/c": "В Расписание экзаменов"}
+    assert sorted(server.requests) == [("/a", 304), ("/b", 304), ("/c", 200)]
+
+
+def test_unchanged_content_without_validators_is_skipped(tmp_path):
+    cache = CrawlCache(str(tmp_path), mode='refresh')
+    cache.store("http://x/a", PAGES["/a"], {})  # Сервер не прислал ETag и Last-Modified
+    assert cache.conditional_headers(cache.entry("http://x/a")) == {}
+    assert cache.store("http://x/a", PAGES["/a"], {}) is False
+    assert cache.unchanged == 1
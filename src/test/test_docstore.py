@@ -0,0 +1,65 @@
+import pytest
+
+from src.core.document import Document
+from src.storage.docstore import DiskDocumentStore, MemoryDocumentStore
+from src.utils.exceptions import IndexationError
+
+
+def documents():
+    return MemoryDocumentStore({
+        doc_id: Document(doc_id, f"Текст страницы {doc_id} " * 50, {"title": f"Заголовок {doc_id}", "url": f"u{doc_id}"})
+        for doc_id in [7, 3, 120, 42]
+    })
+
+
+def test_memory_store():
+    store = documents()
+    store[1] = Document(1, "текст", {"title": "t"})
+
+    assert len(store) == 5 and 1 in store
+    assert store.metadata(1) == {"title": "t"}
+    assert [doc.doc_id for doc in store.fetch([3, 1])] == [3, 1]
+    del store[1]
+    assert 1 not in store
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib"])
+def test_disk_store_roundtrip(tmp_path, compression):
+    source = documents()
+    DiskDocumentStore.write(source, {3: 10, 7: 20}, str(tmp_path), compression)
+    store = DiskDocumentStore.open(str(tmp_path), compression)
+
+    assert list(store) == [3, 7, 42, 120]
+    assert store[42] == source[42]
+    assert store.text(7) == source[7].text
+    assert store.fetch([120, 3], metadata_only=True) == [source[120].metadata, source[3].metadata]
+    assert dict(store.lengths) == {3: 10, 7: 20, 42: 0, 120: 0}
+    assert 5 not in store and "3" not in store
+    with pytest.raises(KeyError):
+        store.metadata(5)
+
+
+def test_zlib_shrinks_text(tmp_path):
+    plain, packed = tmp_path / "plain", tmp_path / "packed"
+    plain.mkdir()
+    packed.mkdir()
+    DiskDocumentStore.write(documents(), {}, str(plain), "none")
+    DiskDocumentStore.write(documents(), {}, str(packed), "zlib")
+
+    assert (packed / "stored.bin").stat().st_size < (plain / "stored.bin").stat().st_size / 5
+
+
+def test_metadata_does_not_touch_text(tmp_path):
+    DiskDocumentStore.write(documents(), {}, str(tmp_path), "zlib")
+    store = DiskDocumentStore.open(str(tmp_path), "zlib")
+    # Порча сжатого текста не мешает чтению метаданных
+    store._stored = bytearray(store._stored)
+    _, offset, metadata_length, text_length, _ = store._lookup(42)
+    store._stored[offset + metadata_length: offset + metadata_length + text_length] = b"\0" * text_length
+
+    assert store.metadata(42)["title"] == "Заголовок 42"
+
+
+def test_unknown_compression(tmp_path):
+    with pytest.raises(IndexationError):
+        DiskDocumentStore.write(documents(), {}, str(tmp_path), "lz77")
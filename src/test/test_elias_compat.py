@@ -0,0 +1,47 @@
+import math
+import random
+
+import pytest
+
+from src.compression.elias import EliasDeltaEncoder, EliasGammaEncoder
+
+
+# Эталонная строковая реализация, использовавшаяся до перехода на битовые накопители
+def reference_gamma_code(number: int) -> str:
+    return "0" * int(math.log2(number)) + bin(number)[2:]
+
+
+def reference_delta_code(number: int) -> str:
+    return reference_gamma_code(int(math.log2(number)) + 1) + bin(number)[3:]
+
+
+def reference_encode(numbers: list[int], code) -> bytes:
+    if not numbers:
+        return b""
+    bitstring = "".join(code(n) for n in numbers)
+    padding = 8 - len(bitstring) % 8
+    if padding != 8:
+        bitstring += "0" * padding
+    return bytes(int(bitstring[i: i + 8], 2) for i in range(0, len(bitstring), 8))
+
+
+def sample_lists():
+    rng = random.Random(42)
+    yield [1]
+    yield [1, 1, 1, 1, 1, 1, 1, 1, 1]
+    yield [255, 256, 257, 2 ** 31 - 1, 2 ** 40 + 3]
+    yield list(range(1, 300))
+    for _ in range(50):
+        size = rng.randint(1, 400)
+        yield [rng.choice([1, 2, 3, rng.randint(1, 1000), rng.randint(1, 2 ** 20)]) for _ in range(size)]
+
+
+@pytest.mark.parametrize("encoder, code", [
+    (EliasGammaEncoder, reference_gamma_code),
+    (EliasDeltaEncoder, reference_delta_code),
+])
+def test_byte_for_byte_compatibility(encoder, code):
+    for numbers in sample_lists():
+        reference = reference_encode(numbers, code)
+        assert encoder.encode(numbers) == reference
+        assert encoder.decode(reference) == numbers
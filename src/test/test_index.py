@@ -2,16 +2,15 @@ from unittest.mock import patch
 
 import pytest
 
+from src.compression.utils import encode_postings
 from src.core.document import Document
 from src.core.index import InvertedIndex, IndexationError
 
 
-@patch("src.core.index.encode_postings", return_value=b"encoded")
-@patch("nltk.tokenize.word_tokenize", return_value=["this", "is", "test"])
-@patch("nltk.corpus.stopwords.words", return_value=["is"])
-@patch("nltk.stem.SnowballStemmer.stem", side_effect=lambda w: w)
-def test_add_document_updates_index(mock_stem, mock_stopwords, mock_tokenize, mock_encode):
-    index = InvertedIndex(compression_method="gamma")
+# Частоты хранятся в тех же закодированных списках, поэтому кодирование не подменяется
+@patch("src.core.index.encode_postings", wraps=encode_postings)
+def test_add_document_updates_index(mock_encode, make_index):
+    index = make_index(compression_method="gamma")
     doc = Document(doc_id=1, text="This is test")
     index.add_document(doc)
 
@@ -22,11 +21,8 @@ def test_add_document_updates_index(mock_stem, mock_stopwords, mock_tokenize, mo
 
 
 @patch("src.core.index.encode_postings", return_value=b"compressed")
-@patch("nltk.tokenize.word_tokenize", return_value=["one", "two", "two"])
-@patch("nltk.corpus.stopwords.words", return_value=[])
-@patch("nltk.stem.SnowballStemmer.stem", side_effect=lambda w: w)
-def test_term_frequency_counts(mock_stem, mock_stopwords, mock_tokenize, mock_encode):
-    index = InvertedIndex()
+def test_term_frequency_counts(mock_encode, make_index):
+    index = make_index()
     doc = Document(doc_id=2, text="one two two")
     index.add_document(doc)
 
@@ -130,3 +126,12 @@ def test_process_text_case_normalization(empty_index):
     tokens = empty_index._process_text(text)
     # Стемминг к "кошк"
     assert tokens == ["кошк"]
+
+
+def test_sorted_terms_follow_new_documents(make_index):
+    index = make_index()
+    index.add_document(Document(1, "кот кошка"))
+    assert index.terms_with_prefix("ко") == ["кот", "кошка"]
+    index.add_document(Document(2, "котёнок пёс"))
+    assert index.terms_with_prefix("кот") == ["кот", "котёнок"]
+    assert index.terms_range("котёнок", "пёс") == ["котёнок", "кошка"]
@@ -1,9 +1,23 @@
+import base64
+import json
 from unittest.mock import patch
 
-from indexer import build_index
+import pytest
+
+from indexer import build_index, save_index, update_index
+from searcher import load_index
+from src.core.document import Document
 from src.core.index import InvertedIndex
 
 
+def streaming(docs):
+    """Подмена потоковой загрузки: асинхронный генератор заданных документов"""
+    async def stream(*args, **kwargs):
+        for doc in docs:
+            yield doc
+    return stream
+
+
 def mock_documents():
     return [
         {'doc_id': 1, 'text': "Текст первого документа", 'metadata': {'author': 'A'}},
@@ -12,9 +26,9 @@ def mock_documents():
     ]
 
 
-@patch('indexer.load_documents_from_urls')
+@patch('indexer.stream_documents_from_urls')
 def test_build_index_success(mock_load):
-    mock_load.return_value = mock_documents()
+    mock_load.side_effect = streaming(mock_documents())
 
     index = build_index('fake_urls.txt', compression_method='none')
 
@@ -24,14 +38,14 @@ def test_build_index_success(mock_load):
     assert index.documents[1].text == "Текст первого документа"
 
 
-@patch('indexer.load_documents_from_urls')
+@patch('indexer.stream_documents_from_urls')
 def test_build_index_handles_document_error(mock_load):
     docs = [
         {'doc_id': 1, 'text': "Текст", 'metadata': {}},
         {'doc_id': -1, 'text': "Неправильный ID", 'metadata': {}},
         {'doc_id': 2, 'text': "Ещё текст", 'metadata': {}}
     ]
-    mock_load.return_value = docs
+    mock_load.side_effect = streaming(docs)
 
     index = build_index('fake_urls.txt', compression_method='none')
     assert 1 in index.documents
@@ -39,9 +53,103 @@ def test_build_index_handles_document_error(mock_load):
     assert -1 not in index.documents
 
 
-@patch('indexer.load_documents_from_urls')
+@patch('indexer.stream_documents_from_urls')
 def test_build_index_with_compression(mock_load):
-    mock_load.return_value = mock_documents()
+    mock_load.side_effect = streaming(mock_documents())
     index = build_index('fake_urls.txt', compression_method='delta')
     assert index.compression_method == 'delta'
     assert len(index.documents) == 3
+
+
+@pytest.mark.parametrize("index_format,name", [("segment", "index"), ("json", "index.json")])
+@patch('indexer.stream_documents_from_urls')
+def test_save_and_load_index(mock_load, tmp_path, index_format, name):
+    mock_load.side_effect = streaming(mock_documents())
+    index = build_index('fake_urls.txt', compression_method='gamma')
+    path = str(tmp_path / name)
+
+    save_index(index, path, index_format)
+    loaded = load_index(path)
+
+    assert sorted(loaded.documents) == [1, 2, 3]
+    assert loaded.documents[1].metadata == {'author': 'A'}
+    assert {term: bytes(loaded.index[term]) for term in loaded.index} == index.index
+    assert dict(loaded.doc_lengths) == index.doc_lengths
+
+
+@patch('indexer.SegmentedIndex')
+@patch('indexer.stream_documents_from_urls')
+def test_update_index_replaces_pages_by_url(mock_load, mock_segmented, tmp_path, split_analyzer):
+    from src.storage.segmented import SegmentedIndex
+
+    mock_segmented.side_effect = lambda path, compression_method, **kwargs: SegmentedIndex(
+        path, compression_method=compression_method, analyzer=split_analyzer, background_merge=False, **kwargs)
+    path = str(tmp_path / "index")
+
+    mock_load.side_effect = streaming([
+        {'doc_id': 1, 'text': "старый текст", 'metadata': {'url': 'a'}},
+        {'doc_id': 2, 'text': "другая страница", 'metadata': {'url': 'b'}},
+    ])
+    update_index(path, 'all.txt', 'gamma')
+
+    mock_load.side_effect = streaming([
+        {'doc_id': 1, 'text': "новый текст", 'metadata': {'url': 'b'}},
+        {'doc_id': 2, 'text': "новая страница", 'metadata': {'url': 'c'}},
+    ])
+    index = update_index(path, 'changed.txt', 'gamma', removed_urls=['a'])
+
+    assert {doc_id: index.documents[doc_id].text for doc_id in index.documents} == \
+           {2: "новый текст", 3: "новая страница"}
+    assert [doc.doc_id for doc in index.search("новый")] == [2]
+    assert load_index(path).documents.metadata(3) == {'url': 'c'}
+
+
+@patch('indexer.load_documents_from_urls')
+def test_build_index_parallel(mock_load):
+    mock_load.return_value = mock_documents()
+    index = build_index('fake_urls.txt', compression_method='gamma', workers=2)
+    assert sorted(index.documents) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("method,block_size", [("gamma", 128), ("none", 0), ("vbyte", 2)])
+def test_load_legacy_json_index_migrates_frequencies(tmp_path, method, block_size, make_index):
+    from src.compression.utils import encode_postings
+    from src.core.postings import encode_blocks
+
+    index = make_index([Document(1, "кот кот пес"), Document(2, "кот"), Document(3, "пес пес мышь")],
+                       compression_method=method, block_size=block_size)
+    path = str(tmp_path / "index.json")
+    save_index(index, path, 'json')
+
+    # Формат до переноса частот в списки: блоки только из ID и отдельный словарь частот
+    def legacy_block(doc_ids, frequencies, base):
+        if method == 'none':
+            return ",".join(map(str, doc_ids)).encode('utf-8')
+        return encode_postings([doc_id - base for doc_id in doc_ids], method)
+
+    data = json.loads(open(path, encoding="utf-8").read())
+    for term in data["index"]:
+        doc_ids = index.postings(term)
+        encoded = encode_blocks(doc_ids, doc_ids, legacy_block, block_size) if block_size else \
+            legacy_block(doc_ids, doc_ids, 0)
+        data["index"][term] = base64.b64encode(encoded).decode("utf-8")
+    data["term_frequencies"] = {term: {str(k): v for k, v in index.term_frequencies[term].items()}
+                                for term in index.index}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    loaded = load_index(path)
+    assert dict(loaded.term_frequencies) == dict(index.term_frequencies)
+    assert {term: bytes(loaded.index[term]) for term in loaded.index} == index.index
+
+
+def test_json_index_keeps_positions(tmp_path, make_index, split_analyzer):
+    index = make_index([Document(1, "приёмная комиссия ректор"), Document(2, "комиссия приёмная")],
+                       compression_method="gamma", positions=True)
+    path = str(tmp_path / "index.json")
+    save_index(index, path, 'json')
+
+    loaded = load_index(path)
+    loaded.analyzer = split_analyzer
+    assert loaded.positions == index.positions
+    assert [doc_id for doc_id, _ in loaded.search_scored('"приёмная комиссия"')] == [1]
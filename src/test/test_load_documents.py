@@ -0,0 +1,145 @@
+import asyncio
+import pickle
+import time
+from unittest.mock import patch
+
+from aiohttp import web
+
+from indexer import index_stream
+from load_documents import extract_document, process_batch, read_urls, stream_documents
+
+PAGE = """<html><head><title>Приёмная комиссия</title><style>p {color: red}</style></head>
+<body><nav>Меню</nav><p>Расписание занятий</p><script>var x = 1;</script><footer>Контакты</footer></body></html>"""
+
+
+def fake_fetch(delay: float, fetched: list):
+    """Подмена загрузки страницы: задержка вместо сети, нечётные ID — ошибки"""
+    async def fetch(session, url, doc_id, **kwargs):
+        await asyncio.sleep(delay)
+        fetched.append(doc_id)
+        if doc_id % 2 == 0:
+            return {'doc_id': doc_id, 'text': url, 'metadata': {'url': url}}
+        return None
+    return fetch
+
+
+def test_read_urls(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text("http://a 200\n\nhttp://b\nhttp://c\n", encoding="utf-8")
+    assert read_urls(str(path)) == ["http://a", "http://b", "http://c"]
+    assert read_urls(str(path), max_docs=1) == ["http://a"]
+
+
+def test_extract_document():
+    document = extract_document(PAGE, "http://example/1", 1, parser='html.parser')
+    assert document == {
+        'doc_id': 1,
+        'text': "Приёмная комиссия Расписание занятий",
+        'metadata': {'title': "Приёмная комиссия", 'source': 'spbu.ru', 'url': "http://example/1"},
+    }
+    assert type(document['metadata']['title']) is str
+    assert pickle.loads(pickle.dumps(document)) == document
+
+
+def test_extract_document_without_title():
+    document = extract_document("<p>Текст</p>", "http://example/2", 2, parser='html.parser')
+    assert document['metadata']['title'] == "http://example/2"
+
+
+async def serve_pages(pages: dict):
+    """Локальный HTTP-сервер со страницами по путям; возвращает runner и базовый URL"""
+    async def handler(request):
+        if request.path not in pages:
+            raise web.HTTPNotFound()
+        return web.Response(text=pages[request.path], content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/{path:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_stream_parses_pages_in_process_pool():
+    async def crawl():
+        runner, base = await serve_pages({f"/{i}": PAGE.replace("занятий", f"занятий {i}") for i in range(5)})
+        try:
+            urls = [f"{base}/{i}" for i in range(5)] + [f"{base}/missing", f"{base}/file.pdf"]
+            return [doc async for doc in stream_documents(urls, max_workers=3, extract_workers=2,
+                                                          parser='html.parser')]
+        finally:
+            await runner.cleanup()
+
+    documents = sorted(asyncio.run(crawl()), key=lambda doc: doc['doc_id'])
+    assert [doc['doc_id'] for doc in documents] == [1, 2, 3, 4, 5]
+    assert documents[2]['text'] == "Приёмная комиссия Расписание занятий 2"
+
+
+def test_process_batch_collects_successful_documents():
+    urls = [f"http://example/{i}" for i in range(1, 11)]
+    with patch('load_documents.fetch_and_process', fake_fetch(0, [])):
+        documents = asyncio.run(process_batch(urls, max_workers=3))
+    assert sorted(doc['doc_id'] for doc in documents) == [2, 4, 6, 8, 10]
+
+
+def test_stream_applies_backpressure():
+    urls = [f"http://example/{i}" for i in range(1, 101)]
+    fetched, backlog = [], []
+
+    async def consume():
+        async for _ in stream_documents(urls, max_workers=4, queue_size=3):
+            await asyncio.sleep(0.002)  # Медленная индексация
+            # Успешных загрузок сверх полученных потребителем
+            backlog.append(sum(1 for doc_id in fetched if doc_id % 2 == 0) - len(backlog) - 1)
+
+    with patch('load_documents.fetch_and_process', fake_fetch(0, fetched)):
+        asyncio.run(consume())
+
+    assert len(backlog) == 50
+    assert max(backlog) <= 3 + 4  # Очередь и по одному документу у каждого загрузчика
+
+
+def test_stream_stops_fetching_when_consumer_stops():
+    urls = [f"http://example/{i}" for i in range(1, 101)]
+    fetched = []
+
+    async def consume():
+        async for _ in stream_documents(urls, max_workers=2, queue_size=1):
+            break
+
+    with patch('load_documents.fetch_and_process', fake_fetch(0.001, fetched)):
+        asyncio.run(consume())
+    assert len(fetched) < 20
+
+
+def test_indexing_overlaps_fetching():
+    urls = [f"http://example/{i}" for i in range(1, 41)]
+    indexed = []
+
+    def add_document(doc):
+        time.sleep(0.02)  # Анализ текста занимает поток, но не цикл событий
+        indexed.append(doc['doc_id'])
+
+    start_time = time.perf_counter()
+    with patch('load_documents.fetch_and_process', fake_fetch(0.02, [])):
+        count = asyncio.run(index_stream(stream_documents(urls, max_workers=2), add_document))
+    elapsed = time.perf_counter() - start_time
+
+    # Загрузка ~0.4 с и индексация ~0.4 с: последовательно было бы ~0.8 с
+    assert count == 20 and sorted(indexed) == list(range(2, 41, 2))
+    assert elapsed < 0.7
+
+
+def test_index_stream_skips_invalid_documents():
+    async def documents():
+        for doc_id in (1, -1, 2):
+            yield {'doc_id': doc_id}
+
+    def add_document(doc):
+        if doc['doc_id'] < 0:
+            raise ValueError("ID документа должен быть положительным")
+
+    assert asyncio.run(index_stream(documents(), add_document)) == 2
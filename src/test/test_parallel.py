@@ -0,0 +1,111 @@
+from array import array
+
+import pytest
+
+from src.core.document import Document
+from src.core.parallel import ParallelIndexBuilder, index_chunk, merge_postings
+
+
+WORDS = ["ректор", "приём", "расписание", "стипендия", "общежитие", "факультет", "кафедра"]
+
+
+def documents(doc_ids):
+    return [Document(doc_id, " ".join(WORDS[(doc_id * k) % len(WORDS)] for k in range(1, doc_id % 5 + 2)))
+            for doc_id in doc_ids]
+
+
+def assert_same_index(left, right):
+    assert list(left.index) == list(right.index)
+    assert left.index == right.index
+    assert {term: dict(tfs) for term, tfs in left.term_frequencies.items()} == \
+           {term: dict(tfs) for term, tfs in right.term_frequencies.items()}
+    assert left.doc_lengths == right.doc_lengths
+    assert left.positions == right.positions
+    assert left.idf == right.idf and left.max_scores == right.max_scores
+    assert sorted(left.documents) == sorted(right.documents)
+
+
+@pytest.mark.parametrize("method,block_size", [("gamma", 16), ("vbyte", 128), ("none", 0)])
+def test_parallel_build_matches_serial(method, block_size, make_index):
+    docs = documents(range(1, 301))
+    serial = make_index(compression_method=method, block_size=block_size)
+    serial.add_documents(docs)
+
+    parallel = make_index(compression_method=method, block_size=block_size)
+    ParallelIndexBuilder(parallel, workers=2, chunk_size=37).build(docs)
+
+    assert_same_index(serial, parallel)
+
+
+def test_parallel_build_records_positions(make_index):
+    docs = documents(range(1, 120)) + documents([7, 3])
+    serial = make_index(compression_method="gamma", block_size=16, positions=True)
+    parallel = make_index(compression_method="gamma", block_size=16, positions=True)
+    for index in (serial, parallel):
+        index.add_document(Document(500, "ректор кафедра"))
+    serial.add_documents(docs)
+    ParallelIndexBuilder(parallel, workers=2, chunk_size=23).build(docs)
+
+    assert_same_index(serial, parallel)
+    assert parallel.search_scored('"общежитие факультет"', k=None) == serial.search_scored('"общежитие факультет"', k=None)
+
+
+def test_parallel_build_with_unordered_and_duplicate_ids(make_index):
+    docs = documents([9, 2, 7, 1, 2, 30, 4, 9]) + [Document(4, "ректор ректор")]
+    serial = make_index(compression_method="delta")
+    serial.add_documents(docs)
+
+    parallel = make_index(compression_method="delta")
+    parallel.add_documents(docs, workers=3)
+
+    assert_same_index(serial, parallel)
+
+
+def test_parallel_build_merges_with_existing_postings(make_index):
+    serial = make_index(compression_method="gamma")
+    parallel = make_index(compression_method="gamma")
+    for index in (serial, parallel):
+        index.add_document(Document(500, "ректор кафедра"))
+        index.postings("ректор")  # список попадает в кэш и должен быть сброшен
+
+    serial.add_documents(documents(range(1, 50)))
+    parallel.add_documents(documents(range(1, 50)), workers=2)
+
+    assert_same_index(serial, parallel)
+    assert parallel.postings("ректор")[-1] == 500
+
+
+def test_index_chunk(split_analyzer):
+    postings, lengths, positions = index_chunk([(5, "а б а"), (2, "б")], analyzer=split_analyzer)
+
+    assert list(postings) == ["а", "б"]
+    assert postings["б"] == (array("I", [2, 5]), array("I", [1, 1]))
+    assert postings["а"] == (array("I", [5]), array("I", [2]))
+    assert lengths == [(5, 3), (2, 1)]
+    assert positions == {}
+
+    positions = index_chunk([(5, "а б а")], analyzer=split_analyzer, positions=True)[2]
+    assert positions == {"а": {5: [1, 3]}, "б": {5: [2]}}
+
+
+def test_merge_postings():
+    disjoint = [(array("I", [5, 6]), array("I", [1, 1])), (array("I", [1, 3]), array("I", [2, 2]))]
+    assert merge_postings(disjoint) == ([1, 3, 5, 6], [2, 2, 1, 1])
+
+    overlapping = [(array("I", [1, 5]), array("I", [1, 1])), (array("I", [3, 5]), array("I", [2, 2]))]
+    assert merge_postings(overlapping) == ([1, 3, 5], [1, 2, 3])
+
+
+def test_parallel_build_sums_lengths_of_readded_documents(make_index):
+    serial = make_index(compression_method="gamma")
+    parallel = make_index(compression_method="gamma")
+    for index in (serial, parallel):
+        index.add_document(Document(500, "ректор кафедра"))
+
+    docs = documents(range(1, 40)) + [Document(500, "ректор ректор приём")]
+    serial.add_documents(docs)
+    parallel.add_documents(docs, workers=2)
+
+    assert_same_index(serial, parallel)
+    assert parallel.doc_lengths[500] == sum(tfs.get(500, 0) for tfs in parallel.term_frequencies.values()) == 5
+    assert parallel.total_length == sum(parallel.doc_lengths.values())
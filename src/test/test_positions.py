@@ -0,0 +1,54 @@
+import pytest
+
+from src.compression.utils import decode_postings, encode_postings
+from src.core.positions import (PositionReader, decode_all_positions, decode_positions, encode_positions,
+                                near_match, phrase_match, token_positions)
+
+
+def encode(positions):
+    return encode_postings(positions, "gamma")
+
+
+def decode(data):
+    return decode_postings(data, "gamma")
+
+
+LISTS = [[1, 5, 9], [2], [3, 4, 100, 1000]] * 50
+
+
+def test_token_positions():
+    assert token_positions(["кот", "пёс", "кот"]) == {"кот": [1, 3], "пёс": [2]}
+
+
+@pytest.mark.parametrize("block_size", [1, 4, 64, 1000])
+def test_round_trip(block_size):
+    data = encode_positions(LISTS, encode, block_size)
+    assert decode_all_positions(data, decode) == LISTS
+    reader = PositionReader(data, decode)
+    assert reader.count == len(LISTS)
+    for ordinal in [0, 1, 63, 64, 65, len(LISTS) - 1]:
+        assert reader[ordinal] == LISTS[ordinal]
+        assert decode_positions(data, ordinal, decode) == LISTS[ordinal]
+    assert reader.records_decoded == 6
+    with pytest.raises(IndexError):
+        reader[len(LISTS)]
+
+
+def test_empty():
+    assert decode_all_positions(b"", decode) == []
+    assert decode_all_positions(encode_positions([], encode), decode) == []
+    assert PositionReader(b"", decode).count == 0
+
+
+def test_phrase_match():
+    assert phrase_match([[3, 10], [4], [5, 20]])
+    assert not phrase_match([[3, 10], [5], [6]])
+    assert not phrase_match([[4], [3]])  # Порядок важен
+    assert phrase_match([[1, 2], [1, 2]])  # Повтор термина: «нет нет»
+
+
+def test_near_match():
+    assert near_match([[1, 50], [47]], 3)
+    assert near_match([[47], [50]], 3)
+    assert not near_match([[1, 60], [50]], 3)
+    assert near_match([[10], [5], [7]], 5) and not near_match([[10], [5], [7]], 4)
@@ -0,0 +1,111 @@
+import pytest
+
+from src.compression.codecs import available_methods
+from src.core.document import Document
+from src.core.postings import PostingCursor, intersect_cursors
+
+
+@pytest.mark.parametrize("method", available_methods())
+@pytest.mark.parametrize("block_size", [0, 1, 4, 128])
+def test_blocked_postings_round_trip(method, block_size, make_index):
+    index = make_index(compression_method=method, block_size=block_size)
+    postings = [1, 2, 7, 8, 30, 31, 32, 100, 1000, 1001]
+    encoded = index._encode_postings(postings)
+
+    assert index._decode_postings(encoded) == postings
+    assert list(index._decode_postings_array(encoded)) == postings
+
+
+@pytest.mark.parametrize("method", available_methods())
+def test_blocked_postings_allow_zero_doc_id(method, make_index):
+    index = make_index(compression_method=method, block_size=4)
+    assert index._decode_postings(index._encode_postings([0, 5, 6, 9, 12])) == [0, 5, 6, 9, 12]
+
+
+def test_cursor_next_and_advance(make_index):
+    index = make_index(compression_method="delta", block_size=4)
+    index.index["кот"] = index._encode_postings([2, 4, 6, 8, 10, 12, 14, 16, 18, 20])
+    cursor = index.cursor("кот")
+
+    assert len(cursor) == 10
+    assert cursor.next() == 2
+    assert cursor.next() == 4
+    assert cursor.advance(4) == 4
+    assert cursor.advance(5) == 6
+    assert cursor.advance(13) == 14
+    assert cursor.advance(21) is None
+    assert cursor.next() is None
+
+
+def test_cursor_skips_blocks(make_index):
+    index = make_index(compression_method="pfor", block_size=4)
+    index.index["спбгу"] = index._encode_postings(list(range(1, 401)))
+    cursor = index.cursor("спбгу")
+
+    assert cursor.advance(390) == 390
+    assert cursor.blocks_decoded == 1
+
+
+def test_intersect_rare_and_common_touches_few_blocks(make_index):
+    index = make_index(compression_method="gamma", block_size=128)
+    index.index["спбгу"] = index._encode_postings(list(range(1, 20001)))
+    index.index["ректор"] = index._encode_postings([7, 9000, 19999])
+
+    common = index.cursor("спбгу")
+    assert intersect_cursors([common, index.cursor("ректор")]) == [7, 9000, 19999]
+    assert common.blocks_decoded == 3
+
+
+def test_cursor_from_ids():
+    cursor = PostingCursor.from_ids([3, 5, 9])
+    assert cursor.advance(4) == 5
+    assert cursor.next() == 9
+    assert cursor.next() is None
+    assert PostingCursor.from_ids([]).next() is None
+
+
+@pytest.mark.parametrize("block_size", [0, 2])
+def test_search_with_blocks(block_size, make_index):
+    index = make_index(compression_method="vbyte", block_size=block_size)
+    index.add_documents([Document(i, "кот" if i % 2 else "кот пес") for i in range(1, 20)])
+
+    assert sorted(doc.doc_id for doc in index.search("пес кот")) == list(range(2, 20, 2))
+    assert index.document_frequency("кот") == 19
+    assert index.document_frequency("пес") == 9
+
+
+@pytest.mark.parametrize("method", available_methods())
+@pytest.mark.parametrize("block_size", [0, 1, 4, 128])
+def test_frequencies_round_trip(method, block_size, make_index):
+    index = make_index(compression_method=method, block_size=block_size)
+    postings = [1, 2, 7, 8, 30, 31, 32, 100, 1000, 1001]
+    frequencies = [3, 1, 1, 12, 1, 2, 300, 1, 5, 1]
+    encoded = index._encode_postings(postings, frequencies)
+
+    assert index._decode_postings(encoded) == postings
+    assert list(index._decode_postings_array(encoded)) == postings
+    assert index._decode_frequencies(encoded) == frequencies
+
+
+def test_cursor_decodes_frequencies_of_visited_blocks_only(make_index):
+    index = make_index(compression_method="gamma", block_size=4)
+    index.index["кот"] = index._encode_postings(list(range(1, 41)), [doc_id % 7 + 1 for doc_id in range(1, 41)])
+    decoded = []
+    decode = index._decode_block_frequencies
+    index._decode_block_frequencies = lambda data, base=0: decoded.append(data) or decode(data)
+
+    cursor = index.cursor("кот")
+    assert cursor.advance(30) == 30 and cursor.tf == 30 % 7 + 1
+    assert cursor.next() == 31 and cursor.tf == 31 % 7 + 1
+    assert len(decoded) == 1
+
+
+def test_term_frequencies_view(make_index):
+    index = make_index(compression_method="vbyte", block_size=2)
+    index.add_documents([Document(1, "кот кот пес"), Document(2, "кот"), Document(3, "пес пес пес")])
+
+    assert index.term_frequencies["кот"] == {1: 2, 2: 1}
+    assert index.term_frequencies["пес"] == {1: 1, 3: 3}
+    assert index.term_frequencies["мышь"] == {}
+    assert "кот" in index.term_frequencies and "мышь" not in index.term_frequencies
+    assert sorted(index.term_frequencies) == ["кот", "пес"]
@@ -0,0 +1,245 @@
+import random
+import threading
+
+import pytest
+
+from src.core.cache import QueryCache
+from src.core.document import Document
+from src.core.index import InvertedIndex
+from src.core.postings import PostingCursor
+from src.core.query import (ProximityClause, QueryExecutor, gallop_intersect, split_prefixes, split_proximity,
+                            union_postings)
+
+
+@pytest.fixture
+def index(make_index):
+    return make_index((
+        Document(doc_id, " ".join(
+            term for term, step in [("common", 1), ("even", 2), ("rare", 97)] if doc_id % step == 0
+        ))
+        for doc_id in range(1, 1001)
+    ), compression_method="gamma", block_size=16)
+
+
+def test_plan_orders_by_document_frequency_and_deduplicates(index):
+    assert index.executor.plan(["common", "even", "rare", "even"]) == ["rare", "even", "common"]
+
+
+def test_plan_missing_term(index):
+    assert index.executor.plan(["common", "absent"]) is None
+    assert index.executor.conjunctive(["common", "absent"]) == []
+
+
+def test_conjunctive_uses_gallop_for_skewed_lists(index):
+    result = index.executor.conjunctive(["common", "rare"])
+
+    assert result == list(range(97, 1001, 97))
+    strategy, blocks = index.executor.last_stats["steps"][0][1:]
+    assert strategy == "gallop"
+    assert blocks <= 10  # из 63 блоков длинного списка
+
+
+def test_conjunctive_uses_svs_for_similar_lists(index):
+    result = index.executor.conjunctive(["common", "even"])
+
+    assert result == list(range(2, 1001, 2))
+    assert index.executor.last_stats["steps"][0][1] == "svs"
+
+
+@pytest.mark.parametrize("svs_ratio", [0.0, 1e9])
+def test_strategies_agree(index, svs_ratio):
+    executor = QueryExecutor(index, svs_ratio=svs_ratio)
+    assert executor.conjunctive(["rare", "even", "common"]) == list(range(194, 1001, 194))
+
+
+def test_early_exit_on_empty_intersection(make_index):
+    idx = make_index([Document(1, "a"), Document(2, "b"), Document(3, "c")])
+
+    assert idx.executor.conjunctive(["a", "b", "c"]) == []
+    assert len(idx.executor.last_stats["steps"]) == 1
+
+
+def test_gallop_intersect():
+    assert gallop_intersect([2, 5, 9, 40], PostingCursor.from_ids(list(range(0, 30, 5)))) == [5]
+
+
+def test_search_deduplicates_query_terms(index):
+    results = index.search("rare rare", k=None)
+    assert sorted(doc.doc_id for doc in results) == list(range(97, 1001, 97))
+
+
+@pytest.fixture
+def words_index(make_index):
+    words = ["магистр", "магистратура", "магия", "маг", "расписание", "расписан", "ректор", "рейтинг"]
+    return make_index((
+        Document(doc_id, " ".join(word for i, word in enumerate(words) if doc_id % (i + 2) == 0) + " все")
+        for doc_id in range(1, 301)
+    ), compression_method="vbyte", block_size=8)
+
+
+def brute_force(index, terms, prefixes, mode):
+    """Эталон: перебор документов с оценкой по всем терминам и раскрытым префиксам"""
+    groups = [[term for term in index.index if term.startswith(prefix)] for prefix in prefixes]
+    scored = list(dict.fromkeys(terms + [term for group in groups for term in group]))
+    results = []
+    for doc_id in index.documents:
+        present = {term for term in scored if doc_id in index.term_frequencies[term]}
+        if mode == 'and':
+            matched = all(term in present for term in terms) and all(present & set(group) for group in groups)
+        else:
+            matched = bool(present)
+        if matched:
+            score = sum(index.scorer.score(index.term_frequencies[term][doc_id], index.doc_lengths[doc_id],
+                                           index.average_length(), index.term_idf(term)) for term in present)
+            results.append((doc_id, score))
+    return sorted(results, key=lambda item: (-item[1], item[0]))
+
+
+def test_split_prefixes():
+    assert split_prefixes("Магистр* расписание рас*") == ("  расписание  ", ["магистр", "рас"])
+    assert split_prefixes("без префиксов") == ("без префиксов", [])
+
+
+def test_union_postings():
+    assert union_postings([[1, 4, 9], [2, 4], [], [9, 10]]) == [1, 2, 4, 9, 10]
+    assert union_postings([]) == []
+
+
+@pytest.mark.parametrize("query,mode", [
+    ("маг*", "and"), ("ма* рас*", "and"), ("маг* ректор", "and"), ("маг* ректор", "or"),
+    ("р* все", "or"), ("магистр* магистр", "and"), ("нет*", "and"), ("нет* ректор", "or"),
+])
+def test_prefix_search_matches_brute_force(words_index, query, mode):
+    text, prefixes = split_prefixes(query)
+    expected = brute_force(words_index, text.split(), prefixes, mode)[:10]
+    actual = words_index.search_scored(query, k=10, mode=mode)
+    assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+def test_prefix_matches_stemmed_terms_with_real_analyzer():
+    idx = InvertedIndex(compression_method="vbyte")
+    idx.add_documents([Document(1, "Расписание занятий"), Document(2, "Новые расписания экзаменов"),
+                       Document(3, "Магистратура СПбГУ"), Document(4, "Программы магистратуры")])
+
+    assert {doc.doc_id for doc in idx.search("расписание")} == {1, 2}
+    assert {doc.doc_id for doc in idx.search("расписание*")} == {1, 2}
+    assert {doc.doc_id for doc in idx.search("Магистратура*")} == {3, 4}
+    assert {doc.doc_id for doc in idx.search("распис*")} == {1, 2}  # Префикс короче основы
+
+
+def test_prefix_expansion_cap_keeps_frequent_terms(words_index):
+    words_index.executor.max_expansions = 2
+    words_index.search_scored("маг*", k=5)
+    stats = words_index.executor.last_stats
+    assert stats["expansions"] == {"маг": 2} and stats["truncated"] == ["маг"]
+    # Остаются самые частые: «магистр» (каждый 2-й документ) и «магистратура» (каждый 3-й)
+    assert words_index.executor.expand("маг") == (["магистр", "магистратура"], True)
+    inputs, size = stats["unions"]["маг"]
+    assert inputs == 150 + 100 and size == 200
+
+
+def test_prefix_search_stats(words_index):
+    words_index.search_scored("рас* ректор", k=5)
+    stats = words_index.executor.last_stats
+    assert stats["expansions"] == {"рас": 2} and stats["truncated"] == []
+    assert stats["unions"]["рас"][1] <= stats["unions"]["рас"][0]
+    assert stats["candidates"] == len(words_index.executor.conjunctive(["ректор"], [
+        union_postings([words_index.postings("расписание"), words_index.postings("расписан")])]))
+    assert stats["expansion_time"] >= 0 and stats["union_time"] >= 0
+
+
+@pytest.fixture
+def positional_index(make_index):
+    rng = random.Random(3)
+    vocabulary = ["приёмная", "комиссия", "ректор", "университет", "общежитие", "мест"]
+    return make_index((Document(doc_id, " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 12))))
+                       for doc_id in range(1, 401)), compression_method="gamma", block_size=8, positions=True)
+
+
+def matching_documents(index, predicate):
+    return {doc_id for doc_id in index.documents if predicate(index.documents[doc_id].text.split())}
+
+
+def contains_phrase(tokens, phrase):
+    return any(tokens[i: i + len(phrase)] == phrase for i in range(len(tokens)))
+
+
+def within(tokens, terms, distance):
+    return any(all(term in tokens[i: i + distance + 1] for term in terms) for i in range(len(tokens)))
+
+
+def test_split_proximity():
+    analyze = str.split
+    text, clauses = split_proximity('"приёмная комиссия" ректор NEAR/3 университет мест', analyze)
+    assert text.split() == ["мест"]
+    assert clauses == [ProximityClause(["приёмная", "комиссия"]), ProximityClause(["ректор", "университет"], 3)]
+    text, clauses = split_proximity('"ректор" а NEAR/2 б NEAR/5 в', analyze)
+    assert text.split() == ["ректор"] and clauses == [ProximityClause(["а", "б", "в"], 5)]
+
+
+@pytest.mark.parametrize("phrase", [["приёмная", "комиссия"], ["ректор", "университет", "общежитие"],
+                                    ["мест", "мест"]])
+def test_phrase_search_matches_brute_force(positional_index, phrase):
+    query = '"' + " ".join(phrase) + '"'
+    expected = matching_documents(positional_index, lambda tokens: contains_phrase(tokens, phrase))
+    assert expected
+    assert {doc_id for doc_id, _ in positional_index.search_scored(query, k=None)} == expected
+    stats = positional_index.executor.last_stats
+    # Позиции читаются только для кандидатов после пересечения по ID
+    assert stats["verified"] == stats["candidates"] == len(positional_index.executor.conjunctive(phrase))
+    assert stats["positions_decoded"] <= stats["verified"] * len(set(phrase))
+
+
+@pytest.mark.parametrize("distance", [1, 3, 6])
+def test_near_search_matches_brute_force(positional_index, distance):
+    query = f"ректор NEAR/{distance} общежитие"
+    expected = matching_documents(positional_index,
+                                  lambda tokens: within(tokens, ["ректор", "общежитие"], distance))
+    assert {doc_id for doc_id, _ in positional_index.search_scored(query, k=None)} == expected
+
+
+def test_phrase_is_required_in_or_mode(positional_index):
+    results = positional_index.search_scored('"приёмная комиссия" ректор', k=None, mode="or")
+    expected = matching_documents(positional_index, lambda tokens: contains_phrase(tokens, ["приёмная", "комиссия"]))
+    assert {doc_id for doc_id, _ in results} == expected
+    # Необязательный термин повышает оценку только документов, где он есть
+    phrase_only = dict(positional_index.search_scored('"приёмная комиссия"', k=None))
+    for doc_id, score in results:
+        if "ректор" in positional_index.documents[doc_id].text.split():
+            assert score > phrase_only[doc_id]
+        else:
+            assert score == pytest.approx(phrase_only[doc_id])
+
+
+def test_phrase_with_prefix(positional_index):
+    results = positional_index.search_scored('"приёмная комиссия" рек*', k=None)
+    expected = matching_documents(positional_index, lambda tokens: contains_phrase(tokens, ["приёмная", "комиссия"])
+                                  and "ректор" in tokens)
+    assert {doc_id for doc_id, _ in results} == expected
+
+
+def test_phrase_without_positions_falls_back_to_conjunction(index):
+    assert index.positions is None
+    assert {doc_id for doc_id, _ in index.search_scored('"rare even"', k=None)} == \
+        set(index.executor.conjunctive(["rare", "even"]))
+
+
+def test_concurrent_queries_keep_separate_stats(index):
+    index.query_cache = QueryCache(max_entries=0)
+    queries = [("common even", "and"), ("common rare", "and"), ("even rare", "or"), ("common even rare", "or")]
+    expected = {(query, mode): index.search_scored(query, k=10, mode=mode) for query, mode in queries}
+    failures = []
+
+    def worker():
+        for _ in range(30):
+            for query, mode in queries:
+                if index.search_scored(query, k=10, mode=mode) != expected[query, mode]:
+                    failures.append((query, mode))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
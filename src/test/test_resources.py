@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.utils.exceptions import ResourceError
+from src.utils.resources import NLTK_RESOURCES, ResourceManager
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_import_does_not_load_nltk():
+    code = "import sys, src.core.index, searcher; print('nltk' in sys.modules)"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=PROJECT_ROOT, text=True)
+    assert output.strip() == "False"
+
+
+def test_resource_manager_uses_local_data_dir(tmp_path):
+    manager = ResourceManager(str(tmp_path))
+    for path in NLTK_RESOURCES.values():
+        os.makedirs(tmp_path / path)
+
+    assert manager.missing() == []
+
+
+def test_resource_manager_reads_local_files_without_global_state(tmp_path, monkeypatch):
+    import nltk
+
+    monkeypatch.delenv("NLTK_DATA", raising=False)
+    (tmp_path / "corpora" / "stopwords").mkdir(parents=True)
+    (tmp_path / "corpora" / "stopwords" / "russian").write_text("и\nв\n", encoding="utf-8")
+    punkt = tmp_path / "tokenizers" / "punkt_tab" / "english"
+    punkt.mkdir(parents=True)
+    for name in ["collocations.tab", "sent_starters.txt", "abbrev_types.txt", "ortho_context.tab"]:
+        (punkt / name).write_text("", encoding="utf-8")
+    path = list(nltk.data.path)
+
+    manager = ResourceManager(str(tmp_path))
+    assert manager.stopwords("russian") == ["и", "в"]
+    assert manager.tokenizer()("Ректор сказал. Всё!") == ["Ректор", "сказал", ".", "Всё", "!"]
+    assert nltk.data.path == path and "NLTK_DATA" not in os.environ
+
+
+def test_resource_manager_reads_env_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("INVERTED_INDEX_NLTK_DATA", str(tmp_path))
+    assert ResourceManager().data_dir == str(tmp_path)
+
+
+def test_resource_manager_reports_missing_stopwords(tmp_path, monkeypatch):
+    manager = ResourceManager(str(tmp_path))
+    if "stopwords" not in manager.missing():
+        pytest.skip("Стоп-слова NLTK установлены в системе")
+
+    with pytest.raises(ResourceError):
+        manager.stopwords("russian")
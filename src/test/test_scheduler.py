@@ -0,0 +1,167 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from load_documents import stream_documents
+from src.crawl.scheduler import DECREASE_FACTOR, CrawlScheduler
+
+PAGE = "<html><head><title>Страница</title></head><body><p>Текст {}</p></body></html>"
+
+
+class FaultyServer:
+    """Локальный сервер с задержкой ответов и внедрёнными ошибками 5xx"""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0, status: int = 503):
+        self.delay = delay
+        self.failures = failures  # Сколько первых запросов к каждому пути завершаются ошибкой
+        self.status = status
+        self.attempts = {}
+        self.active = 0
+        self.max_active = 0
+        self.times = []
+        self.runner = None
+        self.base = None
+
+    async def handler(self, request):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.times.append(time.monotonic())
+        try:
+            await asyncio.sleep(self.delay)
+            attempt = self.attempts[request.path] = self.attempts.get(request.path, 0) + 1
+            if attempt <= self.failures:
+                return web.Response(status=self.status)
+            return web.Response(text=PAGE.format(request.path), content_type='text/html')
+        finally:
+            self.active -= 1
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get('/{path:.*}', self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
+
+
+def crawl(server: FaultyServer, count: int, scheduler: CrawlScheduler) -> list:
+    async def run():
+        async with server:
+            urls = [f"{server.base}/{i}" for i in range(count)]
+            return [doc async for doc in stream_documents(urls, extract_workers=0, parser='html.parser',
+                                                          scheduler=scheduler)]
+    return asyncio.run(run())
+
+
+def test_retries_recover_from_server_errors():
+    server = FaultyServer(failures=2)
+    scheduler = CrawlScheduler(max_concurrency=4, retries=3, backoff=0.001)
+    documents = crawl(server, 10, scheduler)
+
+    assert len(documents) == 10
+    assert all(attempts == 3 for attempts in server.attempts.values())
+    assert scheduler.stats.retries == 20 and scheduler.stats.failed == 0
+    assert scheduler.stats.pages == 10 and scheduler.stats.bytes > 0
+
+
+def test_gives_up_after_retries():
+    server = FaultyServer(failures=100, status=500)
+    scheduler = CrawlScheduler(max_concurrency=4, retries=2, backoff=0.001)
+    assert crawl(server, 3, scheduler) == []
+    assert all(attempts == 3 for attempts in server.attempts.values())
+    assert scheduler.stats.failed == 3
+
+
+def test_client_errors_are_not_retried():
+    server = FaultyServer(failures=100, status=404)
+    scheduler = CrawlScheduler(retries=3, backoff=0.001)
+    assert crawl(server, 3, scheduler) == []
+    assert all(attempts == 1 for attempts in server.attempts.values())
+    assert scheduler.stats.retries == 0
+
+
+def test_timeouts_are_retried():
+    async def run():
+        async with FaultyServer(delay=0.2) as server:
+            scheduler = CrawlScheduler(retries=1, timeout=0.05, backoff=0.001)
+
+            async def handle(response):
+                return await response.text()
+
+            async with aiohttp.ClientSession() as session:
+                with pytest.raises(asyncio.TimeoutError):
+                    await scheduler.fetch(session, f"{server.base}/slow", handle)
+            return server.attempts, scheduler.stats
+
+    attempts, stats = asyncio.run(run())
+    assert attempts == {"/slow": 2}
+    assert stats.retries == 1 and stats.failed == 1
+
+
+def test_per_host_concurrency_limit():
+    server = FaultyServer(delay=0.02)
+    scheduler = CrawlScheduler(max_concurrency=16, per_host=3, initial_concurrency=16)
+    assert len(crawl(server, 20, scheduler)) == 20
+    assert server.max_active == 3
+
+
+def test_host_rate_limit():
+    server = FaultyServer()
+    scheduler = CrawlScheduler(max_concurrency=8, host_rate=50)
+    crawl(server, 10, scheduler)
+    gaps = [later - earlier for earlier, later in zip(server.times, server.times[1:])]
+    assert server.times[-1] - server.times[0] >= 9 / 50 * 0.9
+    assert min(gaps) >= 1 / 50 * 0.5
+
+
+def test_adaptive_limit_grows_on_success_and_shrinks_on_errors():
+    scheduler = CrawlScheduler(max_concurrency=8, initial_concurrency=2)
+    for _ in range(200):
+        scheduler._record(0.01, error=False)
+    assert scheduler.limit == 8
+
+    scheduler._record(0.01, error=True)
+    assert scheduler.limit == pytest.approx(8 * DECREASE_FACTOR)
+    scheduler._record(0.01, error=True)  # Ошибки той же пачки не снижают предел повторно
+    assert scheduler.limit == pytest.approx(8 * DECREASE_FACTOR)
+
+    scheduler._last_decrease = 0.0
+    for _ in range(50):
+        scheduler._record(1.0, error=False)  # Задержка выросла в сто раз
+        scheduler._last_decrease = 0.0
+    assert scheduler.limit == scheduler.min_concurrency
+
+
+def test_adaptive_limit_under_injected_errors():
+    server = FaultyServer(delay=0.005, failures=1)
+    scheduler = CrawlScheduler(max_concurrency=16, initial_concurrency=16, retries=2, backoff=0.001)
+    assert len(crawl(server, 30, scheduler)) == 30
+    assert scheduler.limit < 16
+
+
+def test_backoff_is_exponential_with_jitter():
+    scheduler = CrawlScheduler(backoff=1.0)
+    for attempt in range(4):
+        delays = [scheduler.backoff_delay(attempt) for _ in range(100)]
+        assert all(0.5 * 2 ** attempt <= delay <= 1.5 * 2 ** attempt for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        CrawlScheduler(max_concurrency=0)
+
+
+def test_report():
+    scheduler = CrawlScheduler()
+    scheduler.stats.pages, scheduler.stats.bytes = 10, 1000
+    report = scheduler.report()
+    assert report["pages_per_second"] > 0 and report["bytes_per_second"] > report["pages_per_second"]
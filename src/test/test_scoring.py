@@ -0,0 +1,107 @@
+import math
+import random
+
+import pytest
+
+from src.core.document import Document
+from src.core.index import InvertedIndex
+from src.core.scoring import BM25, TopK
+
+
+INDEX_OPTIONS = {"compression_method": "vbyte", "block_size": 8}
+
+
+def brute_force(index: InvertedIndex, terms: list[str], mode: str) -> dict[int, float]:
+    scores = {}
+    avg = index.average_length()
+    for doc_id in index.documents:
+        present = [t for t in terms if doc_id in index.term_frequencies.get(t, {})]
+        if (mode == "and" and len(present) == len(terms)) or (mode == "or" and present):
+            scores[doc_id] = sum(
+                index.scorer.score(index.term_frequencies[t][doc_id], index.doc_lengths[doc_id], avg,
+                                   index.term_idf(t))
+                for t in present
+            )
+    return scores
+
+
+def test_bm25_score_formula():
+    bm25 = BM25(k1=1.2, b=0.75)
+    idf = bm25.idf(1, 10)
+    assert idf == pytest.approx(math.log(1 + 9.5 / 1.5))
+    assert bm25.score(2, 10, 10.0, idf) == pytest.approx(idf * 2 * 2.2 / (2 + 1.2))
+    assert bm25.score(0, 10, 10.0, idf) == 0.0
+    assert bm25.score(100, 1, 10.0, idf) < bm25.upper_bound(idf)
+
+
+def test_bm25_rejects_bad_parameters():
+    with pytest.raises(ValueError):
+        BM25(b=1.5)
+
+
+def test_top_k_keeps_best():
+    top = TopK(2)
+    for doc_id, score in [(1, 0.5), (2, 3.0), (3, 1.0), (4, 3.0)]:
+        top.push(doc_id, score)
+    assert top.results() == [(2, 3.0), (4, 3.0)]
+    assert top.threshold == 3.0
+
+
+def test_length_normalization_and_idf(make_index):
+    index = make_index([
+        Document(1, "кот " + "шум " * 20),
+        Document(2, "кот"),
+        Document(3, "пес кот"),
+    ], **INDEX_OPTIONS)
+    assert [doc.doc_id for doc in index.search("кот")] == [2, 3, 1]
+    # Редкий термин весит больше частого
+    assert index.term_idf("пес") > index.term_idf("кот")
+
+
+def test_idf_precomputed_at_build(make_index):
+    index = make_index([Document(1, "a b"), Document(2, "a")], **INDEX_OPTIONS)
+    assert set(index.idf) == {"a", "b"}
+    assert set(index.max_scores) == {"a", "b"}
+    index.add_document(Document(3, "c"))
+    assert index.idf == {}
+    assert index.term_upper_bound("c") == pytest.approx(index.scorer.upper_bound(index.term_idf("c")))
+    assert index.term_idf("c") == pytest.approx(BM25.idf(1, 3))
+
+
+def test_search_returns_k_results(make_index):
+    index = make_index([Document(i, "кот") for i in range(1, 30)], **INDEX_OPTIONS)
+    assert len(index.search("кот")) == 10
+    assert len(index.search("кот", k=3)) == 3
+    assert len(index.search("кот", k=None)) == 29
+
+
+@pytest.mark.parametrize("k", [1, 3, 10, None])
+@pytest.mark.parametrize("mode", ["and", "or"])
+def test_search_matches_brute_force(k, mode, make_index):
+    rng = random.Random(k or 0)
+    vocabulary = ["a"] * 30 + ["b"] * 10 + ["c"] * 3 + ["d"]
+    index = make_index([
+        Document(doc_id, " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 12))))
+        for doc_id in range(1, 301)
+    ], **INDEX_OPTIONS)
+    terms = ["a", "c", "d"]
+
+    expected = brute_force(index, terms, mode)
+    result = index.search_scored(" ".join(terms), k=k, mode=mode)
+    ranked = sorted(expected.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    assert [doc_id for doc_id, _ in result] == [doc_id for doc_id, _ in ranked]
+    assert [score for _, score in result] == pytest.approx([score for _, score in ranked])
+
+
+def test_maxscore_skips_non_essential_terms(make_index):
+    index = make_index(
+        [Document(i, "common") for i in range(1, 500)]
+        + [Document(i, "rare common") for i in range(500, 505)],
+        **INDEX_OPTIONS,
+    )
+    result = index.executor.disjunctive(["common", "rare"], k=3)
+
+    assert [doc_id for doc_id, _ in result] == [500, 501, 502]
+    # После заполнения кучи частый термин перестаёт порождать кандидатов
+    assert index.executor.last_stats["scored"] < 20
@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+from src.core.document import Document
+from src.storage.segment import POSITIONS_FILE, TermDictionary, is_segment, load_segment, write_segment
+from src.utils.exceptions import IndexationError
+
+
+@pytest.fixture
+def build(make_index):
+    def build(compression_method="gamma", block_size=16):
+        return make_index((
+            Document(doc_id, " ".join(
+                term for term, step in [("common", 1), ("even", 2), ("rare", 97), ("редкий", 250)]
+                if doc_id % step == 0
+            ) + " common" * (doc_id % 3), {"title": f"Документ {doc_id}", "url": f"http://x/{doc_id}"})
+            for doc_id in range(1, 501)
+        ), compression_method=compression_method, block_size=block_size)
+
+    return build
+
+
+@pytest.mark.parametrize("compression_method,block_size", [("gamma", 16), ("vbyte", 128), ("none", 0)])
+def test_roundtrip_matches_in_memory_index(tmp_path, compression_method, block_size, build, split_analyzer):
+    index = build(compression_method, block_size)
+    write_segment(index, str(tmp_path))
+    loaded = load_segment(str(tmp_path), analyzer=split_analyzer)
+
+    assert is_segment(str(tmp_path))
+    assert sorted(loaded.index) == sorted(index.index)
+    for query in ["common rare", "even", "редкий common"]:
+        assert loaded.search_scored(query, k=5) == index.search_scored(query, k=5)
+        assert loaded.search_scored(query, k=5, mode="or") == index.search_scored(query, k=5, mode="or")
+    assert loaded.average_length() == index.average_length()
+
+
+def test_documents_are_read_on_demand(tmp_path, build, split_analyzer):
+    write_segment(build(), str(tmp_path))
+    loaded = load_segment(str(tmp_path), analyzer=split_analyzer)
+
+    assert len(loaded.documents) == 500
+    assert 250 in loaded.documents and 501 not in loaded.documents
+    document = loaded.documents[250]
+    assert document.metadata["title"] == "Документ 250"
+    assert loaded.search("редкий")[0].doc_id == 250
+
+
+def test_term_dictionary_lookup(tmp_path, build, split_analyzer):
+    index = build()
+    write_segment(index, str(tmp_path))
+    terms = load_segment(str(tmp_path), analyzer=split_analyzer).index
+
+    assert isinstance(terms, TermDictionary)
+    assert terms["rare"] == index.index["rare"]
+    assert "редкий" in terms and "absent" not in terms
+    assert terms.get("absent") is None
+    with pytest.raises(KeyError):
+        terms["absent"]
+
+
+def test_segment_is_read_only(tmp_path, build, split_analyzer):
+    write_segment(build(), str(tmp_path))
+    loaded = load_segment(str(tmp_path), analyzer=split_analyzer)
+
+    with pytest.raises(IndexationError):
+        loaded.add_document(Document(1000, "новый"))
+
+
+def test_empty_index(tmp_path, make_index, split_analyzer):
+    write_segment(make_index(), str(tmp_path))
+    loaded = load_segment(str(tmp_path), analyzer=split_analyzer)
+
+    assert len(loaded.index) == 0
+    assert loaded.search("что-нибудь") == []
+
+
+def test_segment_rejects_other_versions(tmp_path, build, split_analyzer):
+    write_segment(build(), str(tmp_path))
+    meta_path = tmp_path / "meta.json"
+    meta_path.write_text(meta_path.read_text().replace('"version": 4', '"version": 3'))
+
+    with pytest.raises(IndexationError):
+        load_segment(str(tmp_path), analyzer=split_analyzer)
+
+
+def test_prefix_and_range_match_in_memory_index(tmp_path, build, split_analyzer):
+    index = build()
+    index.add_document(Document(501, "редкость редактор рак"))
+    write_segment(index, str(tmp_path))
+    loaded = load_segment(str(tmp_path), analyzer=split_analyzer)
+
+    for prefix in ["ред", "r", "com", "", "я"]:
+        assert loaded.terms_with_prefix(prefix) == index.terms_with_prefix(prefix)
+        assert index.terms_with_prefix(prefix) == sorted(term for term in index.index if term.startswith(prefix))
+    assert loaded.terms_range("e", "s") == index.terms_range("e", "s") == ["even", "rare"]
+    assert loaded.terms_range("ред") == index.terms_range("ред") == ["редактор", "редкий", "редкость"]
+
+
+def test_positions_round_trip(tmp_path, make_index, split_analyzer):
+    documents = (Document(doc_id, " ".join(["приёмная", "комиссия", "ректор"][(doc_id + i) % 3]
+                                           for i in range(doc_id % 7 + 1)))
+                 for doc_id in range(1, 301))
+    index = make_index(documents, compression_method="vbyte", block_size=16, positions=True)
+    write_segment(index, str(tmp_path))
+    loaded = load_segment(str(tmp_path), analyzer=split_analyzer)
+
+    assert os.path.exists(tmp_path / POSITIONS_FILE)
+    assert dict(loaded.positions) == index.positions
+    assert loaded.document_positions("ректор", 299) == index.document_positions("ректор", 299)
+    for query in ['"приёмная комиссия"', '"ректор приёмная комиссия" ', "ректор NEAR/1 комиссия"]:
+        assert loaded.search_scored(query, k=None) == index.search_scored(query, k=None)
+        assert loaded.search_scored(query, k=None)
+
+
+def test_segment_without_positions(tmp_path, build, split_analyzer):
+    write_segment(build(), str(tmp_path))
+    loaded = load_segment(str(tmp_path), analyzer=split_analyzer)
+    assert loaded.positions is None and not os.path.exists(tmp_path / POSITIONS_FILE)
@@ -0,0 +1,190 @@
+import os
+
+import pytest
+
+from src.core.document import Document
+from src.storage.segmented import SegmentedIndex, select_merge
+from src.utils.exceptions import IndexationError
+
+
+WORDS = ["ректор", "приём", "расписание", "стипендия", "общежитие", "факультет", "кафедра"]
+
+
+def make_document(doc_id, shift=0):
+    return Document(doc_id, " ".join(WORDS[(doc_id * k + shift) % len(WORDS)] for k in range(1, doc_id % 4 + 2)),
+                    {"title": f"Документ {doc_id}"})
+
+
+@pytest.fixture
+def monolithic(make_index):
+    def monolithic(documents, positions=False):
+        return make_index(documents, compression_method="gamma", block_size=16, positions=positions)
+
+    return monolithic
+
+
+@pytest.fixture
+def open_index(split_analyzer):
+    def open_index(path, **kwargs):
+        kwargs.setdefault("flush_threshold", 10)
+        kwargs.setdefault("background_merge", False)
+        return SegmentedIndex(str(path), compression_method="gamma", analyzer=split_analyzer, block_size=16, **kwargs)
+
+    return open_index
+
+
+QUERIES = ["ректор", "приём кафедра", "стипендия общежитие факультет", "рас*", "ка* ректор", "с* о*",
+           "(ректор OR кафедра) NOT стипендия", "факультет -общежитие", "NOT приём", "р* AND (с* OR кафедра)"]
+
+
+def assert_same_results(segmented, reference):
+    for query in QUERIES:
+        for mode in ("and", "or"):
+            expected = reference.search_scored(query, k=5, mode=mode)
+            actual = segmented.search_scored(query, k=5, mode=mode)
+            assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected]
+            assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+def test_search_across_segments_matches_single_index(tmp_path, open_index, monolithic):
+    documents = [make_document(doc_id) for doc_id in range(1, 36)]
+    index = open_index(tmp_path, merge_factor=100)
+    index.add_documents(documents)
+
+    assert len(index.segments) == 3  # и ещё 5 документов в памяти
+    assert_same_results(index, monolithic(documents))
+    assert len(index.documents) == 35
+
+
+def test_update_replaces_old_version(tmp_path, open_index):
+    index = open_index(tmp_path, merge_factor=100)
+    index.add_documents(make_document(doc_id) for doc_id in range(1, 21))
+    index.add_document(Document(3, "уникальное слово"))
+    index.add_document(Document(12, "только в памяти"))
+    index.add_document(Document(12, "обновлено снова"))
+
+    assert [doc.doc_id for doc in index.search("уникальное")] == [3]
+    assert index.search("памяти") == []
+    assert index.documents[12].text == "обновлено снова"
+    stale = index.search_scored(make_document(3).text, k=None, mode="or")
+    assert 3 not in {doc_id for doc_id, _ in stale}
+    assert len(index.documents) == 20
+
+
+def test_delete_hides_document_everywhere(tmp_path, open_index):
+    documents = [make_document(doc_id) for doc_id in range(1, 26)]
+    index = open_index(tmp_path, merge_factor=100)
+    index.add_documents(documents)
+
+    for doc_id in [2, 15, 24]:
+        assert index.delete_document(doc_id)
+    assert not index.delete_document(2)
+    assert not index.delete_document(1000)
+
+    results = {doc_id for query in QUERIES for doc_id, _ in index.search_scored(query, k=None, mode="or")}
+    assert not results & {2, 15, 24}
+    assert 2 not in index.documents and len(index.documents) == 22
+
+
+def test_maxscore_after_updates_keeps_idf_non_negative(tmp_path, open_index):
+    index = open_index(tmp_path, merge_factor=100, flush_threshold=1000)
+    index.add_documents(Document(doc_id, "x") for doc_id in range(1, 11))
+    index.flush()
+    index.add_documents(Document(doc_id, "x") for doc_id in range(1, 11))  # Новые версии остаются в памяти
+
+    results = index.search_scored("x", k=None, mode="or")
+    assert sorted(doc_id for doc_id, _ in results) == list(range(1, 11))
+    assert all(score > 0 for _, score in results)
+    assert index.search_scored("x", k=3, mode="or") == results[:3]
+
+
+def test_merge_purges_deletes_and_matches_single_index(tmp_path, open_index, monolithic):
+    documents = [make_document(doc_id) for doc_id in range(1, 41)]
+    index = open_index(tmp_path, merge_factor=100)
+    index.add_documents(documents)
+    for doc_id in range(1, 41, 3):
+        index.delete_document(doc_id)
+
+    merged = index.merge(index.segments)
+
+    assert index.segments == [merged]
+    assert sorted(os.listdir(tmp_path)) == ["manifest.json", merged, "write.lock"]
+    live = [document for document in documents if document.doc_id % 3 != 1]
+    assert_same_results(index, monolithic(live))
+
+
+def test_tiered_merge_runs_after_flush(tmp_path, open_index, monolithic):
+    index = open_index(tmp_path, merge_factor=3, background_merge=True)
+    index.add_documents(make_document(doc_id) for doc_id in range(1, 61))
+    index.close()
+
+    assert len(index.segments) < 6
+    assert len(index.documents) == 60
+    assert_same_results(index, monolithic([make_document(doc_id) for doc_id in range(1, 61)]))
+
+
+def test_reopen_keeps_segments_and_tombstones(tmp_path, open_index):
+    index = open_index(tmp_path, merge_factor=100)
+    index.add_documents(make_document(doc_id) for doc_id in range(1, 16))
+    index.delete_document(4)
+    index.close()
+
+    reopened = open_index(tmp_path, merge_factor=100)
+    assert reopened.segments == index.segments
+    assert 4 not in reopened.documents and len(reopened.documents) == 14
+    assert reopened.documents.metadata(5) == {"title": "Документ 5"}
+
+
+def test_positions_survive_flush_merge_and_reopen(tmp_path, open_index, monolithic):
+    documents = [make_document(doc_id) for doc_id in range(1, 41)]
+    index = open_index(tmp_path, merge_factor=100, positions=True)
+    index.add_documents(documents)
+    for doc_id in range(1, 41, 3):
+        index.delete_document(doc_id)
+    live = [document for document in documents if document.doc_id % 3 != 1]
+    reference = monolithic(live, positions=True)
+
+    queries = ['"' + " ".join(document.text.split()[:2]) + '"' for document in live[:10] if " " in document.text]
+    queries += ["ректор NEAR/2 кафедра", '"стипендия общежитие"']
+
+    def assert_same_phrases(segmented):
+        for query in queries:
+            expected = reference.search_scored(query, k=None)
+            actual = segmented.search_scored(query, k=None)
+            assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected]
+            assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+    # До слияния документная частота учитывает удалённые документы, поэтому сравниваются только найденные
+    for query in queries:
+        assert {doc_id for doc_id, _ in index.search_scored(query, k=None)} == \
+            {doc_id for doc_id, _ in reference.search_scored(query, k=None)}
+    index.merge(index.segments)
+    index.close()
+    assert_same_phrases(index)
+    assert_same_phrases(open_index(tmp_path, merge_factor=100))
+    assert any(reference.search_scored(query, k=None) for query in queries)
+
+
+def test_reader_never_deletes_unlisted_segments(tmp_path, open_index, split_analyzer):
+    writer = open_index(tmp_path, merge_factor=100)
+    writer.add_documents(make_document(doc_id) for doc_id in range(1, 11))
+    # Сегмент записан, но ещё не внесён в манифест — как между write_segment и _write_manifest
+    os.makedirs(tmp_path / "seg_000099")
+
+    reader = SegmentedIndex(str(tmp_path), analyzer=split_analyzer, read_only=True)
+    assert os.path.isdir(tmp_path / "seg_000099")
+    assert len(reader.documents) == 10
+    with pytest.raises(IndexationError):
+        reader.add_document(make_document(11))
+    with pytest.raises(IndexationError):
+        open_index(tmp_path)  # Второй писатель
+
+    writer.close()
+    open_index(tmp_path).close()  # Писатель после снятия блокировки убирает лишний каталог
+    assert not os.path.exists(tmp_path / "seg_000099")
+
+
+def test_select_merge():
+    assert select_merge([("a", 10, 0), ("b", 10, 0)], merge_factor=3, min_size=10) is None
+    assert select_merge([("a", 10, 0), ("b", 12, 0), ("c", 9, 0), ("big", 500, 0)], 3, 10) == ["c", "a", "b"]
+    assert select_merge([("a", 10, 0), ("b", 100, 60)], 3, 10) == ["b"]
@@ -0,0 +1,131 @@
+import functools
+import http.client
+import json
+import os
+import socket
+import threading
+from urllib.parse import quote
+
+import pytest
+
+from src.core.document import Document
+from src.service.server import IndexHolder, SearchHTTPServer, UnixSearchHTTPServer
+from src.storage.segment import load_segment, write_segment
+
+
+@pytest.fixture
+def write_index(make_index):
+    def write_index(path, texts):
+        index = make_index((Document(doc_id, text, {"title": f"Документ {doc_id}"})
+                            for doc_id, text in enumerate(texts, start=1)), compression_method="vbyte")
+        write_segment(index, path)
+
+    return write_index
+
+
+@pytest.fixture
+def loader(split_analyzer):
+    return functools.partial(load_segment, analyzer=split_analyzer)
+
+
+@pytest.fixture
+def segment(tmp_path, write_index):
+    path = str(tmp_path / "index")
+    write_index(path, ["ректор университета", "приём документов", "ректор и приём"])
+    return path
+
+
+@pytest.fixture
+def server(segment, loader):
+    srv = SearchHTTPServer(("127.0.0.1", 0), IndexHolder(segment, loader, reload_interval=0))
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    connection.request(method, quote(path, safe="/?=&"), json.dumps(body) if body is not None else None)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_get_search(server):
+    status, data = request(server, "GET", "/search?q=ректор&top=1")
+
+    assert status == 200
+    assert data["query"] == "ректор"
+    assert len(data["hits"]) == 1
+    assert data["hits"][0]["metadata"]["title"].startswith("Документ")
+
+
+def test_batch_search(server):
+    status, data = request(server, "POST", "/search",
+                           {"queries": ["ректор", {"query": "приём", "top": 1}, "ректор приём"], "mode": "and"})
+
+    assert status == 200
+    assert [[hit["doc_id"] for hit in result["hits"]] for result in data["results"]][1:] == [[2], [3]]
+    assert sorted(hit["doc_id"] for hit in data["results"][0]["hits"]) == [1, 3]
+
+
+@pytest.mark.parametrize("path", ["/search?top=1", "/search?q=x&mode=xor", "/search?q=x&top=many",
+                                  "/search?q=(x OR y"])
+def test_bad_get_requests(server, path):
+    assert request(server, "GET", path)[0] == 400
+
+
+def test_bad_post_requests(server):
+    assert request(server, "POST", "/search", {"queries": "ректор"})[0] == 400
+    assert request(server, "POST", "/search", {"query": "ректор", "top": -1})[0] == 400
+    assert request(server, "POST", "/search", {"queries": ["ректор", "ректор AND"]})[0] == 400
+    assert request(server, "GET", "/unknown")[0] == 404
+
+
+def test_internal_error_is_not_an_empty_result(server, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("повреждённый список")
+
+    monkeypatch.setattr(server.holder.index.executor, "rank", broken)
+    assert request(server, "GET", "/search?q=ректор")[0] == 500
+    assert request(server, "POST", "/search", {"queries": ["ректор"]})[0] == 500
+
+
+def test_hot_reload(server, segment, write_index):
+    assert request(server, "GET", "/search?q=стипендия")[1]["hits"] == []
+    write_index(segment, ["стипендия"])
+    os.utime(os.path.join(segment, "meta.json"), ns=(0, 10 ** 18))  # гарантированно новое время изменения
+
+    status, data = request(server, "GET", "/search?q=стипендия")
+    assert [hit["doc_id"] for hit in data["hits"]] == [1]
+    assert request(server, "GET", "/health")[1]["generation"] == 1
+
+
+def test_failed_reload_keeps_old_index(segment, loader):
+    holder = IndexHolder(segment, loader, reload_interval=None)
+    index = holder.index
+    with open(os.path.join(segment, "meta.json"), "w") as f:
+        f.write("{")
+    os.utime(os.path.join(segment, "meta.json"), ns=(0, 10 ** 18))
+
+    assert holder.reload_if_changed() is False
+    assert holder.index is index
+
+
+def test_unix_socket(segment, tmp_path, loader):
+    socket_path = str(tmp_path / "search.sock")
+    srv = UnixSearchHTTPServer(socket_path, IndexHolder(segment, loader, reload_interval=None))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(socket_path)
+        connection = http.client.HTTPConnection("localhost", timeout=5)
+        connection.sock = client
+        connection.request("GET", "/search?q=" + quote("приём"))
+        data = json.loads(connection.getresponse().read())
+        assert sorted(hit["doc_id"] for hit in data["hits"]) == [2, 3]
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    assert not os.path.exists(socket_path)
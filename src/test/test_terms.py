@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from src.storage.terms import TERM_RECORD, TermDictionary, encode_terms
+
+TERMS = sorted({"кот", "котёнок", "котик", "кошка", "пёс", "пес", "a", "ab", "abc", "abd", "b", "\xff"}
+               | {f"term{i:04d}" for i in range(100)})
+
+
+def dictionary(terms, block_terms=4) -> TermDictionary:
+    records = [TERM_RECORD.pack(i, 1, 0.0, 0.0) for i in range(len(terms))]
+    postings = bytes(i % 256 for i in range(len(terms)))
+    return TermDictionary(encode_terms([term.encode("utf-8") for term in terms], records, block_terms), postings)
+
+
+@pytest.mark.parametrize("block_terms", [1, 4, 16])
+def test_exact_lookup(block_terms):
+    terms = dictionary(TERMS, block_terms)
+    assert list(terms) == TERMS and len(terms) == len(TERMS)
+    for i, term in enumerate(TERMS):
+        assert terms.find(term) == i
+        assert terms.term(i) == term
+        assert terms.record(i)[0] == i
+        assert terms[term] == bytes([i % 256])
+    for absent in ["", "0", "ко", "котики", "term0100", "zzz", "\xff\xff"]:
+        assert absent not in terms and terms.find(absent) == -1
+
+
+@pytest.mark.parametrize("block_terms", [1, 4, 16])
+def test_prefix_lookup(block_terms):
+    terms = dictionary(TERMS, block_terms)
+    for prefix in ["кот", "ко", "к", "п", "ab", "a", "term00", "term009", "x", "", "\xff"]:
+        assert list(terms.prefix(prefix)) == [term for term in TERMS if term.startswith(prefix)]
+
+
+@pytest.mark.parametrize("block_terms", [1, 4, 16])
+def test_range_lookup(block_terms):
+    terms = dictionary(TERMS, block_terms)
+    bounds = [None, "", "a", "abc", "abz", "term0050", "котик", "п", "я", "\xff"]
+    for start in bounds:
+        for end in bounds:
+            expected = [term for term in TERMS
+                        if (start is None or term >= start) and (end is None or term < end)]
+            assert list(terms.range(start, end)) == expected
+
+
+def test_random_vocabulary_matches_sorted_list():
+    rng = random.Random(7)
+    alphabet = "абвгдкотaz"
+    vocabulary = sorted({"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))) for _ in range(2000)})
+    terms = dictionary(vocabulary, 16)
+    assert list(terms) == vocabulary
+    for prefix in ["а", "ко", "zz", "тот"]:
+        assert list(terms.prefix(prefix)) == [term for term in vocabulary if term.startswith(prefix)]
+    for i in range(0, len(vocabulary), 37):
+        assert terms.find(vocabulary[i]) == i
+
+
+def test_front_coding_is_smaller_than_plain_strings():
+    encoded = encode_terms([term.encode("utf-8") for term in TERMS], [])
+    plain = sum(len(term.encode("utf-8")) for term in TERMS)
+    assert len(encoded) < plain + 4 * len(TERMS)
+
+
+def test_empty_dictionary():
+    terms = TermDictionary(b"", b"")
+    assert len(terms) == 0 and list(terms) == []
+    assert list(terms.prefix("a")) == [] and list(terms.range()) == []
+    assert "a" not in terms
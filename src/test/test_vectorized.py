@@ -0,0 +1,67 @@
+from array import array
+
+import pytest
+
+from src.compression import vectorized
+from src.compression.utils import decode_postings_array, encode_postings
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "fallback"])
+def backend(request, monkeypatch):
+    if request.param and not vectorized.HAS_NUMPY:
+        pytest.skip("NumPy не установлен")
+    monkeypatch.setattr(vectorized, "HAS_NUMPY", request.param)
+    return request.param
+
+
+POSTINGS = [1, 2, 5, 9, 100, 1000, 1001, 70000]
+
+
+@pytest.mark.parametrize("method", ["gamma", "delta"])
+def test_decode_postings_array_compressed(backend, method):
+    decoded = decode_postings_array(encode_postings(POSTINGS, method), method)
+    assert list(decoded) == POSTINGS
+
+
+def test_decode_postings_array_plain(backend):
+    encoded = ",".join(map(str, POSTINGS)).encode("utf-8")
+    decoded = decode_postings_array(encoded, "none")
+    assert list(decoded) == POSTINGS
+    assert list(decode_postings_array(b"", "none")) == []
+
+
+def test_decode_postings_array_dtype():
+    if not vectorized.HAS_NUMPY:
+        pytest.skip("NumPy не установлен")
+    decoded = decode_postings_array(encode_postings(POSTINGS, "gamma"), "gamma")
+    assert decoded.dtype == vectorized.np.uint32
+
+
+def test_fallback_returns_array(monkeypatch):
+    monkeypatch.setattr(vectorized, "HAS_NUMPY", False)
+    assert isinstance(decode_postings_array(b"1,2", "none"), array)
+
+
+def test_unpack_fixed_width(backend):
+    values = [0, 1, 5, 7, 3, 6, 2, 4, 1]
+    value = 0
+    for v in values:
+        value = (value << 3) | v
+    padding = -len(values) * 3 % 8
+    data = (value << padding).to_bytes((len(values) * 3 + padding) // 8, "big")
+
+    assert list(vectorized.unpack_fixed_width(data, 3, len(values))) == values
+    assert list(vectorized.unpack_fixed_width(b"", 0, 4)) == [0, 0, 0, 0]
+
+
+def test_decode_varint(backend):
+    data = bytes([0x01, 0x7F, 0x80, 0x01, 0xE5, 0x8E, 0x26])
+    assert list(vectorized.decode_varint(data)) == [1, 127, 128, 624485]
+    assert list(vectorized.decode_varint(b"")) == []
+    assert list(vectorized.decode_varint(b"\x80")) == []
+    assert list(vectorized.decode_varint(b"\x05\x80\x81")) == [5]
+
+
+def test_intersect_sorted(backend):
+    result = vectorized.intersect_sorted(array("I", [1, 3, 5, 7]), array("I", [3, 4, 7, 9]))
+    assert list(result) == [3, 7]
@@ -5,3 +5,15 @@ class IndexationError(Exception):
 class CompressionError(Exception):
     """Базовое исключение при проблемах сжатия"""
     pass
+
+class ResourceError(Exception):
+    """Базовое исключение при отсутствии внешних ресурсов"""
+    pass
+
+class FetchError(Exception):
+    """Базовое исключение при временных ошибках загрузки страниц"""
+    pass
+
+class QueryError(Exception):
+    """Базовое исключение при синтаксических ошибках поискового запроса"""
+    pass
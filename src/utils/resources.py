@@ -0,0 +1,131 @@
+import os
+from collections import defaultdict
+from typing import Callable
+
+from .exceptions import ResourceError
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+DATA_DIR_ENV = "INVERTED_INDEX_NLTK_DATA"  # Переменная окружения с каталогом данных NLTK
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                "nltk_data")
+
+# Пакет NLTK -> путь ресурса внутри каталога данных
+NLTK_RESOURCES = {
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+}
+
+
+def _read_lines(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def _read_punkt_params(lang_dir: str):
+    """Параметры Punkt из табличного формата punkt_tab (как nltk.tokenize.punkt.load_punkt_params)"""
+    from nltk.tokenize.punkt import PunktParameters
+
+    params = PunktParameters()
+    params.collocations = {tuple(line.split("\t")) for line in _read_lines(os.path.join(lang_dir, "collocations.tab"))}
+    params.sent_starters = set(_read_lines(os.path.join(lang_dir, "sent_starters.txt")))
+    params.abbrev_types = set(_read_lines(os.path.join(lang_dir, "abbrev_types.txt")))
+    params.ortho_context = defaultdict(int, (
+        (word, int(value)) for word, value in
+        (line.split("\t") for line in _read_lines(os.path.join(lang_dir, "ortho_context.tab")))
+    ))
+    return params
+
+
+class ResourceManager:
+    """
+    Ленивый доступ к ресурсам NLTK из локального каталога без обращения к сети.
+
+    Файлы ресурсов ищутся сначала в data_dir, затем в стандартных путях NLTK и читаются
+    напрямую: глобальный nltk.data.path и переменные окружения процесса не изменяются.
+    """
+
+    def __init__(self, data_dir: str = None):
+        self.data_dir = data_dir or os.environ.get(DATA_DIR_ENV) or DEFAULT_DATA_DIR
+
+    def _find(self, package: str) -> str:
+        """Каталог пакета NLTK с приоритетом локального каталога; LookupError, если его нет"""
+        import nltk
+
+        for root in [self.data_dir, *nltk.data.path]:
+            path = os.path.join(root, NLTK_RESOURCES[package])
+            if os.path.isdir(path):
+                return path
+        raise LookupError(package)
+
+    def missing(self) -> list[str]:
+        """Список пакетов NLTK, отсутствующих локально"""
+        missing = []
+        for package in NLTK_RESOURCES:
+            try:
+                self._find(package)
+            except LookupError:
+                missing.append(package)
+        return missing
+
+    def stopwords(self, language: str) -> list[str]:
+        """Стоп-слова для указанного языка"""
+        try:
+            return [word for word in _read_lines(os.path.join(self._find("stopwords"), language)) if word]
+        except (LookupError, FileNotFoundError):
+            raise self._not_found("stopwords")
+
+    def tokenizer(self, language: str = "english") -> Callable[[str], list[str]]:
+        """Токенизация как nltk.word_tokenize, с моделью Punkt из найденного каталога"""
+        from nltk.tokenize import NLTKWordTokenizer
+        from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+        try:
+            params = _read_punkt_params(os.path.join(self._find("punkt_tab"), language))
+        except (LookupError, FileNotFoundError):
+            raise self._not_found("punkt_tab")
+        sentences = PunktSentenceTokenizer(params)
+        words = NLTKWordTokenizer()
+
+        def tokenize(text: str) -> list[str]:
+            return [token for sentence in sentences.tokenize(text) for token in words.tokenize(sentence)]
+
+        return tokenize
+
+    def stemmer(self, language: str):
+        """Стеммер Snowball для указанного языка"""
+        from nltk.stem import SnowballStemmer
+
+        return SnowballStemmer(language)
+
+    def prepare(self) -> list[str]:
+        """Загрузка недостающих пакетов в локальный каталог (этап развёртывания)"""
+        import nltk
+
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        downloaded = []
+        for package in self.missing():
+            logger.info(f"Загрузка ресурса NLTK '{package}' в {self.data_dir}")
+            if not nltk.download(package, download_dir=self.data_dir, quiet=True):
+                raise ResourceError(f"Не удалось загрузить ресурс NLTK '{package}'")
+            downloaded.append(package)
+        return downloaded
+
+    def _not_found(self, package: str) -> ResourceError:
+        logger.error(f"Ресурс NLTK '{package}' не найден в {self.data_dir}")
+        return ResourceError(
+            f"Ресурс NLTK '{package}' не найден. Выполните: python prepare_resources.py --data-dir {self.data_dir}"
+        )
+
+
+_default_manager: ResourceManager = None
+
+
+def get_resource_manager() -> ResourceManager:
+    """Общий менеджер ресурсов, создаваемый при первом обращении"""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = ResourceManager()
+    return _default_manager